@@ -0,0 +1,171 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import json
+from datetime import datetime
+from flask import Blueprint, Response, abort, current_app, jsonify, request, stream_with_context, url_for
+from werkzeug.exceptions import HTTPException
+from models import Venue, Artist, Show, Genre
+from routing import replica_reads
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+NDJSON = 'application/x-ndjson'
+
+#----------------------------------------------------------------------------#
+# Helpers.
+#----------------------------------------------------------------------------#
+
+def _flag(value):
+    return value.lower() in ('1', 'true', 'yes')
+
+# Filters accepted by each collection: query-string name -> (column, parser).
+FILTERS = {
+    Venue: {
+        'city': (Venue.city, str),
+        'state': (Venue.state, str),
+        'seeking_talent': (Venue.seeking_talent, _flag),
+    },
+    Artist: {
+        'city': (Artist.city, str),
+        'state': (Artist.state, str),
+        'seeking_venue': (Artist.seeking_venue, _flag),
+    },
+    Show: {
+        'venue_id': (Show.venue_id, int),
+        'artist_id': (Show.artist_id, int),
+    },
+}
+
+# Fields requested with ?fields=a,b,c, or None for the whole record.
+def _fields():
+    requested = request.args.get('fields')
+    if not requested:
+        return None
+    return [field.strip() for field in requested.split(',') if field.strip()]
+
+def _select(record, fields):
+    if fields is None:
+        return record
+    try:
+        return {field: record[field] for field in fields}
+    except KeyError as e:
+        abort(400, 'Unknown field: %s' % e.args[0])
+
+def _filtered_query(model):
+    query = model.query
+    try:
+        for name, (column, parse) in FILTERS[model].items():
+            if name in request.args:
+                query = query.filter(column == parse(request.args[name]))
+        if model is not Show and 'genre' in request.args:
+            query = query.filter(model.genre_tags.any(Genre.name == request.args['genre']))
+        if model is Show and 'upcoming' in request.args:
+            now = datetime.now()
+            if _flag(request.args['upcoming']):
+                query = query.filter(Show.start_time >= now)
+            else:
+                query = query.filter(Show.start_time < now)
+    except ValueError:
+        abort(400, 'Invalid filter value')
+    return query
+
+def _wants_ndjson():
+    return request.args.get('format') == 'ndjson' or \
+        request.accept_mimetypes.best == NDJSON
+
+# Full export, one JSON document per line. Rows come off a server-side cursor
+# in batches, so memory stays flat however large the table is.
+def _stream(model, query, fields):
+    batch = current_app.config['API_STREAM_BATCH_SIZE']
+    records = iter(query.order_by(model.id).execution_options(stream_results=True).yield_per(batch))
+
+    # Encode the first row before the response starts, so an unknown field
+    # is still reported as a 400 rather than a broken stream.
+    first = next(records, None)
+    first_line = json.dumps(_select(first.to_dict(), fields)) + '\n' if first is not None else ''
+
+    def generate():
+        yield first_line
+        for record in records:
+            yield json.dumps(_select(record.to_dict(), fields)) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON)
+
+# One keyset page ordered by id. The body gets a strong ETag so a client
+# repeating the request with If-None-Match gets an empty 304.
+def _page(model, endpoint, query, fields):
+    limit = request.args.get('limit', current_app.config['API_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, current_app.config['API_MAX_PAGE_SIZE']))
+    after = request.args.get('after', type=int)
+    if after is not None:
+        query = query.filter(model.id > after)
+    records = query.order_by(model.id).limit(limit + 1).all()
+
+    next_url = None
+    if len(records) > limit:
+        records = records[:limit]
+        args = request.args.to_dict()
+        args.update(after=records[-1].id, limit=limit)
+        next_url = url_for(endpoint, **args)
+
+    response = jsonify({
+        'data': [_select(record.to_dict(), fields) for record in records],
+        'next': next_url,
+    })
+    response.add_etag()
+    return response.make_conditional(request)
+
+def _collection(model, endpoint):
+    fields = _fields()
+    query = _filtered_query(model)
+    if _wants_ndjson():
+        return _stream(model, query, fields)
+    return _page(model, endpoint, query, fields)
+
+def _item(model, item_id):
+    record = model.query.get(item_id)
+    if record is None:
+        abort(404)
+    response = jsonify(_select(record.to_dict(), _fields()))
+    response.add_etag()
+    return response.make_conditional(request)
+
+#----------------------------------------------------------------------------#
+# Endpoints.
+#----------------------------------------------------------------------------#
+
+@api.route('/venues')
+@replica_reads
+def list_venues():
+    return _collection(Venue, 'api.list_venues')
+
+@api.route('/venues/<int:venue_id>')
+@replica_reads
+def get_venue(venue_id):
+    return _item(Venue, venue_id)
+
+@api.route('/artists')
+@replica_reads
+def list_artists():
+    return _collection(Artist, 'api.list_artists')
+
+@api.route('/artists/<int:artist_id>')
+@replica_reads
+def get_artist(artist_id):
+    return _item(Artist, artist_id)
+
+@api.route('/shows')
+@replica_reads
+def list_shows():
+    return _collection(Show, 'api.list_shows')
+
+@api.route('/shows/<int:show_id>')
+@replica_reads
+def get_show(show_id):
+    return _item(Show, show_id)
+
+@api.errorhandler(HTTPException)
+def api_error(error):
+    return jsonify({'error': error.name, 'message': error.description}), error.code
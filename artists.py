@@ -0,0 +1,131 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from datetime import datetime
+from flask import Blueprint, abort, current_app, flash, redirect, render_template, request, url_for
+from sqlalchemy.exc import SQLAlchemyError
+import queries
+import search
+import writes
+from extensions import response_cache
+from forms import ArtistForm
+from models import Artist
+from routing import replica_reads
+from streaming import stream_template
+from versions import conditional
+
+bp = Blueprint('artists', __name__)
+
+#----------------------------------------------------------------------------#
+# Cache invalidation.
+#----------------------------------------------------------------------------#
+
+# Cached pages showing an artist's details.
+def artist_cache_namespaces(artist_id):
+    venue_ids = queries.artist_venue_ids(artist_id)
+    return ['artists', 'shows', 'genres', 'artist:%d' % artist_id] + ['venue:%d' % i for i in venue_ids]
+
+#----------------------------------------------------------------------------#
+# Controllers.
+#----------------------------------------------------------------------------#
+
+# ------ Create Artist ------ #
+
+@bp.route('/artists/create', methods=['GET'])
+def create_artist_form():
+  form = ArtistForm()
+  return render_template('forms/new_artist.html', form=form)
+
+@bp.route('/artists/create', methods=['POST'])
+def create_artist_submission():
+  # called upon submitting the new artist listing form
+  # TODO: insert form data as a new Venue record in the db, instead
+  # TODO: modify data to be the data object returned from db insertion (Done)
+    form = ArtistForm(request.form)
+    name = request.form.get('name', '')
+    try:
+      writes.create_artist(form)
+      response_cache.invalidate('artists', 'genres')
+      flash('Artist ' + name + ' was successfully listed!') # on successful db insert, flash success (Done)
+    except writes.WriteError as e:
+      flash('The artist ' + name + ' wasn\'t listed: ' + str(e))
+    except SQLAlchemyError:
+      current_app.logger.exception('Creating artist %r failed', name)
+      flash('Unsuccessful. The artist ' + name + ' wasn\'t listed. Please try again or contact the webmaster at webmaster@fyyur.com')
+  
+  # TODO: on unsuccessful db insert, flash an error instead.(Done)
+    return render_template('pages/home.html')
+
+# ------ Get Artists -------- #
+@bp.route('/artists')
+@replica_reads
+@conditional
+@response_cache.cached('artists')
+def artists():
+  # TODO: replace with real data returned from querying the database (Done)
+    if current_app.config['STREAM_LISTINGS']:
+        artists = queries.artist_list(stream=True, batch_size=current_app.config['STREAM_BATCH_SIZE'])
+        return stream_template('pages/artists.html', artists=artists)
+    data = queries.artist_list()  # Sorted alphabetically
+    return render_template('pages/artists.html', artists=data)
+
+# ------ Search Artist -------- #
+@bp.route('/artists/search', methods=['POST'])
+@replica_reads
+def search_artists():
+  # TODO: implement search on artists with partial string search. Ensure it is case-insensitive.
+  # seach for "A" should return "Guns N Petals", "Matt Quevado", and "The Wild Sax Band".
+  # search for "band" should return "The Wild Sax Band". (Done)
+    keyword = request.form.get('search_term', '')
+    response = search.search_artists(keyword, limit=current_app.config['SEARCH_RESULTS_LIMIT'])
+    return render_template('pages/search_artists.html', results=response, search_term=request.form.get('search_term', ''))
+
+@bp.route('/artists/<int:artist_id>')
+@replica_reads
+@conditional
+@response_cache.cached('artist:{artist_id}')
+def show_artist(artist_id):
+  # shows the artist page with the given artist_id
+  # TODO: replace with real artist data from the artist table, using artist_id (Done)
+    artist = Artist.query.get(artist_id)
+    if artist is None:
+        abort(404)
+
+    now = datetime.now()
+    tmp = artist.to_dict()
+    try:
+        tmp.update(queries.artist_shows(artist_id, now, limit=current_app.config['DETAIL_SHOWS_PER_PAGE'],
+                                        upcoming_cursor=request.args.get('upcoming_cursor'),
+                                        past_cursor=request.args.get('past_cursor')))
+    except ValueError:
+        abort(400)
+
+    return render_template('pages/show_artist.html', artist=tmp)
+
+#  Update
+#  ----------------------------------------------------------------
+@bp.route('/artists/<int:artist_id>/edit', methods=['GET'])
+def edit_artist(artist_id):
+  form = ArtistForm()
+  artist = Artist.query.get(artist_id)
+  # TODO: populate form with fields from artist with ID <artist_id> (Done)
+  return render_template('forms/edit_artist.html', form=form, artist=artist)
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['POST'])
+def edit_artist_submission(artist_id):
+  # TODO: take values from the form submitted, and update existing
+  # artist record with ID <artist_id> using the new attributes (Done)
+    form = ArtistForm(request.form)
+    try:
+        writes.update_artist(artist_id, form)
+        response_cache.invalidate(*artist_cache_namespaces(artist_id))
+        flash('Update successful!')
+    except writes.NotFound:
+        abort(404)
+    except writes.WriteError as e:
+        flash('The artist wasn\'t updated: ' + str(e))
+    except SQLAlchemyError:
+        current_app.logger.exception('Updating artist %d failed', artist_id)
+        flash('Update unsuccessful. The artist ' + request.form.get('name', '') + ' wasn\'t updated. Please try again or contact the webmaster at webmaster@fyyur.com')
+    return redirect(url_for('artists.show_artist', artist_id=artist_id))
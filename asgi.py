@@ -0,0 +1,199 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import asyncio
+import io
+import sys
+from urllib.parse import unquote
+from asgiref.wsgi import WsgiToAsgi
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from werkzeug.exceptions import HTTPException
+import autocomplete
+import schedule
+import search
+from app import create_app
+from models import db
+
+#----------------------------------------------------------------------------#
+# ASGI entry point.
+#
+#   uvicorn asgi:application --workers 4
+#
+# Read-only endpoints (ASYNC_ENDPOINTS) run on the event loop against an async
+# engine (asyncpg / aiosqlite), so a request waiting on the database no longer
+# holds a thread. They run the very same Flask views, models and templates:
+# each request gets an AsyncSession, and inside its run_sync() greenlet
+# db.session is pointed at that session, whose I/O is awaited by the loop.
+#
+# Everything else (forms, writes, NDJSON exports, /profiler...) is handed to
+# the ordinary WSGI app in a worker thread, so the two modes always agree.
+# The sync `python app.py` / WSGI deployment is unchanged.
+#----------------------------------------------------------------------------#
+
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+ASYNC_ENDPOINTS = {
+    'pages.index', 'venues.venues', 'venues.show_venue', 'venues.search_venues',
+    'artists.artists', 'artists.show_artist', 'artists.search_artists',
+    'pages.genres', 'pages.show_genre', 'shows.shows', 'pages.autocomplete_names',
+    'api.list_venues', 'api.get_venue', 'api.list_artists', 'api.get_artist',
+    'api.list_shows', 'api.get_show',
+}
+
+# The async twin of a sync database URL: same database, async driver.
+def async_database_url(url):
+    scheme, _, rest = url.partition('://')
+    dialect = scheme.split('+')[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError('No async driver configured for %s URLs' % dialect)
+    return ASYNC_DRIVERS[dialect] + '://' + rest
+
+
+def async_engine_options(config, url):
+    if url.startswith('sqlite'):
+        return {}
+    options = {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+    if config['DB_STATEMENT_TIMEOUT_MS'] and url.startswith('postgresql+asyncpg'):
+        options['connect_args'] = {'server_settings': {'statement_timeout': str(config['DB_STATEMENT_TIMEOUT_MS'])}}
+    return options
+
+# The WSGI environ for an HTTP scope, as a WSGI server would build it.
+def build_environ(scope, body):
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': unquote(scope['path']).encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('ascii'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': 'HTTP/%s' % scope['http_version'],
+        'REMOTE_ADDR': (scope.get('client') or ('127.0.0.1', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1')
+        value = value.decode('latin-1')
+        if name == 'content-type':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'content-length':
+            environ['CONTENT_LENGTH'] = value
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+            environ[key] = environ[key] + ',' + value if key in environ else value
+    return environ
+
+
+class AsyncApp:
+
+    def __init__(self, flask_app, database_url=None):
+        self.app = flask_app
+        self.fallback = WsgiToAsgi(flask_app)
+        url = database_url or flask_app.config.get('ASYNC_DATABASE_URL') or \
+            async_database_url(flask_app.config['SQLALCHEMY_DATABASE_URI'])
+        self.engine = create_async_engine(url, **async_engine_options(flask_app.config, url))
+
+    def _runs_async(self, environ):
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD', 'POST'):
+            return False
+        try:
+            endpoint, _ = self.app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            return False
+        if endpoint not in ASYNC_ENDPOINTS:
+            return False
+        # NDJSON exports stream from a server-side cursor; leave them to WSGI.
+        return 'format=ndjson' not in environ['QUERY_STRING'] and \
+            'application/x-ndjson' not in environ.get('HTTP_ACCEPT', '')
+
+    # Runs inside the AsyncSession's greenlet: the whole Flask request, with
+    # db.session resolving to this request's session.
+    def _call_wsgi(self, session, environ):
+        db.session.registry.set(session)
+        try:
+            started = {}
+
+            def start_response(status, headers, exc_info=None):
+                started['status'] = int(status.split(' ', 1)[0])
+                started['headers'] = headers
+
+            body = self.app.wsgi_app(environ, start_response)
+            try:
+                data = b''.join(body)
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+            return started['status'], started['headers'], data
+        finally:
+            db.session.registry.clear()
+
+    # Builds the in-process indexes before the first request is accepted, in
+    # a worker thread on the sync engine. Their locks assume one request per
+    # thread, which the greenlets here are not, so no request should have to
+    # build one on the loop.
+    def _warm(self):
+        with self.app.app_context():
+            try:
+                autocomplete.build()
+                search.warm()
+                schedule.warm()
+            finally:
+                db.session.remove()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await asyncio.get_running_loop().run_in_executor(None, self._warm)
+                except Exception as error:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(error)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http' or not self._runs_async(build_environ(scope, b'')):
+            return await self.fallback(scope, receive, send)
+
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        async with AsyncSession(self.engine) as session:
+            status, headers, data = await session.run_sync(self._call_wsgi, build_environ(scope, body))
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        })
+        await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else data})
+
+
+application = AsyncApp(create_app())
@@ -0,0 +1,210 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+from flask import abort, request, send_file, url_for
+from werkzeug.security import safe_join
+
+# Optional: better JS minification and .br files. Without them the bundles
+# are still concatenated, CSS is still minified and .gz files still written.
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+#----------------------------------------------------------------------------#
+# Bundles.
+#----------------------------------------------------------------------------#
+
+# Bundle name -> source files under static/, in load order. layouts/main.html
+# includes each bundle with asset_urls(); jQuery is served from the bundle
+# instead of the CDN once it is built.
+BUNDLES = {
+    'main.css': [
+        'css/bootstrap.min.css',
+        'css/layout.main.css',
+        'css/main.css',
+        'css/main.responsive.css',
+        'css/main.quickfix.css',
+    ],
+    # Modernizr has to run before the page renders; everything else is deferred.
+    'head.js': [
+        'js/libs/modernizr-2.8.2.min.js',
+    ],
+    'main.js': [
+        'js/libs/jquery-1.11.1.min.js',
+        'js/libs/bootstrap-3.1.1.min.js',
+        'js/libs/moment.min.js',
+        'js/plugins.js',
+        'js/script.js',
+    ],
+}
+
+DIST_DIR = 'dist'
+MANIFEST = 'manifest.json'
+
+_css_comment = re.compile(r'/\*.*?\*/', re.S)
+_css_space = re.compile(r'\s+')
+_css_punctuation = re.compile(r'\s*([{};,>])\s*')
+_css_url = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+_source_map = re.compile(r'^\s*//[#@] sourceMappingURL=.*$', re.M)
+
+
+def minify_css(text):
+    text = _css_comment.sub('', text)
+    text = _css_space.sub(' ', text)
+    text = _css_punctuation.sub(r'\1', text)
+    return text.replace(';}', '}').strip()
+
+
+def minify_js(text):
+    text = _source_map.sub('', text)
+    if rjsmin is not None:
+        return rjsmin.jsmin(text)
+    return text.strip()
+
+# Relative url()s point at files next to the source stylesheet; rewrite them
+# so they still resolve from the bundle in static/dist.
+def rebase_css_urls(text, source):
+    source_dir = posixpath.dirname(source)
+
+    def rebase(match):
+        url = match.group(2)
+        if url.startswith(('/', 'data:', 'http:', 'https:', '#')) or '//' in url:
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(source_dir, url))
+        return 'url("%s")' % posixpath.relpath(target, DIST_DIR)
+
+    return _css_url.sub(rebase, text)
+
+
+def fingerprint(name, data):
+    stem, ext = posixpath.splitext(name)
+    return '%s.%s%s' % (stem, hashlib.sha256(data).hexdigest()[:12], ext)
+
+#----------------------------------------------------------------------------#
+# Assets.
+#----------------------------------------------------------------------------#
+
+# Builds the bundles into static/dist as content-hashed files with .gz/.br
+# twins, and serves them with year-long immutable caching: a changed file
+# gets a new name, so browsers never have to revalidate the old one.
+#
+# Templates call asset_urls(bundle). With a built manifest that is the one
+# bundle URL; without one (a fresh checkout, or ASSETS_USE_BUNDLES off while
+# editing CSS) it is the list of source files, so nothing needs building in
+# development.
+class Assets:
+
+    def __init__(self, app=None):
+        self.static_folder = None
+        self.max_age = 31536000
+        self.use_bundles = True
+        self.manifest = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.static_folder = app.static_folder
+        self.max_age = app.config.get('ASSETS_MAX_AGE', 31536000)
+        self.use_bundles = app.config.get('ASSETS_USE_BUNDLES', True)
+        self.manifest = self._load_manifest()
+        app.add_url_rule(app.static_url_path + '/' + DIST_DIR + '/<path:filename>',
+                         endpoint='static_asset', view_func=self.send_asset)
+        app.jinja_env.globals['asset_urls'] = self.asset_urls
+        app.extensions['assets'] = self
+
+    @property
+    def dist_folder(self):
+        return os.path.join(self.static_folder, DIST_DIR)
+
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.dist_folder, MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def asset_urls(self, bundle):
+        if self.use_bundles and bundle in self.manifest:
+            return [url_for('static_asset', filename=self.manifest[bundle])]
+        return [url_for('static', filename=source) for source in BUNDLES[bundle]]
+
+    # -- Building
+
+    def _bundle(self, name):
+        parts = []
+        for source in BUNDLES[name]:
+            with open(os.path.join(self.static_folder, source), encoding='utf-8') as f:
+                text = f.read()
+            if name.endswith('.css'):
+                parts.append(minify_css(rebase_css_urls(text, source)))
+            else:
+                parts.append(minify_js(text))
+        # A lone ';' keeps one script's missing trailing semicolon from
+        # running into the next.
+        return ('\n' if name.endswith('.css') else ';\n').join(parts).encode('utf-8')
+
+    def _write(self, filename, data):
+        path = os.path.join(self.dist_folder, filename)
+        with open(path, 'wb') as f:
+            f.write(data)
+        # mtime=0 keeps the .gz byte-identical between builds.
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(data, 9, mtime=0))
+        if brotli is not None:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotli.compress(data, quality=11))
+
+    # Writes every bundle and the manifest, and returns the manifest. Files
+    # from earlier builds are kept, so pages already cached with the old
+    # URLs still load while a deploy rolls out; `clean` removes them.
+    def build(self):
+        os.makedirs(self.dist_folder, exist_ok=True)
+        manifest = {}
+        for name in BUNDLES:
+            data = self._bundle(name)
+            manifest[name] = fingerprint(name, data)
+            self._write(manifest[name], data)
+        with open(os.path.join(self.dist_folder, MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        self.manifest = manifest
+        return manifest
+
+    def clean(self):
+        shutil.rmtree(self.dist_folder, ignore_errors=True)
+        self.manifest = {}
+
+    # -- Serving
+
+    # The precompressed twin the client accepts, smallest first, else the
+    # plain file.
+    def send_asset(self, filename):
+        path = safe_join(self.dist_folder, filename)
+        if path is None or filename == MANIFEST or not os.path.isfile(path):
+            abort(404)
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        encoding = None
+        for name, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if request.accept_encodings[name] and os.path.isfile(path + suffix):
+                encoding, path = name, path + suffix
+                break
+        response = send_file(path, mimetype=mimetype, conditional=True)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Cache-Control'] = 'public, max-age=%d, immutable' % self.max_age
+        response.vary.add('Accept-Encoding')
+        return response
@@ -0,0 +1,170 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from sqlalchemy import event
+from models import db, Venue, Artist
+
+#----------------------------------------------------------------------------#
+# Prefix index.
+#----------------------------------------------------------------------------#
+
+_word_start = re.compile(r'(?<![\w])\w')
+
+# Lookup keys for a name: the whole name, then the rest of it from every
+# later word, so "mus" and "hop" both find "The Musical Hop". Rank 0 marks
+# the whole-name key, which sorts those matches first.
+def _keys(name):
+    lowered = (name or '').strip().lower()
+    starts = [match.start() for match in _word_start.finditer(lowered)]
+    keys = [(lowered, 0)]
+    keys.extend((lowered[start:], 1) for start in starts if start > 0)
+    return keys
+
+# Sorted array of (key, rank, name, id). A prefix query is one bisect plus a
+# short forward scan, so lookups stay well under a millisecond however many
+# names there are; inserts and removals are a bisect and a list shift.
+class PrefixIndex:
+
+    # Entries scanned per query before ranking, as a multiple of the limit.
+    SCAN_FACTOR = 20
+
+    def __init__(self):
+        self.built_at = None
+        self._entries = []
+        self._names = {}
+        self._lock = threading.RLock()
+
+    def _entries_for(self, doc_id, name):
+        return [(key, rank, name, doc_id) for key, rank in _keys(name)]
+
+    def build(self, rows):
+        entries, names = [], {}
+        for doc_id, name in rows:
+            names[doc_id] = name
+            entries.extend(self._entries_for(doc_id, name))
+        entries.sort()
+        with self._lock:
+            self._entries = entries
+            self._names = names
+            self.built_at = time.monotonic()
+
+    def add(self, doc_id, name):
+        with self._lock:
+            self.remove(doc_id)
+            self._names[doc_id] = name
+            for entry in self._entries_for(doc_id, name):
+                insort(self._entries, entry)
+
+    def remove(self, doc_id):
+        with self._lock:
+            name = self._names.pop(doc_id, None)
+            if name is None:
+                return
+            for entry in self._entries_for(doc_id, name):
+                i = bisect_left(self._entries, entry)
+                if i < len(self._entries) and self._entries[i] == entry:
+                    del self._entries[i]
+
+    # Returns up to `limit` (id, name) pairs whose name, or a word in it,
+    # starts with `prefix`; whole-name matches first, then alphabetical.
+    def search(self, prefix, limit=10):
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        found = {}
+        with self._lock:
+            entries = self._entries
+            i = bisect_left(entries, (prefix,))
+            end = min(len(entries), i + limit * self.SCAN_FACTOR)
+            while i < end and entries[i][0].startswith(prefix):
+                _, rank, name, doc_id = entries[i]
+                if doc_id not in found or rank < found[doc_id][0]:
+                    found[doc_id] = (rank, name)
+                i += 1
+        ranked = sorted((rank, name.lower(), doc_id, name) for doc_id, (rank, name) in found.items())
+        return [(doc_id, name) for _, _, doc_id, name in ranked[:limit]]
+
+#----------------------------------------------------------------------------#
+# Venue and artist indexes.
+#----------------------------------------------------------------------------#
+
+venue_names = PrefixIndex()
+artist_names = PrefixIndex()
+
+_indexes = {Venue: venue_names, Artist: artist_names}
+
+# Models whose index is being rebuilt after going stale.
+_rebuilding = set()
+
+def _rows(model):
+    return db.session.query(model.id, model.name).all()
+
+# Every worker keeps its own copy, and writes made by other processes only
+# reach it through a rebuild; `max_age` seconds bounds that staleness. No
+# lock is held while the rows load: under asgi.py concurrent requests are
+# greenlets on one thread, and one waiting on a lock would stall the loop.
+# Requests racing to the first build each load the rows and the last swap
+# wins; once stale, one request rebuilds while the others keep answering
+# from the old copy.
+def _ensure_built(model, max_age=None):
+    index = _indexes[model]
+    if index.built_at is None:
+        index.build(_rows(model))
+    elif max_age and time.monotonic() - index.built_at > max_age and model not in _rebuilding:
+        _rebuilding.add(model)
+        try:
+            index.build(_rows(model))
+        finally:
+            _rebuilding.discard(model)
+    return index
+
+# Builds both indexes up front; asgi.py calls this on startup.
+def build():
+    for model, index in _indexes.items():
+        index.build(_rows(model))
+
+# Suggestions for `prefix` from the requested kinds ('venue', 'artist'):
+# {'venues': [{'id', 'name'}, ...], 'artists': [...]}.
+def suggest(prefix, kinds=('venue', 'artist'), limit=10, max_age=None):
+    results = {}
+    for kind, model in (('venue', Venue), ('artist', Artist)):
+        if kind in kinds:
+            hits = _ensure_built(model, max_age).search(prefix, limit)
+            results[kind + 's'] = [{'id': doc_id, 'name': name} for doc_id, name in hits]
+    return results
+
+# Keep the indexes in step with committed writes from this process, the same
+# way search.py does: collect per flush (or queue_change for writes that go
+# around the ORM), apply on commit.
+def queue_change(session, model, doc_id, name):
+    session.info.setdefault('autocomplete_pending', []).append((model, doc_id, name))
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault('autocomplete_pending', [])
+    for obj in list(session.new) + list(session.dirty):
+        if type(obj) in _indexes:
+            pending.append((type(obj), obj.id, obj.name))
+    for obj in session.deleted:
+        if type(obj) in _indexes:
+            pending.append((type(obj), obj.id, None))
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_changes(session):
+    for model, doc_id, name in session.info.pop('autocomplete_pending', []):
+        index = _indexes[model]
+        if index.built_at is None:
+            continue
+        if name is None:
+            index.remove(doc_id)
+        else:
+            index.add(doc_id, name)
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('autocomplete_pending', None)
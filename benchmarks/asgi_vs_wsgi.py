@@ -0,0 +1,183 @@
+#----------------------------------------------------------------------------#
+# Sync (WSGI) vs async (ASGI) serving benchmark.
+#
+# Generates a synthetic database, starts the app once as a threaded WSGI
+# server and once under uvicorn (asgi.py), and drives each with the same
+# number of concurrent clients (200 by default) cycling through the read-only
+# pages and API endpoints. Prints requests/s and p50/p95/p99 latency per
+# mode, and writes them as JSON with --json.
+#
+#   python benchmarks/asgi_vs_wsgi.py --clients 200 --duration 20
+#   python benchmarks/asgi_vs_wsgi.py --database-url postgresql://localhost/fyyur_bench --shows 100000
+#
+# Both servers run as one process with the response cache off, so the numbers
+# compare the concurrency models rather than cache hit rates. Override the
+# server commands with --wsgi-command / --asgi-command ({port} is filled in),
+# e.g. to compare gunicorn and uvicorn with several workers each.
+#----------------------------------------------------------------------------#
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load import percentile
+
+PATHS = [
+    '/venues', '/venues/1', '/venues/2', '/artists', '/artists/1', '/artists/2',
+    '/shows', '/genres', '/genres/Jazz', '/api/v1/venues', '/api/v1/shows?upcoming=1',
+]
+
+WSGI_COMMAND = (sys.executable + ' -c "from werkzeug.serving import run_simple; from app import create_app; '
+                "run_simple('127.0.0.1', {port}, create_app(), threaded=True)\"")
+ASGI_COMMAND = sys.executable + ' -m uvicorn asgi:application --host 127.0.0.1 --port {port} --log-level warning'
+
+# Seconds before a request counts as failed, so a stalled server shows up as
+# failures instead of hanging the run.
+REQUEST_TIMEOUT = 30
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit('Server on port %d did not start' % port)
+
+
+async def fetch(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(('GET %s HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n' % path).encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def client(port, offset, deadline, samples):
+    i = offset
+    while time.perf_counter() < deadline:
+        path = PATHS[i % len(PATHS)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            ok = await asyncio.wait_for(fetch(port, path), REQUEST_TIMEOUT) == 200
+        except (OSError, ValueError, IndexError, asyncio.TimeoutError):
+            ok = False
+        samples.append(((time.perf_counter() - start) * 1000, ok))
+
+
+async def drive(port, clients, duration):
+    samples = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, i, start + duration, samples) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(ms for ms, _ in samples)
+    return {
+        'requests': len(samples),
+        'failures': sum(1 for _, ok in samples if not ok),
+        'rps': round(len(samples) / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+    }
+
+
+# Requests every path once, one at a time, before any concurrent load, so a
+# server that cannot answer at all fails the run here.
+async def first_requests(port):
+    for path in PATHS:
+        try:
+            status = await asyncio.wait_for(fetch(port, path), REQUEST_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise SystemExit('%s timed out after %d s' % (path, REQUEST_TIMEOUT))
+        if status != 200:
+            raise SystemExit('%s returned %d' % (path, status))
+
+
+def run_mode(command, env, workdir, clients, duration, warmup):
+    port = free_port()
+    server = subprocess.Popen(command.format(port=port), shell=True, env=env, cwd=workdir,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(port)
+        asyncio.run(first_requests(port))
+        asyncio.run(drive(port, min(clients, 20), warmup))
+        return asyncio.run(drive(port, clients, duration))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare requests/s of the WSGI and ASGI entry points.')
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds per mode')
+    parser.add_argument('--warmup', type=float, default=3.0, help='seconds per mode, not measured')
+    parser.add_argument('--shows', type=int, default=10000)
+    parser.add_argument('--database-url', default=None,
+                        help='scratch database (its tables are dropped); defaults to a temporary SQLite file')
+    parser.add_argument('--wsgi-command', default=WSGI_COMMAND)
+    parser.add_argument('--asgi-command', default=ASGI_COMMAND)
+    parser.add_argument('--json', default=None, help='write the results to this file')
+    args = parser.parse_args()
+
+    from app import create_app
+    from config import engine_options
+    from models import db
+    from synthetic import generate
+    app = create_app()
+
+    workdir = tempfile.mkdtemp()
+    url = args.database_url or 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    app.config.update(SQLALCHEMY_DATABASE_URI=url, SQLALCHEMY_ENGINE_OPTIONS=engine_options(url))
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        generate(args.shows, seed=1)
+        db.session.remove()
+        db.engine.dispose()
+
+    env = dict(os.environ, DATABASE_URL=url, CACHE_ENABLED='0', FLASK_DEBUG='0',
+               PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    env.pop('ASYNC_DATABASE_URL', None)
+
+    results = {}
+    for mode, command in (('wsgi', args.wsgi_command), ('asgi', args.asgi_command)):
+        results[mode] = run_mode(command, env, workdir, args.clients, args.duration, args.warmup)
+
+    print('%d clients, %.0f s per mode, %d shows' % (args.clients, args.duration, args.shows))
+    print('%-6s %9s %9s %9s %10s %10s %10s' % ('mode', 'requests', 'failures', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms'))
+    for mode, row in results.items():
+        print('%-6s %9d %9d %9.1f %10.2f %10.2f %10.2f' % (
+            mode, row['requests'], row['failures'], row['rps'], row['p50_ms'], row['p95_ms'], row['p99_ms']))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'clients': args.clients, 'duration_s': args.duration, 'shows': args.shows,
+                       'database': url.split(':', 1)[0], 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+#----------------------------------------------------------------------------#
+# Route benchmarks (pytest-benchmark).
+#
+# Drives every route of the app and the JSON API through the Flask test client
+# against a synthetic data set (see synthetic.py). The file is not named
+# test_*.py, so a plain `pytest` run never picks it up; run it explicitly:
+#
+#   pip install -r benchmarks/requirements.txt
+#   pytest benchmarks/bench_routes.py --benchmark-json=bench.json
+#   pytest benchmarks/bench_routes.py --benchmark-compare=0001 --benchmark-compare-fail=median:15%
+#
+# BENCH_SHOWS sets the scale (default 1000), BENCH_DATABASE_URL points it at
+# a scratch Postgres database instead of a temporary SQLite file (its tables
+# are dropped), and BENCH_CACHE=1 measures with the response cache on.
+#----------------------------------------------------------------------------#
+
+import itertools
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from config import engine_options
+from extensions import response_cache
+from models import db, Venue
+from schedule import schedule_index
+from search import venue_index, artist_index
+from synthetic import generate
+
+app = create_app()
+
+SHOWS = int(os.environ.get('BENCH_SHOWS', 1000))
+DATABASE_URL = os.environ.get('BENCH_DATABASE_URL')
+CACHE = os.environ.get('BENCH_CACHE', '') in ('1', 'true', 'yes')
+PROFILER_TOKEN = 'bench'
+
+# (endpoint, path) for every read-only route.
+PAGES = [
+    ('pages.index', '/'),
+    ('venues.venues', '/venues'),
+    ('venues.show_venue', '/venues/1'),
+    ('venues.venue_availability', '/venues/1/availability'),
+    ('venues.create_venue_form', '/venues/create'),
+    ('venues.edit_venue', '/venues/2/edit'),
+    ('artists.artists', '/artists'),
+    ('artists.show_artist', '/artists/1'),
+    ('artists.create_artist_form', '/artists/create'),
+    ('artists.edit_artist', '/artists/2/edit'),
+    ('pages.genres', '/genres'),
+    ('pages.show_genre', '/genres/Jazz'),
+    ('shows.shows', '/shows'),
+    ('shows.shows_ical', '/shows.ics'),
+    ('shows.create_shows', '/shows/create'),
+    ('pages.autocomplete_names', '/autocomplete?q=the'),
+    ('pages.cache_stats', '/cache/stats'),
+    ('pages.health_pool', '/health/pool'),
+    ('api.list_venues', '/api/v1/venues'),
+    ('api.get_venue', '/api/v1/venues/1'),
+    ('api.list_artists', '/api/v1/artists'),
+    ('api.get_artist', '/api/v1/artists/1'),
+    ('api.list_shows', '/api/v1/shows?upcoming=1'),
+    ('api.get_show', '/api/v1/shows/1'),
+]
+
+# Calendar views of /shows, by (id, path).
+CALENDARS = [
+    ('day', '/shows?view=day'),
+    ('week', '/shows?view=week'),
+    ('month_jazz', '/shows?view=month&genre=Jazz'),
+]
+
+SEARCHES = [
+    ('venues.search_venues', '/venues/search', 'Hop'),
+    ('artists.search_artists', '/artists/search', 'band'),
+]
+
+_sequence = itertools.count(1)
+
+
+def venue_form():
+    return {
+        'name': 'Bench Venue %d' % next(_sequence), 'city': 'Austin', 'state': 'TX',
+        'address': '1 Main St', 'phone': '512-555-0100', 'genre': ['Jazz', 'Blues'],
+        'image_link': 'https://example.com/v.png', 'facebook_link': 'https://www.facebook.com/v',
+        'website_link': 'https://example.com/v', 'seeking_description': '',
+    }
+
+
+def artist_form():
+    return {
+        'name': 'Bench Artist %d' % next(_sequence), 'city': 'Austin', 'state': 'TX',
+        'phone': '512-555-0100', 'genres': ['Jazz'],
+        'image_link': 'https://example.com/a.png', 'facebook_link': 'https://www.facebook.com/a',
+        'website_link': 'https://example.com/a', 'seeking_description': '',
+    }
+
+
+# Four-hour slots far past the synthetic shows, so the new shows never
+# conflict with them or with each other.
+def show_form():
+    start_time = datetime(2100, 1, 1) + timedelta(hours=4 * next(_sequence))
+    return {'artist_id': '3', 'venue_id': '3', 'start_time': start_time.strftime('%Y-%m-%d %H:%M:%S')}
+
+
+# (endpoint, path, form data builder) for every route that writes.
+WRITES = [
+    ('venues.create_venue_submission', '/venues/create', venue_form),
+    ('venues.edit_venue_submission', '/venues/2/edit', venue_form),
+    ('artists.create_artist_submission', '/artists/create', artist_form),
+    ('artists.edit_artist_submission', '/artists/2/edit', artist_form),
+    ('shows.create_show_submission', '/shows/create', show_form),
+]
+
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory):
+    url = DATABASE_URL or 'sqlite:///' + str(tmp_path_factory.mktemp('bench') / 'bench.db')
+    app.config.update(SQLALCHEMY_DATABASE_URI=url, SQLALCHEMY_ENGINE_OPTIONS=engine_options(url),
+                      SQLALCHEMY_BINDS={}, TESTING=True,
+                      WTF_CSRF_ENABLED=False, PROFILER_TOKEN=PROFILER_TOKEN)
+    response_cache.enabled = CACHE
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        generate(SHOWS, seed=1)
+        venue_index.clear()
+        artist_index.clear()
+        schedule_index.clear()
+    yield app.test_client()
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.mark.parametrize('endpoint, path', PAGES, ids=[endpoint for endpoint, _ in PAGES])
+def test_page(benchmark, client, endpoint, path):
+    response = benchmark(client.get, path)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('view, path', CALENDARS, ids=[view for view, _ in CALENDARS])
+def test_calendar(benchmark, client, view, path):
+    response = benchmark(client.get, path)
+    assert response.status_code == 200
+
+
+# The listing pages again with STREAM_LISTINGS on; reading the whole body
+# makes the streamed render part of the measurement.
+STREAMED = [(endpoint, path) for endpoint, path in PAGES if endpoint in ('venues.venues', 'artists.artists', 'shows.shows')]
+
+
+@pytest.mark.parametrize('endpoint, path', STREAMED, ids=[endpoint for endpoint, _ in STREAMED])
+def test_streamed_page(benchmark, client, endpoint, path):
+    def fetch():
+        response = client.get(path)
+        response.get_data()
+        return response
+
+    app.config['STREAM_LISTINGS'] = True
+    try:
+        response = benchmark(fetch)
+        assert response.status_code == 200
+        assert response.get_data().rstrip().endswith(b'</html>')
+    finally:
+        app.config['STREAM_LISTINGS'] = False
+
+
+@pytest.mark.parametrize('endpoint, path, term', SEARCHES, ids=[endpoint for endpoint, _, _ in SEARCHES])
+def test_search(benchmark, client, endpoint, path, term):
+    response = benchmark(client.post, path, data={'search_term': term})
+    assert response.status_code == 200
+    assert b'Number of search results' in response.data
+
+
+# Each write gets its own client so the flash messages it leaves behind do
+# not reach the page benchmarks, and starts each round with no cookies so
+# they do not pile up in the session either.
+@pytest.mark.parametrize('endpoint, path, form', WRITES, ids=[endpoint for endpoint, _, _ in WRITES])
+def test_write(benchmark, client, endpoint, path, form):
+    writer = app.test_client()
+
+    def fresh_form():
+        writer.cookie_jar.clear()
+        return (form(),), {}
+
+    response = benchmark.pedantic(lambda data: writer.post(path, data=data), setup=fresh_form, rounds=100)
+    # The handlers report failures as flash messages: rendered straight into
+    # the page they return, or kept in the session across a redirect.
+    if response.status_code == 302:
+        with writer.session_transaction() as session:
+            flashed = ' '.join(message for _, message in session.get('_flashes', []))
+    else:
+        assert response.status_code == 200
+        flashed = response.get_data(as_text=True)
+    assert 'success' in flashed.lower()
+    assert 'unsuccessful' not in flashed.lower() and 'not listed' not in flashed.lower()
+
+
+def test_delete_venue(benchmark, client):
+    writer = app.test_client()
+    created = []
+
+    def new_venue():
+        with app.app_context():
+            venue = Venue(**{key: value for key, value in venue_form().items() if key != 'genre'})
+            db.session.add(venue)
+            db.session.commit()
+            created.append(venue.id)
+            return (venue.id,), {}
+
+    benchmark.pedantic(lambda venue_id: writer.post('/venues/%d/delete' % venue_id),
+                       setup=new_venue, rounds=50)
+    with app.app_context():
+        assert Venue.query.filter(Venue.id.in_(created)).count() == 0
+
+
+def test_profiler_state(benchmark, client):
+    response = benchmark(client.get, '/profiler', headers={'X-Profiler-Token': PROFILER_TOKEN})
+    assert response.status_code == 200
+
+
+BENCHMARKED = (
+    {endpoint for endpoint, _ in PAGES}
+    | {endpoint for endpoint, _, _ in SEARCHES}
+    | {endpoint for endpoint, _, _ in WRITES}
+    | {'venues.delete_venue', 'pages.profiler_state', 'static', 'static_asset'}
+)
+
+
+def test_every_route_is_benchmarked():
+    endpoints = {rule.endpoint for rule in app.url_map.iter_rules()}
+    assert endpoints <= BENCHMARKED, sorted(endpoints - BENCHMARKED)
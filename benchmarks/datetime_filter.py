@@ -0,0 +1,83 @@
+#----------------------------------------------------------------------------#
+# `datetime` filter microbenchmark.
+#
+# Renders N show tiles through the old filter path (isoformat string, then
+# dateutil parse and babel.dates.format_datetime on every tile) and through
+# the current format_datetime with native datetimes.
+#
+#   python benchmarks/datetime_filter.py --tiles 10000
+#----------------------------------------------------------------------------#
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import babel.dates
+import dateutil.parser
+from jinja2 import Environment
+
+from app import format_datetime
+
+TILE = '''{% for show in shows %}
+<div class="tile tile-show"><h4>{{ show.start_time|datetime('full') }}</h4>
+<h5>{{ show.artist_name }}</h5><p>playing at</p><h5>{{ show.venue_name }}</h5></div>
+{% endfor %}'''
+
+
+# The filter as it was before the fast path.
+def legacy_format_datetime(value, format='medium'):
+    date = dateutil.parser.parse(value)
+    if format == 'full':
+        format = "EEEE MMMM, d, y 'at' h:mma"
+    elif format == 'medium':
+        format = "EE MM, dd, y h:mma"
+    return babel.dates.format_datetime(date, format, locale='en')
+
+
+def template(filter_function):
+    env = Environment(autoescape=True)
+    env.filters['datetime'] = filter_function
+    return env.from_string(TILE)
+
+
+def timed(render, shows, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(shows=shows)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the datetime Jinja filter.')
+    parser.add_argument('--tiles', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    base = datetime(2026, 1, 1, 20, 0)
+    shows = [{
+        'artist_name': 'Artist %d' % i,
+        'venue_name': 'Venue %d' % (i % 100),
+        'start_time': base + timedelta(hours=i),
+    } for i in range(args.tiles)]
+    legacy_shows = [dict(show, start_time=show['start_time'].isoformat()) for show in shows]
+
+    legacy = template(legacy_format_datetime)
+    current = template(format_datetime)
+    assert legacy.render(shows=legacy_shows[:50]) == current.render(shows=shows[:50])
+
+    old_ms = timed(legacy.render, legacy_shows, args.repeat)
+    new_ms = timed(current.render, shows, args.repeat)
+    print('%d tiles, median of %d renders' % (args.tiles, args.repeat))
+    print('legacy (parse + format_datetime): %9.1f ms' % old_ms)
+    print('native datetime, memoized:        %9.1f ms  (%.1fx)' % (new_ms, old_ms / new_ms))
+
+
+if __name__ == '__main__':
+    main()
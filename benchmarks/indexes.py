@@ -0,0 +1,156 @@
+#----------------------------------------------------------------------------#
+# Show/Venue index benchmark.
+#
+# Seeds N shows into a scratch database, then runs the queries behind the
+# venue/artist pages and /venues with and without the indexes from migration
+# a52e7d0c9f13, printing the query plan and median timing for each.
+#
+#   python benchmarks/indexes.py --shows 100000
+#   python benchmarks/indexes.py --database-url postgresql://localhost/fyyur_bench
+#----------------------------------------------------------------------------#
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app import create_app
+from models import db, Venue, Artist, Show
+
+app = create_app()
+
+INDEXES = [
+    ('ix_show_venue_id_start_time', 'Show', ('venue_id', 'start_time')),
+    ('ix_show_artist_id_start_time', 'Show', ('artist_id', 'start_time')),
+    ('ix_venue_city_state', 'Venue', ('city', 'state')),
+]
+
+QUERIES = {
+    'venue upcoming shows': (
+        'SELECT id, artist_id, start_time FROM "Show" '
+        'WHERE venue_id = :venue_id AND start_time >= :now ORDER BY start_time LIMIT 10'
+    ),
+    'venue past show count': (
+        'SELECT count(*) FROM "Show" WHERE venue_id = :venue_id AND start_time < :now'
+    ),
+    'artist upcoming shows': (
+        'SELECT id, venue_id, start_time FROM "Show" '
+        'WHERE artist_id = :artist_id AND start_time >= :now ORDER BY start_time LIMIT 10'
+    ),
+    'venues in area': (
+        'SELECT id, name FROM "Venue" WHERE city = :city AND state = :state'
+    ),
+}
+
+
+def seed(shows, seed_value):
+    rng = random.Random(seed_value)
+    venues = max(1, shows // 100)
+    artists = max(1, shows // 50)
+    areas = [('City %d' % i, 'S%d' % (i % 50)) for i in range(max(1, venues // 20))]
+
+    db.session.bulk_insert_mappings(Venue, [{
+        'id': i + 1, 'name': 'Venue %d' % i, 'city': areas[i % len(areas)][0],
+        'state': areas[i % len(areas)][1], 'address': '1 Main St', 'phone': '555-0100',
+        'genre': 'Jazz', 'image_link': 'https://example.com/v.png', 'seeking_talent': False,
+    } for i in range(venues)])
+    db.session.bulk_insert_mappings(Artist, [{
+        'id': i + 1, 'name': 'Artist %d' % i, 'city': 'City', 'state': 'S0', 'phone': '555-0100',
+        'genres': 'Jazz', 'image_link': 'https://example.com/a.png',
+        'facebook_link': 'https://facebook.com/a', 'website_link': 'https://example.com',
+        'seeking_venue': False,
+    } for i in range(artists)])
+    now = datetime.now()
+    batch = []
+    for i in range(shows):
+        batch.append({
+            'id': i + 1, 'venue_id': rng.randint(1, venues), 'artist_id': rng.randint(1, artists),
+            'start_time': now + timedelta(hours=rng.randint(-24 * 365 * 5, 24 * 180)),
+        })
+        if len(batch) == 10000:
+            db.session.bulk_insert_mappings(Show, batch)
+            batch = []
+    db.session.bulk_insert_mappings(Show, batch)
+    db.session.commit()
+    return venues, artists, areas
+
+
+def drop_indexes():
+    for name, _, _ in INDEXES:
+        db.session.execute(text('DROP INDEX IF EXISTS %s' % name))
+    db.session.commit()
+
+
+def create_indexes():
+    for name, table, columns in INDEXES:
+        db.session.execute(text('CREATE INDEX %s ON "%s" (%s)' % (name, table, ', '.join(columns))))
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+
+def explain(sql, params):
+    if db.engine.dialect.name == 'postgresql':
+        rows = db.session.execute(text('EXPLAIN ANALYZE ' + sql), params)
+        return '\n'.join(row[0] for row in rows)
+    rows = db.session.execute(text('EXPLAIN QUERY PLAN ' + sql), params)
+    return '\n'.join(row[-1] for row in rows)
+
+
+def run(label, params, repeat):
+    print('\n=== %s ===' % label)
+    results = {}
+    for name, sql in QUERIES.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            db.session.execute(text(sql), params).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = statistics.median(timings)
+        print('\n-- %s: %.3f ms (median of %d)' % (name, results[name], repeat))
+        print(explain(sql, params))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Show/Venue indexes.')
+    parser.add_argument('--shows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--database-url', default=None,
+                        help='scratch database to use; defaults to a temporary SQLite file')
+    args = parser.parse_args()
+
+    url = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app.config['SQLALCHEMY_DATABASE_URI'] = url
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        drop_indexes()
+        venues, artists, areas = seed(args.shows, args.seed)
+        params = {
+            'venue_id': venues // 2 or 1, 'artist_id': artists // 2 or 1,
+            'city': areas[0][0], 'state': areas[0][1], 'now': datetime.now(),
+        }
+
+        before = run('without indexes', params, args.repeat)
+        create_indexes()
+        after = run('with indexes', params, args.repeat)
+
+        print('\n=== summary (%d shows, %d venues, %d artists) ===' % (args.shows, venues, artists))
+        for name in QUERIES:
+            print('%-24s %10.3f ms -> %10.3f ms' % (name, before[name], after[name]))
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
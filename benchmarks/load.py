@@ -0,0 +1,257 @@
+#----------------------------------------------------------------------------#
+# Concurrent load test.
+#
+# N simulated users each pick a weighted random task (browse venues, open an
+# artist, search, list shows, add a show, ...) in a loop for --duration
+# seconds, then the script prints requests/s and p50/p95/p99 latency per
+# endpoint and optionally writes them as JSON.
+#
+# Without --url it runs fully offline: it generates a synthetic SQLite
+# database (see synthetic.py) and drives the app in-process through the Flask
+# test client. With --url it drives a running server over HTTP instead.
+#
+#   python benchmarks/load.py --users 8 --duration 30 --json load.json
+#   python benchmarks/load.py --url http://localhost:5000 --users 32 --no-writes
+#   python benchmarks/load.py --baseline load.json --max-regression 20
+#
+# With --baseline, the run exits non-zero if any endpoint's p95 is more than
+# --max-regression percent slower than in the baseline file.
+#----------------------------------------------------------------------------#
+
+import argparse
+import http.cookiejar
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+#----------------------------------------------------------------------------#
+# Clients.
+#----------------------------------------------------------------------------#
+
+# One per simulated user. request() returns (status code, body bytes).
+class InProcessClient:
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None):
+        response = self.client.open(path, method=method, data=data)
+        return response.status_code, response.get_data()
+
+
+class HTTPClient:
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        # Keeps the session cookie, like a browser would.
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data, doseq=True).encode() if data is not None else None
+        request = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+#----------------------------------------------------------------------------#
+# Tasks.
+#----------------------------------------------------------------------------#
+
+SEARCH_TERMS = ['Hop', 'band', 'Live', 'Jazz', 'San Francisco, CA', 'Velvet', 'Moon', 'o']
+
+# (name, weight, function(rng, ids) -> (method, path, form data)). The name
+# is what results are grouped by, so ids stay out of it.
+def tasks(writes):
+    read = [
+        ('GET /', 2, lambda rng, ids: ('GET', '/', None)),
+        ('GET /venues', 10, lambda rng, ids: ('GET', '/venues', None)),
+        ('GET /venues/<id>', 15, lambda rng, ids: ('GET', '/venues/%d' % rng.choice(ids['venues']), None)),
+        ('POST /venues/search', 5, lambda rng, ids: (
+            'POST', '/venues/search', {'search_term': rng.choice(SEARCH_TERMS)})),
+        ('GET /artists', 10, lambda rng, ids: ('GET', '/artists', None)),
+        ('GET /artists/<id>', 15, lambda rng, ids: ('GET', '/artists/%d' % rng.choice(ids['artists']), None)),
+        ('POST /artists/search', 5, lambda rng, ids: (
+            'POST', '/artists/search', {'search_term': rng.choice(SEARCH_TERMS)})),
+        ('GET /shows', 10, lambda rng, ids: ('GET', '/shows', None)),
+        ('GET /genres', 3, lambda rng, ids: ('GET', '/genres', None)),
+        ('GET /autocomplete', 10, lambda rng, ids: (
+            'GET', '/autocomplete?q=' + rng.choice(SEARCH_TERMS)[:rng.randint(1, 3)], None)),
+        ('GET /api/v1/shows', 5, lambda rng, ids: ('GET', '/api/v1/shows?upcoming=1', None)),
+    ]
+    if not writes:
+        return read
+    return read + [
+        ('POST /shows/create', 2, lambda rng, ids: ('POST', '/shows/create', {
+            'artist_id': str(rng.choice(ids['artists'])),
+            'venue_id': str(rng.choice(ids['venues'])),
+            'start_time': (datetime.now() + timedelta(hours=rng.randint(1, 24 * 180))).strftime('%Y-%m-%d %H:%M:00'),
+        })),
+    ]
+
+# Venue and artist ids to pick from, read through the JSON API so the same
+# code works in-process and against a remote server.
+def discover_ids(client, limit=500):
+    ids = {}
+    for kind in ('venues', 'artists'):
+        status, body = client.request('GET', '/api/v1/%s?fields=id&limit=%d' % (kind, limit))
+        if status != 200:
+            raise SystemExit('GET /api/v1/%s returned %d' % (kind, status))
+        ids[kind] = [record['id'] for record in json.loads(body)['data']]
+        if not ids[kind]:
+            raise SystemExit('No %s to load-test against' % kind)
+    return ids
+
+#----------------------------------------------------------------------------#
+# Running and reporting.
+#----------------------------------------------------------------------------#
+
+def user(client, task_list, ids, seed, deadline, samples, lock):
+    rng = random.Random(seed)
+    names = [task[0] for task in task_list]
+    weights = [task[1] for task in task_list]
+    functions = {task[0]: task[2] for task in task_list}
+    local = []
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        method, path, data = functions[name](rng, ids)
+        start = time.perf_counter()
+        try:
+            status, _ = client.request(method, path, data)
+        except Exception:
+            status = 0
+        local.append((name, (time.perf_counter() - start) * 1000, status < 400 and status != 0))
+    with lock:
+        samples.extend(local)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+def summarize(samples, elapsed):
+    groups = {}
+    for name, ms, ok in samples:
+        groups.setdefault(name, []).append((ms, ok))
+    groups['TOTAL'] = [(ms, ok) for _, ms, ok in samples]
+
+    results = {}
+    for name, values in groups.items():
+        latencies = sorted(ms for ms, _ in values)
+        results[name] = {
+            'requests': len(values),
+            'failures': sum(1 for _, ok in values if not ok),
+            'rps': round(len(values) / elapsed, 2),
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+        }
+    return results
+
+
+def print_table(results):
+    print('%-24s %9s %9s %9s %10s %10s %10s' % ('endpoint', 'requests', 'failures', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms'))
+    for name in sorted(results, key=lambda name: (name == 'TOTAL', name)):
+        row = results[name]
+        print('%-24s %9d %9d %9.1f %10.2f %10.2f %10.2f' % (
+            name, row['requests'], row['failures'], row['rps'], row['p50_ms'], row['p95_ms'], row['p99_ms']))
+
+# Endpoints whose p95 grew by more than max_regression percent.
+def regressions(results, baseline, max_regression):
+    slower = []
+    for name, row in results.items():
+        before = baseline.get('endpoints', {}).get(name)
+        if before and before['p95_ms'] and row['p95_ms'] > before['p95_ms'] * (1 + max_regression / 100.0):
+            slower.append((name, before['p95_ms'], row['p95_ms']))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent load test for Fyyur.')
+    parser.add_argument('--url', default=None,
+                        help='server to load; defaults to the app in-process on a synthetic SQLite database')
+    parser.add_argument('--shows', type=int, default=10000,
+                        help='size of the synthetic data set (in-process only)')
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-writes', dest='writes', action='store_false',
+                        help='only run read-only tasks')
+    parser.add_argument('--json', default=None, help='write the results to this file')
+    parser.add_argument('--baseline', default=None, help='results file from an earlier run to compare with')
+    parser.add_argument('--max-regression', type=float, default=20.0,
+                        help='allowed p95 slowdown against --baseline, in percent')
+    args = parser.parse_args()
+
+    if args.url:
+        make_client = lambda: HTTPClient(args.url)
+        target = args.url
+    else:
+        from app import create_app
+        from config import engine_options
+        from models import db
+        from synthetic import generate
+        app = create_app()
+        target = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'load.db')
+        app.config.update(SQLALCHEMY_DATABASE_URI=target, SQLALCHEMY_ENGINE_OPTIONS=engine_options(target),
+                          SQLALCHEMY_BINDS={}, WTF_CSRF_ENABLED=False)
+        with app.app_context():
+            db.create_all()
+            generate(args.shows, seed=args.seed)
+        make_client = lambda: InProcessClient(app)
+
+    ids = discover_ids(make_client())
+    task_list = tasks(args.writes)
+    samples, lock = [], threading.Lock()
+    start = time.perf_counter()
+    deadline = start + args.duration
+    users = [threading.Thread(target=user, args=(make_client(), task_list, ids, args.seed + i, deadline, samples, lock))
+             for i in range(args.users)]
+    for thread in users:
+        thread.start()
+    for thread in users:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    results = summarize(samples, elapsed)
+    print('%d users for %.1f s against %s' % (args.users, elapsed, target))
+    print_table(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'meta': {
+                    'target': target, 'users': args.users, 'duration_s': round(elapsed, 2),
+                    'shows': None if args.url else args.shows, 'writes': args.writes, 'seed': args.seed,
+                    'python': platform.python_version(), 'started_at': datetime.now().isoformat(timespec='seconds'),
+                },
+                'endpoints': results,
+            }, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(results, json.load(f), args.max_regression)
+        for name, before, after in slower:
+            print('REGRESSION %s: p95 %.2f ms -> %.2f ms' % (name, before, after))
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
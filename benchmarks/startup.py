@@ -0,0 +1,149 @@
+#----------------------------------------------------------------------------#
+# Cold-start benchmark.
+#
+# Starts a fresh interpreter --runs times and, in each, imports `app` under
+# `python -X importtime`, builds the app with create_app() and loads every
+# template through the Jinja environment, the way a new worker does before
+# its first response. It then prints the median of each step and the direct
+# imports of `app` that cost the most, and optionally writes them as JSON.
+#
+#   python benchmarks/startup.py --runs 10 --json startup.json
+#   python benchmarks/startup.py --baseline startup.json --max-regression 20
+#
+# With --baseline, the run exits non-zero if any step's median is more than
+# --max-regression percent slower than in the baseline file. The first
+# --warmup runs are discarded; they write the .pyc files and the template
+# bytecode cache that every later worker starts from.
+#----------------------------------------------------------------------------#
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child. Prints the timings of the steps after the import as
+# JSON; the import itself is read from the -X importtime report.
+CHILD = '''
+import json, time
+import app
+start = time.perf_counter()
+application = app.create_app()
+built = time.perf_counter()
+for name in application.jinja_env.list_templates(extensions=['html']):
+    application.jinja_env.get_template(name)
+loaded = time.perf_counter()
+print(json.dumps({'create_app_ms': (built - start) * 1000, 'templates_ms': (loaded - built) * 1000}))
+'''
+
+STEPS = ('process_ms', 'import_ms', 'create_app_ms', 'templates_ms')
+
+#----------------------------------------------------------------------------#
+# Measuring.
+#----------------------------------------------------------------------------#
+
+# Parses `-X importtime` output into {top-level module: (cumulative us,
+# {direct import: cumulative us})}. A module's imports are reported before
+# it, one level deeper.
+def parse_importtime(stderr):
+    modules, children = {}, {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        module = name[1:]
+        depth = (len(module) - len(module.lstrip(' '))) // 2
+        if depth == 0:
+            modules[module.strip()] = (int(cumulative), children)
+            children = {}
+        elif depth == 1:
+            children[module.strip()] = int(cumulative)
+    return modules
+
+
+def run_once():
+    start = time.perf_counter()
+    child = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD], cwd=ROOT,
+                           stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    if child.returncode:
+        sys.exit('The app failed to start:\n' + child.stderr[-2000:])
+    cumulative, imports = parse_importtime(child.stderr)['app']
+    result = json.loads(child.stdout.strip().splitlines()[-1])
+    result['process_ms'] = elapsed
+    result['import_ms'] = cumulative / 1000.0
+    # Direct imports of app, which is where a slow import can be deferred.
+    result['imports'] = {module: us / 1000.0 for module, us in imports.items()}
+    return result
+
+
+def summarize(runs, top):
+    steps = {step: round(statistics.median(run[step] for run in runs), 2) for step in STEPS}
+    modules = {module for run in runs for module in run['imports']}
+    imports = {module: round(statistics.median(run['imports'].get(module, 0.0) for run in runs), 2)
+               for module in modules}
+    slowest = sorted(imports.items(), key=lambda item: -item[1])[:top]
+    return steps, dict(slowest)
+
+# Steps whose median grew by more than max_regression percent.
+def regressions(steps, baseline, max_regression):
+    slower = []
+    for step, after in steps.items():
+        before = baseline.get('steps', {}).get(step)
+        if before and after > before * (1 + max_regression / 100.0):
+            slower.append((step, before, after))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold-start benchmark for Fyyur.')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=1, help='runs to discard first')
+    parser.add_argument('--top', type=int, default=10, help='how many of the slowest imports to list')
+    parser.add_argument('--json', default=None, help='write the results to this file')
+    parser.add_argument('--baseline', default=None, help='results file from an earlier run to compare with')
+    parser.add_argument('--max-regression', type=float, default=20.0,
+                        help='allowed slowdown against --baseline, in percent')
+    args = parser.parse_args()
+
+    for _ in range(args.warmup):
+        run_once()
+    runs = [run_once() for _ in range(args.runs)]
+    steps, slowest = summarize(runs, args.top)
+
+    print('median of %d cold starts' % args.runs)
+    for step in STEPS:
+        print('%-16s %10.2f ms' % (step, steps[step]))
+    print()
+    print('slowest imports of app (cumulative)')
+    for module, ms in slowest.items():
+        print('%-32s %10.2f ms' % (module, ms))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'meta': {
+                    'runs': args.runs, 'warmup': args.warmup,
+                    'python': platform.python_version(), 'started_at': datetime.now().isoformat(timespec='seconds'),
+                },
+                'steps': steps,
+                'imports': slowest,
+            }, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(steps, json.load(f), args.max_regression)
+        for step, before, after in slower:
+            print('REGRESSION %s: %.2f ms -> %.2f ms' % (step, before, after))
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
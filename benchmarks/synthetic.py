@@ -0,0 +1,162 @@
+#----------------------------------------------------------------------------#
+# Synthetic data generator.
+#
+# Fills an empty database with a reproducible set of venues, artists and
+# shows: the same --seed always gives the same rows. Venues and artists scale
+# with the number of shows (one venue per 100 shows, one artist per 50), get
+# one to three genres each, and shows spread over the past five years and the
+# next six months, so every page has both upcoming and past data.
+#
+#   python benchmarks/synthetic.py --shows 100000 --reset
+#   python benchmarks/synthetic.py --shows 1000000 --database-url postgresql://localhost/fyyur_bench
+#
+# The route benchmarks and load script import generate() from here.
+#----------------------------------------------------------------------------#
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, text
+
+import counters
+from forms import GENRES
+from models import db, Venue, Artist, Show, Genre, venue_genres, artist_genres
+
+WORDS = [
+    'Musical', 'Hop', 'Park', 'Square', 'Live', 'Dueling', 'Pianos', 'Wild',
+    'Sax', 'Band', 'Guns', 'Petals', 'Coffee', 'Blue', 'Velvet', 'Lounge',
+    'Echo', 'Room', 'Golden', 'Hall', 'Night', 'Owl', 'Red', 'Barn', 'Moon',
+    'River', 'Stage', 'Basement', 'Electric', 'Garden',
+]
+CITIES = [
+    ('San Francisco', 'CA'), ('New York', 'NY'), ('Austin', 'TX'), ('Chicago', 'IL'),
+    ('Seattle', 'WA'), ('Nashville', 'TN'), ('New Orleans', 'LA'), ('Denver', 'CO'),
+    ('Portland', 'OR'), ('Atlanta', 'GA'), ('Boston', 'MA'), ('Detroit', 'MI'),
+]
+
+# Every generated show starts on the hour, between five years ago and six
+# months from `now`.
+PAST_HOURS = 24 * 365 * 5
+FUTURE_HOURS = 24 * 180
+
+
+def _name(rng, index, words=2):
+    return '%s %d' % (' '.join(rng.choice(WORDS) for _ in range(words)), index)
+
+
+def _insert(table, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(table.insert(), rows[start:start + batch_size])
+
+
+# Postgres sequences do not see explicit ids; move them past the new rows so
+# the app can keep inserting.
+def _reset_sequences():
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for table in ('Genre', 'Venue', 'Artist', 'Show'):
+        db.session.execute(text(
+            "SELECT setval(pg_get_serial_sequence('\"%s\"', 'id'), coalesce(max(id), 1)) FROM \"%s\""
+            % (table, table)))
+
+
+# Inserts the data set into empty tables and returns how much of each kind was
+# written. Must run inside an app context.
+def generate(shows=10000, seed=1, now=None, batch_size=10000):
+    if db.session.query(func.count(Venue.id)).scalar():
+        raise RuntimeError('generate() needs empty tables; use --reset')
+    if now is None:
+        now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    rng = random.Random(seed)
+    num_venues = max(10, shows // 100)
+    num_artists = max(10, shows // 50)
+
+    genre_ids = {name: i + 1 for i, name in enumerate(GENRES)}
+    _insert(Genre.__table__, [{'id': genre_id, 'name': name} for name, genre_id in genre_ids.items()], batch_size)
+
+    def entities(count, id_column):
+        rows, links = [], []
+        for i in range(count):
+            city, state = rng.choice(CITIES)
+            genres = rng.sample(GENRES, rng.randint(1, 3))
+            rows.append({
+                'id': i + 1, 'city': city, 'state': state,
+                'phone': '%03d-%03d-%04d' % (rng.randint(200, 999), rng.randint(200, 999), rng.randint(0, 9999)),
+                'image_link': 'https://example.com/images/%d.png' % rng.randint(1, 1000),
+                'facebook_link': 'https://www.facebook.com/%d' % (i + 1),
+                'website_link': 'https://example.com/%d' % (i + 1),
+                'seeking_description': None,
+                '_genres': genres,
+            })
+            links.extend({id_column: i + 1, 'genre_id': genre_ids[name]} for name in genres)
+        return rows, links
+
+    venues, venue_links = entities(num_venues, 'venue_id')
+    for i, row in enumerate(venues):
+        row.update(name='The ' + _name(rng, i + 1), address='%d Main St' % rng.randint(1, 9999),
+                   genre=','.join(row.pop('_genres')), seeking_talent=rng.random() < 0.3)
+    artists, artist_links = entities(num_artists, 'artist_id')
+    for i, row in enumerate(artists):
+        row.update(name=_name(rng, i + 1, words=rng.randint(1, 3)),
+                   genres=','.join(row.pop('_genres')), seeking_venue=rng.random() < 0.3)
+
+    _insert(Venue.__table__, venues, batch_size)
+    _insert(Artist.__table__, artists, batch_size)
+    _insert(venue_genres, venue_links, batch_size)
+    _insert(artist_genres, artist_links, batch_size)
+
+    batch = []
+    for i in range(shows):
+        batch.append({
+            'id': i + 1,
+            'venue_id': rng.randint(1, num_venues),
+            'artist_id': rng.randint(1, num_artists),
+            'start_time': now + timedelta(hours=rng.randint(-PAST_HOURS, FUTURE_HOURS)),
+        })
+        if len(batch) == batch_size:
+            _insert(Show.__table__, batch, batch_size)
+            batch = []
+    _insert(Show.__table__, batch, batch_size)
+
+    _reset_sequences()
+    counters.recount()
+    db.session.commit()
+    return {'genres': len(genre_ids), 'venues': num_venues, 'artists': num_artists, 'shows': shows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Fyyur data set.')
+    parser.add_argument('--shows', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--database-url', default=None,
+                        help='database to fill; defaults to DATABASE_URL / config.py')
+    parser.add_argument('--reset', action='store_true',
+                        help='drop and recreate all tables first')
+    args = parser.parse_args()
+
+    from app import create_app
+    from config import engine_options
+    app = create_app()
+    if args.database_url:
+        app.config['SQLALCHEMY_DATABASE_URI'] = args.database_url
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(args.database_url)
+
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+            db.create_all()
+        start = time.perf_counter()
+        written = generate(args.shows, args.seed, batch_size=args.batch_size)
+        print('Generated %(genres)d genres, %(venues)d venues, %(artists)d artists, %(shows)d shows' % written,
+              'in %.1f s' % (time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
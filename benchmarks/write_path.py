@@ -0,0 +1,176 @@
+#----------------------------------------------------------------------------#
+# Write-path benchmark.
+#
+# Runs each form write (create/edit venue, create/edit artist, create show)
+# N times against a synthetic database, once the way the handlers used to do
+# it (ORM add, commit, refresh; Query.get before an edit) and once through
+# writes.py, and prints writes/s, median latency and statements per write
+# for both.
+#
+#   python benchmarks/write_path.py --writes 2000
+#   python benchmarks/write_path.py --database-url postgresql://localhost/fyyur_bench --shows 100000
+#
+# Statement counts include the data-version and counter updates but not
+# BEGIN/COMMIT; round trips per write are the count plus one for the commit.
+#----------------------------------------------------------------------------#
+
+import argparse
+import itertools
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from werkzeug.datastructures import MultiDict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+
+import counters
+import writes
+from app import create_app
+from forms import VenueForm, ArtistForm, ShowForm
+from models import db, Venue, Artist, Show, Genre
+from synthetic import generate
+
+app = create_app()
+
+
+def venue_data(i):
+    return MultiDict([
+        ('name', 'Bench Venue %d' % i), ('city', 'Austin'), ('state', 'TX'), ('address', '1 Main St'),
+        ('phone', '512-555-0100'), ('genre', 'Jazz'), ('genre', 'Blues'),
+        ('image_link', 'https://example.com/v.png'), ('facebook_link', 'https://www.facebook.com/v'),
+        ('website_link', 'https://example.com/v'), ('seeking_description', ''),
+    ])
+
+
+def artist_data(i):
+    return MultiDict([
+        ('name', 'Bench Artist %d' % i), ('city', 'Austin'), ('state', 'TX'), ('phone', '512-555-0100'),
+        ('genres', 'Jazz'), ('image_link', 'https://example.com/a.png'),
+        ('facebook_link', 'https://www.facebook.com/a'), ('website_link', 'https://example.com/a'),
+        ('seeking_description', ''),
+    ])
+
+
+# Slots far past the synthetic shows; the two paths use different ones.
+_slots = itertools.count()
+
+
+def show_data(i):
+    start_time = datetime(2100, 1, 1) + timedelta(hours=4 * next(_slots))
+    return MultiDict([('artist_id', '3'), ('venue_id', '3'), ('start_time', start_time.strftime('%Y-%m-%d %H:%M'))])
+
+#----------------------------------------------------------------------------#
+# The previous handlers.
+#----------------------------------------------------------------------------#
+
+def _fill(entity, form):
+    record, genres = (writes.venue_record if isinstance(entity, Venue) else writes.artist_record)(form)
+    for key, value in record.items():
+        setattr(entity, key, value)
+    entity.genre_tags = Genre.lookup(genres)
+
+
+def orm_create(model, form):
+    entity = model()
+    _fill(entity, form)
+    db.session.add(entity)
+    db.session.commit()
+    db.session.refresh(entity)
+    return entity.id
+
+
+def orm_update(model, entity_id, form):
+    entity = model.query.get(entity_id)
+    _fill(entity, form)
+    db.session.add(entity)
+    db.session.commit()
+    db.session.refresh(entity)
+
+
+def orm_create_show(form):
+    show = Show(**writes.show_record(form))
+    db.session.add(show)
+    counters.show_added(show)
+    db.session.commit()
+    db.session.refresh(show)
+
+#----------------------------------------------------------------------------#
+# Driver.
+#----------------------------------------------------------------------------#
+
+CASES = [
+    ('create venue', VenueForm, venue_data,
+     lambda form: orm_create(Venue, form), writes.create_venue),
+    ('edit venue', VenueForm, venue_data,
+     lambda form: orm_update(Venue, 2, form), lambda form: writes.update_venue(2, form)),
+    ('create artist', ArtistForm, artist_data,
+     lambda form: orm_create(Artist, form), writes.create_artist),
+    ('edit artist', ArtistForm, artist_data,
+     lambda form: orm_update(Artist, 2, form), lambda form: writes.update_artist(2, form)),
+    ('create show', ShowForm, show_data, orm_create_show, writes.create_show),
+]
+
+
+def run(form_class, data, write, count, statements):
+    timings, executed = [], 0
+    for i in range(count):
+        with app.test_request_context(method='POST'):
+            form = form_class(formdata=data(i), meta={'csrf': False})
+            if not form.validate():
+                raise SystemExit('Benchmark form does not validate: %s' % writes.form_errors(form))
+            statements[0] = 0
+            start = time.perf_counter()
+            write(form)
+            timings.append((time.perf_counter() - start) * 1000)
+            executed += statements[0]
+            db.session.remove()
+    return {
+        'writes_per_s': count / (sum(timings) / 1000),
+        'median_ms': statistics.median(timings),
+        'statements': executed / count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the ORM and writes.py write paths.')
+    parser.add_argument('--writes', type=int, default=500, help='writes per case and path')
+    parser.add_argument('--shows', type=int, default=10000)
+    parser.add_argument('--database-url', default=None,
+                        help='scratch database to use; defaults to a temporary SQLite file')
+    args = parser.parse_args()
+
+    url = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app.config.update(SQLALCHEMY_DATABASE_URI=url, SQLALCHEMY_BINDS={})
+    statements = [0]
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        generate(args.shows, seed=1)
+
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def count(conn, cursor, statement, parameters, context, executemany):
+            if statement not in ('BEGIN', 'COMMIT'):
+                statements[0] += 1
+
+        print('%-14s %8s %12s %10s %8s %12s %10s' % (
+            'case', 'orm w/s', 'orm ms p50', 'orm stmts', 'new w/s', 'new ms p50', 'new stmts'))
+        for name, form_class, data, orm_write, new_write in CASES:
+            before = run(form_class, data, orm_write, args.writes, statements)
+            after = run(form_class, data, new_write, args.writes, statements)
+            print('%-14s %8.0f %12.3f %10.1f %8.0f %12.3f %10.1f' % (
+                name, before['writes_per_s'], before['median_ms'], before['statements'],
+                after['writes_per_s'], after['median_ms'], after['statements']))
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import g, request, session, make_response
+
+#----------------------------------------------------------------------------#
+# Backends.
+#----------------------------------------------------------------------------#
+
+# Storage used by ResponseCache. Values are rendered page bodies; counters
+# hold the per-namespace generations and must never be evicted, otherwise a
+# namespace could fall back to an older generation and serve stale pages.
+class CacheBackend:
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def get_counter(self, key):
+        raise NotImplementedError
+
+    def incr(self, key):
+        raise NotImplementedError
+
+
+# In-process LRU with a per-entry TTL. One per worker process.
+class LRUCache(CacheBackend):
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared backend for any client speaking the Redis get/set/incr commands,
+# e.g. redis.Redis or a local stand-in with the same methods.
+class RedisBackend(CacheBackend):
+
+    def __init__(self, client, prefix='fyyur:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        import redis
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return value
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def get_counter(self, key):
+        value = self.client.get(self.prefix + 'counter:' + key)
+        return int(value) if value is not None else 0
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + 'counter:' + key)
+
+#----------------------------------------------------------------------------#
+# Response cache.
+#----------------------------------------------------------------------------#
+
+# Caches rendered GET pages. Every cached view belongs to a namespace such as
+# 'venues' or 'venue:3'; invalidating a namespace bumps its generation, which
+# changes the key of every page in it, so writes drop exactly those pages.
+class ResponseCache:
+
+    def __init__(self, app=None, backend=None):
+        self.backend = backend
+        self.ttl = 60
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('CACHE_DEFAULT_TTL', 60)
+        self.enabled = app.config.get('CACHE_ENABLED', True)
+        if self.backend is None:
+            if app.config.get('CACHE_TYPE', 'memory') == 'redis':
+                self.backend = RedisBackend.from_url(app.config['CACHE_REDIS_URL'])
+            else:
+                self.backend = LRUCache(app.config.get('CACHE_MAX_ENTRIES', 1024))
+        app.extensions['response_cache'] = self
+
+    # Pages behind @versions.conditional also carry the data stamp, so a
+    # write from any other process makes their old entries unreachable.
+    def _key(self, namespace):
+        generation = self.backend.get_counter('gen:' + namespace)
+        # Pages behind @versions.varies_by_day also carry the day.
+        path = g.get('page_day', '') + request.full_path
+        stamp = g.get('data_version')
+        if stamp:
+            return 'page:%s:%d:%s:%s' % (namespace, generation, stamp, path)
+        return 'page:%s:%d:%s' % (namespace, generation, path)
+
+    def _count(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    # Decorator for a view. `namespace` is formatted with the view arguments,
+    # e.g. @response_cache.cached('venue:{venue_id}').
+    def cached(self, namespace):
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                # Pages carrying flash messages are one-offs for that user.
+                if not self.enabled or request.method != 'GET' or session.get('_flashes'):
+                    return f(*args, **kwargs)
+
+                key = self._key(namespace.format(**kwargs))
+                body = self.backend.get(key)
+                if body is not None:
+                    self._count(True)
+                    response = make_response(body)
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                self._count(False)
+                response = make_response(f(*args, **kwargs))
+                if response.status_code == 200 and not response.is_streamed:
+                    self.backend.set(key, response.get_data(as_text=True), self.ttl)
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+    def invalidate(self, *namespaces):
+        for namespace in set(namespaces):
+            self.backend.incr('gen:' + namespace)
+
+    def stats(self):
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else 0.0,
+        }
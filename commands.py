@@ -0,0 +1,164 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from datetime import date, datetime
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+import counters
+import partitions
+from extensions import response_cache, static_assets
+from models import db
+
+#----------------------------------------------------------------------------#
+# Commands.
+#
+# Registered on the app by create_app(); run them as `flask <command>`.
+#----------------------------------------------------------------------------#
+
+@click.command('import')
+@with_appcontext
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--kind', type=click.Choice(['venue', 'artist', 'show']), required=True,
+              help='What each row describes.')
+@click.option('--chunk-size', type=int, default=None,
+              help='Rows validated and inserted per transaction.')
+def import_command(path, kind, chunk_size):
+    """Bulk import venues, artists or shows from a CSV or NDJSON file."""
+    from importer import Importer, read_rows
+
+    chunk_size = chunk_size or current_app.config['IMPORT_CHUNK_SIZE']
+    importer = Importer(kind, chunk_size=chunk_size, log=lambda message: click.echo(message, err=True))
+    inserted, errors = importer.run(read_rows(path))
+    click.echo('Imported %d %ss, %d rows rejected.' % (inserted, kind, len(errors)))
+
+@click.command('recount')
+@with_appcontext
+def recount_command():
+    """Rebuild the venue and artist show counters from the Show table."""
+    updated = counters.recount()
+    db.session.commit()
+    response_cache.invalidate('venues', 'artists')
+    click.echo('Recounted %d venues and artists.' % updated)
+
+@click.command('roll-forward')
+@with_appcontext
+def roll_forward_command():
+    """Move shows that have started from upcoming to past in the counters.
+
+    Run it every few minutes, e.g. from cron.
+    """
+    updated = counters.roll_forward()
+    db.session.commit()
+    if updated:
+        response_cache.invalidate('venues', 'artists')
+    click.echo('Rolled forward %d venues and artists.' % updated)
+
+def _month(value, option):
+    try:
+        return datetime.strptime(value, '%Y-%m').date()
+    except ValueError:
+        raise click.BadParameter('expected YYYY-MM, e.g. 2024-01', param_hint=option)
+
+@click.group('shows', cls=AppGroup)
+def shows_command():
+    """Maintain the Show table: month partitions (PostgreSQL) and archiving."""
+
+@shows_command.command('partitions')
+@click.option('--ahead', type=int, default=None,
+              help='Months ahead of this one to have partitions for.')
+@click.option('--since', default=None, help='First month (YYYY-MM) to create; this month by default.')
+def shows_partitions_command(ahead, since):
+    """Create the missing month partitions, moving their shows out of the
+    default partition.
+
+    Run it monthly, e.g. from cron, so new shows never land in the default
+    partition.
+    """
+    this_month = partitions.month_start(date.today())
+    first = _month(since, '--since') if since else this_month
+    last = partitions.add_months(this_month, current_app.config['SHOW_PARTITIONS_AHEAD'] if ahead is None else ahead)
+    try:
+        created = partitions.ensure_partitions(first, last)
+    except partitions.PartitionError as e:
+        raise click.ClickException(str(e))
+    for name, moved in created:
+        click.echo('Created %s (%d shows moved from the default partition).' % (name, moved))
+    click.echo('%d partitions created.' % len(created))
+
+@shows_command.command('archive')
+@click.option('--before', required=True, help='Archive every month before this one (YYYY-MM).')
+@click.option('--to', 'directory', type=click.Path(file_okay=False), default=None,
+              help='Directory for the gzipped NDJSON files; SHOW_ARCHIVE_DIR by default.')
+def shows_archive_command(before, directory):
+    """Move old shows to compressed files, a month per file, and drop them
+    from the database.
+
+    Restore a month with `flask import <file> --kind show`.
+    """
+    before = _month(before, '--before')
+    if before > partitions.month_start(date.today()):
+        raise click.BadParameter('cannot archive the current month or later', param_hint='--before')
+    try:
+        total = partitions.archive(before, directory or current_app.config['SHOW_ARCHIVE_DIR'],
+                                   log=lambda message: click.echo(message, err=True))
+    except partitions.PartitionError as e:
+        raise click.ClickException(str(e))
+    if total:
+        response_cache.invalidate('shows', 'venues', 'artists', 'genres')
+    click.echo('Archived %d shows.' % total)
+
+@click.group('assets', cls=AppGroup)
+def assets_command():
+    """Build the fingerprinted CSS/JS bundles served from static/dist."""
+
+@assets_command.command('build')
+def assets_build_command():
+    """Concatenate, minify, fingerprint and precompress the bundles."""
+    manifest = static_assets.build()
+    for name, filename in sorted(manifest.items()):
+        click.echo('%s -> %s/%s' % (name, static_assets.dist_folder, filename))
+
+@assets_command.command('clean')
+def assets_clean_command():
+    """Remove every built bundle; pages fall back to the source files."""
+    static_assets.clean()
+    click.echo('Removed %s.' % static_assets.dist_folder)
+
+@click.group('templates', cls=AppGroup)
+def templates_command():
+    """Manage the compiled-template cache (JINJA_BYTECODE_CACHE_DIR)."""
+
+@templates_command.command('compile')
+def templates_compile_command():
+    """Compile every template into the bytecode cache.
+
+    Run it on deploy, after `flask assets build`, so no worker compiles a
+    template on its first request. Fails on the first template with a
+    syntax error.
+    """
+    environment = current_app.jinja_env
+    if environment.bytecode_cache is None:
+        raise click.ClickException('JINJA_BYTECODE_CACHE_DIR is not set.')
+    names = environment.list_templates(extensions=['html'])
+    for name in names:
+        environment.get_template(name)
+    click.echo('Compiled %d templates into %s.' % (len(names), current_app.config['JINJA_BYTECODE_CACHE_DIR']))
+
+@templates_command.command('clean')
+def templates_clean_command():
+    """Empty the bytecode cache; templates are compiled again on first use."""
+    if current_app.jinja_env.bytecode_cache is not None:
+        current_app.jinja_env.bytecode_cache.clear()
+    click.echo('Cleared the template cache.')
+
+
+COMMANDS = [
+    import_command,
+    recount_command,
+    roll_forward_command,
+    shows_command,
+    assets_command,
+    templates_command,
+]
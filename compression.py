@@ -0,0 +1,187 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import hashlib
+import zlib
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header, parse_etags, quote_etag, unquote_etag
+
+# Optional: brotli for clients that accept it; gzip otherwise.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+#----------------------------------------------------------------------------#
+# Compression and conditional GET middleware.
+#
+#   app.wsgi_app = CompressionMiddleware(app.wsgi_app)
+#
+# Bodies of a known length up to `buffer_size` are compressed in one go and,
+# for GETs without an ETag of their own, get a weak ETag hashed from the
+# content; a matching If-None-Match turns the response into a 304. Larger
+# and streamed bodies (NDJSON exports, streamed templates) are compressed
+# chunk by chunk as they are produced, with a sync flush after each chunk so
+# the client can start on them straight away.
+#
+# Pages decorated with @versions.conditional already carry a data-version
+# ETag and answer 304 before rendering; this layer leaves those alone.
+#----------------------------------------------------------------------------#
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/javascript', 'application/x-ndjson',
+    'application/xml', 'image/svg+xml',
+}
+
+
+def _compressible(content_type):
+    mimetype = content_type.split(';', 1)[0].strip().lower()
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+
+
+class _Gzip:
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _Brotli:
+
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+
+    def __init__(self, app, min_size=500, buffer_size=256 * 1024, level=6, brotli_quality=4):
+        self.app = app
+        self.min_size = min_size
+        self.buffer_size = buffer_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+
+    def _encoding(self, environ):
+        accepted = parse_accept_header(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    def _compressor(self, encoding):
+        return _Brotli(self.brotli_quality) if encoding == 'br' else _Gzip(self.level)
+
+    def __call__(self, environ, start_response):
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return self.app(environ, start_response)
+
+        started = []
+        written = []
+
+        def capture(status, headers, exc_info=None):
+            if exc_info and started:
+                raise exc_info[1].with_traceback(exc_info[2])
+            started[:] = [status, headers]
+            return written.append
+
+        body = self.app(environ, capture)
+        return self._respond(environ, start_response, started, written, body)
+
+    def _respond(self, environ, start_response, started, written, body):
+        try:
+            chunks = iter(body)
+            # Apps that only call start_response once iterated.
+            if not started:
+                chunks = _prepend(next(chunks, b''), chunks)
+            status, headers = started[0], Headers(started[1])
+            chunks = _prepend(b''.join(written), chunks) if written else chunks
+
+            length = headers.get('Content-Length', type=int)
+            encoding = self._encoding(environ)
+            if not status.startswith('200') or 'Content-Encoding' in headers \
+                    or 'no-transform' in headers.get('Cache-Control', '') \
+                    or not _compressible(headers.get('Content-Type', '')):
+                start_response(status, headers.to_wsgi_list())
+                for chunk in chunks:
+                    yield chunk
+                return
+
+            _add_vary(headers)
+            if length is not None and length <= self.buffer_size:
+                data = b''.join(chunks)
+                if environ['REQUEST_METHOD'] == 'GET' and 'ETag' not in headers:
+                    etag = hashlib.sha1(data).hexdigest()[:20]
+                    headers['ETag'] = quote_etag(etag, weak=True)
+                    if parse_etags(environ.get('HTTP_IF_NONE_MATCH')).contains_weak(etag):
+                        for name in ('Content-Length', 'Content-Type'):
+                            headers.remove(name)
+                        start_response('304 NOT MODIFIED', headers.to_wsgi_list())
+                        return
+                if encoding and len(data) >= self.min_size:
+                    compressor = self._compressor(encoding)
+                    data = compressor.chunk(data) + compressor.finish()
+                    self._mark_encoded(headers, encoding)
+                    headers['Content-Length'] = str(len(data))
+                start_response(status, headers.to_wsgi_list())
+                yield data
+                return
+
+            if not encoding:
+                start_response(status, headers.to_wsgi_list())
+                for chunk in chunks:
+                    yield chunk
+                return
+
+            compressor = self._compressor(encoding)
+            self._mark_encoded(headers, encoding)
+            headers.remove('Content-Length')
+            start_response(status, headers.to_wsgi_list())
+            for chunk in chunks:
+                if chunk:
+                    yield compressor.chunk(chunk)
+            yield compressor.finish()
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+
+    # A compressed body is no longer byte-identical to the original, so any
+    # strong ETag becomes weak.
+    def _mark_encoded(self, headers, encoding):
+        headers['Content-Encoding'] = encoding
+        etag = headers.get('ETag')
+        if etag:
+            value, weak = unquote_etag(etag)
+            if not weak:
+                headers['ETag'] = quote_etag(value, weak=True)
+
+
+# Compressible responses vary by Accept-Encoding whether or not this one was
+# compressed, so a shared cache never hands a gzipped copy to a client that
+# did not ask for it.
+def _add_vary(headers):
+    vary = [value.strip() for value in headers.get('Vary', '').split(',') if value.strip()]
+    if 'accept-encoding' not in (value.lower() for value in vary):
+        vary.append('Accept-Encoding')
+        headers['Vary'] = ', '.join(vary)
+
+
+# Plain loops rather than `yield from`: closing a generator suspended in
+# `yield from` closes the inner iterator too, and _respond closes the body
+# itself, which would run its close callbacks twice.
+def _prepend(first, chunks):
+    yield first
+    for chunk in chunks:
+        yield chunk
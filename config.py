@@ -1,14 +1,188 @@
 import os
-SECRET_KEY = os.urandom(32)
+from pool import TimedQueuePool
 # Grabs the folder where the script runs.
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+def _env_flag(name, default):
+    value = os.environ.get(name)
+    return value.lower() in ('1', 'true', 'yes') if value not in (None, '') else default
+
+# Configuration profile: development, production or testing. Each profile
+# only changes defaults; every setting below can still be set from the
+# environment.
+FYYUR_ENV = os.environ.get('FYYUR_ENV', 'development')
+PROFILES = {
+    'development': {'debug': True, 'pool_size': 5, 'max_overflow': 5, 'statement_timeout_ms': 0},
+    'testing': {'debug': False, 'pool_size': 2, 'max_overflow': 0, 'statement_timeout_ms': 0},
+    'production': {'debug': False, 'pool_size': 10, 'max_overflow': 10, 'statement_timeout_ms': 5000},
+}
+if FYYUR_ENV not in PROFILES:
+    raise RuntimeError('Unknown FYYUR_ENV %r, expected one of %s' % (FYYUR_ENV, ', '.join(PROFILES)))
+_profile = PROFILES[FYYUR_ENV]
+
 # Enable debug mode.
-DEBUG = True
+DEBUG = _env_flag('FLASK_DEBUG', _profile['debug'])
+
+# The secret key must be the same in every worker process, otherwise sessions
+# and flash messages signed by one worker are rejected by the next.
+SECRET_KEY = os.environ.get('SECRET_KEY')
+if not SECRET_KEY:
+    if FYYUR_ENV == 'production':
+        raise RuntimeError('SECRET_KEY must be set in production')
+    SECRET_KEY = 'fyyur-' + FYYUR_ENV + '-not-secret'
 
 # Connect to the database
+SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'postgresql://busuyiomotosho@localhost:5432/fyyurapp')
+SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+# Connection pool, per worker process. With N gunicorn workers the database
+# sees up to N * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+DB_POOL_SIZE = _env_int('DB_POOL_SIZE', _profile['pool_size'])
+DB_MAX_OVERFLOW = _env_int('DB_MAX_OVERFLOW', _profile['max_overflow'])
+DB_POOL_TIMEOUT = _env_int('DB_POOL_TIMEOUT', 10)
+DB_POOL_RECYCLE = _env_int('DB_POOL_RECYCLE', 1800)
+DB_POOL_PRE_PING = _env_flag('DB_POOL_PRE_PING', True)
+DB_STATEMENT_TIMEOUT_MS = _env_int('DB_STATEMENT_TIMEOUT_MS', _profile['statement_timeout_ms'])
 
-# TODO IMPLEMENT DATABASE URL
-SQLALCHEMY_DATABASE_URI = 'postgresql://busuyiomotosho@localhost:5432/fyyurapp'
-SQLALCHEMY_TRACK_MODIFICATIONS = False
+# Engine options for a database URI. SQLite does not use a QueuePool, so it
+# gets none of the pool settings.
+def engine_options(uri):
+    if uri.startswith('sqlite'):
+        return {}
+    options = {
+        'poolclass': TimedQueuePool,
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': DB_POOL_PRE_PING,
+    }
+    if DB_STATEMENT_TIMEOUT_MS and uri.startswith('postgresql'):
+        options['connect_args'] = {'options': '-c statement_timeout=%d' % DB_STATEMENT_TIMEOUT_MS}
+    return options
+
+SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+
+# Read replicas, comma-separated. Read-only views query one of them (see
+# routing.py); a user who has just written stays on the primary for
+# REPLICA_STICKY_SECONDS so they see their own changes.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+SQLALCHEMY_BINDS = {'replica_%d' % i: url for i, url in enumerate(DATABASE_REPLICA_URLS)}
+REPLICA_STICKY_SECONDS = _env_int('REPLICA_STICKY_SECONDS', 5)
+
+# Async engine for the read-only endpoints in asgi.py. Defaults to the
+# primary database through its async driver (asyncpg, aiosqlite).
+ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')
+
+# Keyset pagination on /shows
+SHOWS_PER_PAGE = 30
+SHOWS_MAX_PER_PAGE = 100
+
+# Stream /venues, /artists and /shows from a server-side cursor while the
+# template renders (see streaming.py), instead of building the page in
+# memory. Streamed pages bypass the response cache but keep their ETags;
+# /shows then accepts ?limit= up to SHOWS_STREAM_MAX_PER_PAGE.
+STREAM_LISTINGS = _env_flag('STREAM_LISTINGS', False)
+STREAM_BATCH_SIZE = 500
+SHOWS_STREAM_MAX_PER_PAGE = 5000
+
+# Calendar views of /shows (?view=day|week|month, ?from=, ?to=) and the
+# /shows.ics feed: the longest range (days), the most shows listed, and the
+# feed's default range (days from today)
+CALENDAR_MAX_DAYS = 92
+CALENDAR_MAX_SHOWS = 1000
+CALENDAR_FEED_DAYS = 90
+CALENDAR_FEED_MAX_SHOWS = 5000
+
+# Maximum number of ranked results returned by the venue/artist search
+SEARCH_RESULTS_LIMIT = 50
+
+# /autocomplete suggestions per kind, and how old (seconds) a worker's name
+# index may get before it is rebuilt to pick up other workers' writes
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+AUTOCOMPLETE_MAX_AGE = 300
+
+# Upcoming/past shows listed per section on the venue and artist pages
+DETAIL_SHOWS_PER_PAGE = 12
+
+# /venues/<id>/availability: default and longest range (days), and the
+# shortest free slot it reports (minutes)
+AVAILABILITY_DAYS = 7
+AVAILABILITY_MAX_DAYS = 92
+AVAILABILITY_MIN_MINUTES = 60
+
+# Built CSS/JS bundles (`flask assets build`). Turn ASSETS_USE_BUNDLES off to
+# serve the source files while editing them.
+ASSETS_USE_BUNDLES = _env_flag('ASSETS_USE_BUNDLES', True)
+ASSETS_MAX_AGE = 31536000
+
+# Compiled templates cached on disk (`flask templates compile` fills it),
+# so new workers skip compiling them. Empty turns the cache off.
+JINJA_BYTECODE_CACHE_DIR = os.environ.get('JINJA_BYTECODE_CACHE_DIR', os.path.join(basedir, '.jinja-cache'))
+
+# Response compression (gzip, or brotli when installed) for bodies of at
+# least COMPRESS_MIN_SIZE bytes; bodies over COMPRESS_BUFFER_SIZE, or of
+# unknown length, are compressed as they stream
+COMPRESS_ENABLED = _env_flag('COMPRESS_ENABLED', True)
+COMPRESS_MIN_SIZE = 500
+COMPRESS_BUFFER_SIZE = 256 * 1024
+COMPRESS_LEVEL = 6
+COMPRESS_BROTLI_QUALITY = 4
+
+# ETags from the data_version stamp on the listing and detail pages (see
+# versions.py). Off in debug, where templates change without a data write.
+# Set ETAG_VERSION to the release id so a deploy invalidates old ETags.
+ETAG_DATA_VERSION = _env_flag('ETAG_DATA_VERSION', not DEBUG)
+ETAG_VERSION = os.environ.get('ETAG_VERSION', '')
+
+# Rendered-page cache for the listing and detail pages ('memory' or 'redis')
+CACHE_ENABLED = _env_flag('CACHE_ENABLED', True)
+CACHE_TYPE = 'memory'
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+CACHE_DEFAULT_TTL = 60
+CACHE_MAX_ENTRIES = 1024
+
+# JSON API (/api/v1)
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 500
+API_STREAM_BATCH_SIZE = 1000
+
+# Month partitions of the Show table on PostgreSQL (partitions.py):
+# `flask shows partitions` keeps SHOW_PARTITIONS_AHEAD months ahead of today,
+# and `flask shows archive` writes old months to SHOW_ARCHIVE_DIR
+SHOW_PARTITIONS_AHEAD = 12
+SHOW_ARCHIVE_DIR = os.environ.get('SHOW_ARCHIVE_DIR', os.path.join(basedir, 'archive'))
+
+# Rows per transaction for `flask import`
+IMPORT_CHUNK_SIZE = 1000
+
+# Logging (logs.py). Records go through a bounded queue to a background
+# thread; when the queue is full they are dropped, never waited for. Files
+# rotate at LOG_MAX_BYTES, or on the LOG_ROTATE_WHEN schedule (e.g.
+# 'midnight') when that is set. An empty ACCESS_LOG turns the access log off.
+ERROR_LOG = os.environ.get('ERROR_LOG', 'error.log')
+ACCESS_LOG = os.environ.get('ACCESS_LOG', 'access.log')
+LOG_QUEUE_SIZE = 10000
+LOG_MAX_BYTES = 50 * 1024 * 1024
+LOG_BACKUP_COUNT = 10
+LOG_ROTATE_WHEN = os.environ.get('LOG_ROTATE_WHEN')
+
+# Fraction of requests written to the access log, by endpoint (default 1).
+# Server errors and requests slower than ACCESS_LOG_SLOW_MS are always kept.
+ACCESS_LOG_SAMPLE_RATES = {
+    'pages.autocomplete_names': 0.1,
+    'static': 0.05,
+    'static_asset': 0.05,
+}
+ACCESS_LOG_SLOW_MS = 500
+
+# Per-request SQL profiling (Server-Timing header and log lines)
+SQL_PROFILER_ENABLED = os.environ.get('SQL_PROFILER_ENABLED', '') in ('1', 'true', 'yes')
+SQL_SLOW_QUERY_MS = 200
+SQL_DUPLICATE_THRESHOLD = 3
+PROFILER_TOKEN = os.environ.get('PROFILER_TOKEN')
@@ -0,0 +1,111 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from datetime import datetime
+from sqlalchemy import DateTime, Integer, bindparam, case, func, select, update
+from models import db, Venue, Artist, Show
+
+#----------------------------------------------------------------------------#
+# Show counters.
+#
+# Venue and Artist carry num_upcoming_shows, next_show_time and
+# last_show_time so the listing pages never scan Show. A show is upcoming
+# while start_time >= now, as on the detail pages.
+#
+# Writes keep the counters up to date in the same transaction as the show
+# rows. Time passing does not: roll_forward() moves shows that have started
+# from upcoming to past and should run every few minutes (`flask
+# roll-forward` from cron). recount() rebuilds everything from Show.
+#----------------------------------------------------------------------------#
+
+# (model, Show column pointing at it) for both sides of a show.
+SIDES = ((Venue, Show.venue_id), (Artist, Show.artist_id))
+
+# Counter changes for a batch of new shows, one row per entity:
+# {'b_id', 'added', 'next', 'last'}.
+def _deltas(shows, fk, now):
+    deltas = {}
+    for show in shows:
+        delta = deltas.setdefault(show[fk], {'b_id': show[fk], 'added': 0, 'next': None, 'last': None})
+        start_time = show['start_time']
+        if start_time >= now:
+            delta['added'] += 1
+            if delta['next'] is None or start_time < delta['next']:
+                delta['next'] = start_time
+        elif delta['last'] is None or start_time > delta['last']:
+            delta['last'] = start_time
+    return list(deltas.values())
+
+# Applies new shows (dicts with venue_id, artist_id and a datetime
+# start_time) to the counters. The count is incremented in place rather than
+# recomputed, so concurrent inserts for the same venue cannot lose updates.
+def shows_added(shows, now=None):
+    if now is None:
+        now = datetime.now()
+    for model, fk in SIDES:
+        deltas = _deltas(shows, fk.key, now)
+        if not deltas:
+            continue
+        table = model.__table__
+        next_time = bindparam('next', type_=DateTime)
+        last_time = bindparam('last', type_=DateTime)
+        db.session.execute(update(table).where(table.c.id == bindparam('b_id')).values(
+            num_upcoming_shows=table.c.num_upcoming_shows + bindparam('added', type_=Integer),
+            next_show_time=case(
+                (table.c.next_show_time.is_(None) | (table.c.next_show_time > next_time), next_time),
+                else_=table.c.next_show_time),
+            last_show_time=case(
+                (table.c.last_show_time.is_(None) | (table.c.last_show_time < last_time), last_time),
+                else_=table.c.last_show_time),
+        ), deltas)
+
+def show_added(show, now=None):
+    shows_added([{'venue_id': show.venue_id, 'artist_id': show.artist_id, 'start_time': show.start_time}], now)
+
+# Call before deleting a venue or artist: takes its shows off the counters
+# of everything on the other side of them.
+def entity_removed(model, entity_id, now=None):
+    if now is None:
+        now = datetime.now()
+    (_, own_fk), (other, other_fk) = SIDES if model is Venue else reversed(SIDES)
+    table = other.__table__
+    others = other_fk == table.c.id
+    db.session.execute(update(table).where(
+        table.c.id.in_(select(other_fk).where(own_fk == entity_id))
+    ).values(
+        num_upcoming_shows=table.c.num_upcoming_shows - select(func.count(Show.id)).where(
+            others, own_fk == entity_id, Show.start_time >= now).scalar_subquery(),
+        next_show_time=select(func.min(Show.start_time)).where(
+            others, own_fk != entity_id, Show.start_time >= now).scalar_subquery(),
+        last_show_time=select(func.max(Show.start_time)).where(
+            others, own_fk != entity_id, Show.start_time < now).scalar_subquery(),
+    ).execution_options(synchronize_session=False))
+
+# Recomputes the counters from Show with one correlated UPDATE per table,
+# for every row or only the rows matching `where(table)`. Returns the number
+# of rows updated.
+def _recount(now, where=None):
+    updated = 0
+    for model, fk in SIDES:
+        table = model.__table__
+        own = fk == table.c.id
+        statement = update(table).values(
+            num_upcoming_shows=select(func.count(Show.id)).where(own, Show.start_time >= now).scalar_subquery(),
+            next_show_time=select(func.min(Show.start_time)).where(own, Show.start_time >= now).scalar_subquery(),
+            last_show_time=select(func.max(Show.start_time)).where(own, Show.start_time < now).scalar_subquery(),
+        )
+        if where is not None:
+            statement = statement.where(where(table))
+        updated += db.session.execute(statement.execution_options(synchronize_session=False)).rowcount
+    return updated
+
+def recount(now=None):
+    return _recount(now or datetime.now())
+
+# Only rows whose next show has started can be out of date, and
+# ix_*_next_show_time finds those without touching the rest.
+def roll_forward(now=None):
+    if now is None:
+        now = datetime.now()
+    return _recount(now, lambda table: table.c.next_show_time < now)
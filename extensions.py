@@ -0,0 +1,20 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from assets import Assets
+from cache import ResponseCache
+from logs import LogPipeline
+from profiler import SQLProfiler
+
+#----------------------------------------------------------------------------#
+# Extensions.
+#
+# Created unbound, so the blueprints and commands can import them, and
+# bound to the app by create_app() in app.py. The database is models.db.
+#----------------------------------------------------------------------------#
+
+response_cache = ResponseCache()
+sql_profiler = SQLProfiler()
+static_assets = Assets()
+log_pipeline = LogPipeline()
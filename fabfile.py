@@ -6,8 +6,9 @@ from fabric.contrib.console import confirm
 
 def test():
     with settings(warn_only=True):
+        # Every route once, as a smoke test; see benchmarks/bench_routes.py
         result = local(
-            "python test_tasks.py -v && python test_users.py -v", capture=True
+            "python -m pytest benchmarks/bench_routes.py --benchmark-disable -q", capture=True
         )
     if result.failed and not confirm("Tests failed. Continue?"):
         abort("Aborted at user request.")
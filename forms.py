@@ -1,22 +1,70 @@
 from datetime import datetime
-from typing import Optional
+import dateutil.parser
 from flask_wtf import Form
 from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, BooleanField
-from wtforms.validators import DataRequired, AnyOf, URL
+from wtforms.validators import DataRequired, AnyOf, URL, Regexp, Optional, ValidationError
+
+# Genre choices for venues and artists; also the seed list for the Genre table.
+GENRES = [
+    'Afrobeats',
+    'Alternative',
+    'Blues',
+    'Classical',
+    'Country',
+    'Electronic',
+    'Folk',
+    'Funk',
+    'Hip-Hop',
+    'Heavy Metal',
+    'Instrumental',
+    'Jazz',
+    'Musical Theatre',
+    'Pop',
+    'Punk',
+    'R&B',
+    'Reggae',
+    'Rock n Roll',
+    'Soul',
+    'Other',
+]
+
+# Renders in `format`, but accepts any date and time dateutil can read
+# ('2026-05-01 20:00', '2026-05-01T20:00:00', ...), as the show form always has.
+class LenientDateTimeField(DateTimeField):
+
+    def process_formdata(self, valuelist):
+        if valuelist:
+            text = ' '.join(valuelist).strip()
+            self.data = None
+            if text:
+                try:
+                    self.data = dateutil.parser.parse(text)
+                except (ValueError, OverflowError):
+                    raise ValueError(self.gettext('Not a valid datetime value'))
 
 class ShowForm(Form):
     artist_id = StringField(
-        'artist_id'
+        'artist_id', validators=[DataRequired(), Regexp(r'^\s*\d+\s*$', message='Must be an id number.')]
     )
     venue_id = StringField(
-        'venue_id'
+        'venue_id', validators=[DataRequired(), Regexp(r'^\s*\d+\s*$', message='Must be an id number.')]
     )
-    start_time = DateTimeField(
+    start_time = LenientDateTimeField(
         'start_time',
         validators=[DataRequired()],
         default= datetime.today(),
         format='%Y-%m-%dT%H:%M'
     )
+    # Blank means the default length (models.DEFAULT_SHOW_DURATION).
+    end_time = LenientDateTimeField(
+        'end_time',
+        validators=[Optional()],
+        format='%Y-%m-%dT%H:%M'
+    )
+
+    def validate_end_time(form, field):
+        if field.data is not None and form.start_time.data is not None and field.data <= form.start_time.data:
+            raise ValidationError('Must be after the start time.')
 
 class VenueForm(Form):
     name = StringField(
@@ -93,28 +141,7 @@ class VenueForm(Form):
     genre = SelectMultipleField(
         # TODO implement enum restriction
         'genre', validators=[DataRequired()],
-        choices=[
-            ('Afrobeats', 'Afrobeats'),
-            ('Alternative', 'Alternative'),
-            ('Blues', 'Blues'),
-            ('Classical', 'Classical'),
-            ('Country', 'Country'),
-            ('Electronic', 'Electronic'),
-            ('Folk', 'Folk'),
-            ('Funk', 'Funk'),
-            ('Hip-Hop', 'Hip-Hop'),
-            ('Heavy Metal', 'Heavy Metal'),
-            ('Instrumental', 'Instrumental'),
-            ('Jazz', 'Jazz'),
-            ('Musical Theatre', 'Musical Theatre'),
-            ('Pop', 'Pop'),
-            ('Punk', 'Punk'),
-            ('R&B', 'R&B'),
-            ('Reggae', 'Reggae'),
-            ('Rock n Roll', 'Rock n Roll'),
-            ('Soul', 'Soul'),
-            ('Other', 'Other'),
-        ]
+        choices=[(genre, genre) for genre in GENRES]
     )
     facebook_link = StringField(
         'facebook_link', validators=[URL()]
@@ -202,28 +229,7 @@ class ArtistForm(Form):
     )
     genres = SelectMultipleField(
         'genres', validators=[DataRequired()],
-        choices=[
-            ('Afrobeats', 'Afrobeats'),
-            ('Alternative', 'Alternative'),
-            ('Blues', 'Blues'),
-            ('Classical', 'Classical'),
-            ('Country', 'Country'),
-            ('Electronic', 'Electronic'),
-            ('Folk', 'Folk'),
-            ('Funk', 'Funk'),
-            ('Hip-Hop', 'Hip-Hop'),
-            ('Heavy Metal', 'Heavy Metal'),
-            ('Instrumental', 'Instrumental'),
-            ('Jazz', 'Jazz'),
-            ('Musical Theatre', 'Musical Theatre'),
-            ('Pop', 'Pop'),
-            ('Punk', 'Punk'),
-            ('R&B', 'R&B'),
-            ('Reggae', 'Reggae'),
-            ('Rock n Roll', 'Rock n Roll'),
-            ('Soul', 'Soul'),
-            ('Other', 'Other'),
-        ]
+        choices=[(genre, genre) for genre in GENRES]
     )
     facebook_link = StringField(
         # TODO implement enum restriction
@@ -0,0 +1,76 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from datetime import timezone
+
+#----------------------------------------------------------------------------#
+# iCalendar (RFC 5545) feeds.
+#
+# Just enough of the format for a read-only feed of events: CRLF line
+# endings, TEXT escaping, and lines folded at 75 octets. Show times are
+# stored without a time zone, so events use floating local times, which
+# calendar apps show as-is wherever the subscriber is.
+#----------------------------------------------------------------------------#
+
+PRODID = '-//Fyyur//Shows//EN'
+
+
+def escape_text(value):
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n'))
+
+# Splits a content line into chunks of at most 75 octets, never inside a
+# UTF-8 sequence; continuation lines start with a space.
+def fold(line):
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+    chunks, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        chunks.append(encoded[start:end].decode('utf-8'))
+        start, limit = end, 74
+    return '\r\n '.join(chunks)
+
+
+def _local(value):
+    return value.strftime('%Y%m%dT%H%M%S')
+
+
+def _utc(value):
+    return value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+# A VCALENDAR with one VEVENT per event. Events are dicts with 'uid',
+# 'start', 'end' and 'summary', and optionally 'location', 'url' and
+# 'description'. `stamp` is an aware datetime for DTSTAMP.
+def calendar(name, events, stamp):
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:' + PRODID,
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:' + escape_text(name),
+    ]
+    dtstamp = _utc(stamp)
+    for event in events:
+        lines += [
+            'BEGIN:VEVENT',
+            'UID:' + event['uid'],
+            'DTSTAMP:' + dtstamp,
+            'DTSTART:' + _local(event['start']),
+            'DTEND:' + _local(event['end']),
+            'SUMMARY:' + escape_text(event['summary']),
+        ]
+        if event.get('location'):
+            lines.append('LOCATION:' + escape_text(event['location']))
+        if event.get('description'):
+            lines.append('DESCRIPTION:' + escape_text(event['description']))
+        if event.get('url'):
+            lines.append('URL:' + event['url'])
+        lines.append('END:VEVENT')
+    lines.append('END:VCALENDAR')
+    return ''.join(fold(line) + '\r\n' for line in lines)
@@ -0,0 +1,254 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import csv
+import gzip
+import json
+import os
+from itertools import islice
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.datastructures import MultiDict
+import counters
+import schedule
+from forms import VenueForm, ArtistForm, ShowForm
+from models import db, Venue, Artist, venue_genres, artist_genres
+from schedule import ScheduleIndex
+from writes import form_errors, genre_ids, insert_returning_ids, venue_record, artist_record, show_record
+
+#----------------------------------------------------------------------------#
+# Reading.
+#----------------------------------------------------------------------------#
+
+# Yields (line number, row dict) from a CSV file (header row required) or an
+# NDJSON file, one row at a time. Either may be gzipped (a .gz suffix), like
+# the files `flask shows archive` writes.
+def read_rows(path):
+    name, extension = os.path.splitext(path)
+    opener = open
+    if extension.lower() == '.gz':
+        name, extension = os.path.splitext(name)
+        opener = gzip.open
+    with opener(path, 'rt', newline='', encoding='utf-8') as f:
+        if extension.lower() in ('.ndjson', '.jsonl', '.json'):
+            for line_no, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield line_no, json.loads(line)
+                    except ValueError as e:
+                        yield line_no, e
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+
+#----------------------------------------------------------------------------#
+# Validation.
+#----------------------------------------------------------------------------#
+
+FALSE_VALUES = ('', '0', 'false', 'no', 'n', 'off')
+
+# Turns a raw row into form data: lists for multi-select fields (CSV cells
+# are comma-joined), booleans the way a checkbox would post them.
+def _formdata(row, multi=(), booleans=()):
+    data = MultiDict()
+    for key, value in row.items():
+        if key is None or value is None:
+            continue
+        if key in multi:
+            values = value if isinstance(value, list) else str(value).split(',')
+            for item in values:
+                if str(item).strip():
+                    data.add(key, str(item).strip())
+        elif key in booleans:
+            if str(value).strip().lower() not in FALSE_VALUES:
+                data.add(key, 'y')
+        else:
+            data.add(key, str(value).strip())
+    return data
+
+#----------------------------------------------------------------------------#
+# Importer.
+#----------------------------------------------------------------------------#
+
+# Why a show was turned away, from schedule.find_conflict()'s result.
+def _conflict_message(found, record):
+    if found is None:
+        return 'overlaps another show at the venue or by the artist'
+    kind, _, start, end = found
+    return '%s %d already has a show from %s to %s' % (
+        kind, record[kind + '_id'], start.strftime('%Y-%m-%d %H:%M'), end.strftime('%Y-%m-%d %H:%M'))
+
+# Streams rows into one table in chunks. Each chunk is validated with the
+# same WTForms rules as the web forms and written in a single transaction,
+# venues and artists with bulk statements and shows one by one through the
+# schedule's overlap check; bad rows are reported and skipped, never the
+# chunk.
+class Importer:
+
+    def __init__(self, kind, chunk_size=1000, log=print):
+        if kind not in ('venue', 'artist', 'show'):
+            raise ValueError('Unknown import kind: %s' % kind)
+        self.kind = kind
+        self.chunk_size = chunk_size
+        self.log = log
+        self.inserted = 0
+        self.errors = []
+        self._names = None
+        self._chunk_shows = ScheduleIndex()
+
+    def error(self, line_no, message):
+        self.errors.append((line_no, message))
+        self.log('line %s: %s' % (line_no, message))
+
+    # -- Venue and artist rows
+
+    def _venue_record(self, row):
+        form = VenueForm(formdata=_formdata(row, multi=('genre',), booleans=('seeking_talent',)), meta={'csrf': False})
+        if not form.validate():
+            return None, form_errors(form)
+        return venue_record(form)
+
+    def _artist_record(self, row):
+        form = ArtistForm(formdata=_formdata(row, multi=('genres',), booleans=('seeking_venue',)), meta={'csrf': False})
+        if not form.validate():
+            return None, form_errors(form)
+        return artist_record(form)
+
+    def _write_entities(self, model, association, owner_column, valid):
+        ids = insert_returning_ids(model.__table__, [record for _, record, _ in valid])
+        links = []
+        for entity_id, (_, _, genres) in zip(ids, valid):
+            for genre_id in dict.fromkeys(genre_ids(genres)):
+                links.append({owner_column: entity_id, 'genre_id': genre_id})
+        if links:
+            db.session.execute(association.insert(), links)
+
+    # -- Show rows
+
+    def _lookup_ids(self, model):
+        names = {}
+        for entity_id, name in db.session.query(model.id, model.name):
+            names.setdefault(name, []).append(entity_id)
+        return names
+
+    # Resolves `<prefix>` (a name) or `<prefix>_id` to an id.
+    def _resolve(self, row, prefix, names):
+        if row.get(prefix + '_id'):
+            return str(row[prefix + '_id']), None
+        name = (row.get(prefix) or '').strip()
+        ids = names.get(name, [])
+        if len(ids) == 1:
+            return str(ids[0]), None
+        if not ids:
+            return None, '%s: no %s named %r' % (prefix, prefix, name)
+        return None, '%s: %d %ss named %r, use %s_id' % (prefix, len(ids), prefix, name, prefix)
+
+    def _show_record(self, row):
+        if self._names is None:
+            self._names = {'artist': self._lookup_ids(Artist), 'venue': self._lookup_ids(Venue)}
+        data = dict(row)
+        for prefix in ('artist', 'venue'):
+            value, error = self._resolve(row, prefix, self._names[prefix])
+            if error:
+                return None, error
+            data[prefix + '_id'] = value
+        form = ShowForm(formdata=_formdata(data), meta={'csrf': False})
+        if not form.validate():
+            return None, form_errors(form)
+        record = show_record(form)
+        error = self._conflict(record)
+        if error:
+            return None, error
+        return record, None
+
+    # Shows are written through schedule.insert_show(), which checks each one
+    # against the shows in the database (on PostgreSQL under the venue's and
+    # artist's advisory locks, so across month partitions and against
+    # concurrent web inserts too) and against this process's schedule index
+    # elsewhere. Without PostgreSQL the rows accepted earlier in the chunk
+    # only reach that index once the chunk commits, so they are checked here.
+    def _conflict(self, record):
+        if schedule.uses_exclusion_constraints():
+            return None
+        start, end = record['start_time'], record['end_time']
+        for kind in ('venue', 'artist'):
+            found = self._chunk_shows.first_overlap(kind, record[kind + '_id'], start, end)
+            if found is not None:
+                return _conflict_message((kind, found[2], found[0], found[1]), record) + ' on line %s' % found[2]
+        return None
+
+    # -- Driver
+
+    def _validate(self, line_no, row):
+        if isinstance(row, Exception):
+            return None, 'invalid JSON: %s' % row
+        if self.kind == 'venue':
+            return self._venue_record(row)
+        if self.kind == 'artist':
+            return self._artist_record(row)
+        return self._show_record(row)
+
+    def _write(self, valid):
+        if self.kind == 'venue':
+            self._write_entities(Venue, venue_genres, 'venue_id', valid)
+        elif self.kind == 'artist':
+            self._write_entities(Artist, artist_genres, 'artist_id', valid)
+        else:
+            records, rejected = [], []
+            for line_no, record, _ in valid:
+                if schedule.insert_show(record) is None:
+                    rejected.append((line_no, _conflict_message(schedule.find_conflict(record), record)))
+                else:
+                    records.append(record)
+            counters.shows_added(records)
+            return rejected
+        return []
+
+    # Rows _write() turned away are reported once their chunk commits, so a
+    # chunk retried row by row does not report them twice.
+    def _write_chunk(self, valid):
+        try:
+            rejected = self._write(valid)
+            db.session.commit()
+            self.inserted += len(valid) - len(rejected)
+            for line_no, message in rejected:
+                self.error(line_no, message)
+            return
+        except SQLAlchemyError:
+            db.session.rollback()
+
+        # Something in the chunk broke a constraint: retry row by row in
+        # savepoints so only the offending rows are dropped.
+        rejected = []
+        for item in valid:
+            try:
+                with db.session.begin_nested():
+                    rejected.extend(self._write([item]))
+            except SQLAlchemyError as e:
+                rejected.append((item[0], 'rejected by the database: %s' % getattr(e, 'orig', e)))
+        db.session.commit()
+        self.inserted += len(valid) - len(rejected)
+        for line_no, message in rejected:
+            self.error(line_no, message)
+
+    def run(self, rows):
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            valid = []
+            self._chunk_shows.clear()
+            for line_no, row in chunk:
+                record, extra = self._validate(line_no, row)
+                if record is None:
+                    self.error(line_no, extra)
+                else:
+                    valid.append((line_no, record, extra))
+                    if self.kind == 'show':
+                        self._chunk_shows.add(line_no, record['venue_id'], record['artist_id'],
+                                              record['start_time'], record['end_time'])
+            if valid:
+                self._write_chunk(valid)
+        return self.inserted, self.errors
@@ -0,0 +1,218 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+#----------------------------------------------------------------------------#
+# Non-blocking handler.
+#----------------------------------------------------------------------------#
+
+# QueueHandler over a bounded queue that never waits: when the listener has
+# fallen behind (a slow or full disk), records are dropped and counted, and
+# the count is reported once the queue has room again.
+class DroppingQueueHandler(QueueHandler):
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported = 0
+        self._lock = threading.Lock()
+
+    def enqueue(self, record):
+        try:
+            if self._unreported:
+                self._report_drops()
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                self._unreported += 1
+
+    def _report_drops(self):
+        with self._lock:
+            count, self._unreported = self._unreported, 0
+        notice = logging.LogRecord('fyyur.logs', logging.WARNING, __file__, 0,
+                                   'Log queue full: dropped %d records', (count,), None)
+        try:
+            self.queue.put_nowait(self.prepare(notice))
+        except queue.Full:
+            with self._lock:
+                self._unreported += count
+
+#----------------------------------------------------------------------------#
+# Pipeline.
+#----------------------------------------------------------------------------#
+
+# Every log record from the app, the SQL profiler and the access log goes
+# through one bounded queue to a background thread that owns the files, so a
+# log call on a request thread is an append to a queue and nothing more.
+#
+# The access log is one JSON line per request: route, status, latency, and
+# the time and number of queries it spent in the database. Routes listed in
+# ACCESS_LOG_SAMPLE_RATES are sampled; errors and requests slower than
+# ACCESS_LOG_SLOW_MS are always logged. Each line carries its sample rate,
+# so counts can be scaled back up.
+class LogPipeline:
+
+    def __init__(self, app=None):
+        self.queue = None
+        self.handler = None
+        self.listener = None
+        self._running = False
+        self._app_logger = None
+        self._hooks_registered = False
+        self.access_logger = logging.getLogger('fyyur.access')
+        self.sample_rates = {}
+        self.slow_ms = 500
+        if app is not None:
+            self.init_app(app)
+
+    # Safe to call again, e.g. for each create_app() in one process: the
+    # previous app's handler is taken off the loggers and its listener is
+    # stopped (after writing what it holds), so each record is written once.
+    def init_app(self, app):
+        self._detach()
+        self.queue = queue.Queue(app.config.get('LOG_QUEUE_SIZE', 10000))
+        self.handler = DroppingQueueHandler(self.queue)
+        self.sample_rates = app.config.get('ACCESS_LOG_SAMPLE_RATES', {})
+        self.slow_ms = app.config.get('ACCESS_LOG_SLOW_MS', 500)
+
+        targets = []
+        if not app.debug and app.config.get('ERROR_LOG'):
+            error_handler = self._file_handler(app.config, app.config['ERROR_LOG'])
+            error_handler.setFormatter(
+                logging.Formatter('%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'))
+            error_handler.addFilter(lambda record: record.name != self.access_logger.name)
+            targets.append(error_handler)
+            app.logger.setLevel(logging.INFO)
+            # Flask's own stderr handler writes on the request thread.
+            app.logger.removeHandler(default_handler)
+            app.logger.addHandler(self.handler)
+            self._app_logger = app.logger
+
+        if app.config.get('ACCESS_LOG'):
+            access_handler = self._file_handler(app.config, app.config['ACCESS_LOG'])
+            access_handler.setFormatter(logging.Formatter('%(message)s'))
+            access_handler.addFilter(lambda record: record.name == self.access_logger.name)
+            targets.append(access_handler)
+            self.access_logger.setLevel(logging.INFO)
+            self.access_logger.propagate = False
+            self.access_logger.addHandler(self.handler)
+            event.listen(Engine, 'before_cursor_execute', _before_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_execute)
+            app.before_request(self._before_request)
+            app.after_request(self._after_request)
+
+        self.listener = QueueListener(self.queue, *targets, respect_handler_level=True)
+        self.listener.start()
+        self._running = True
+        if not self._hooks_registered:
+            self._hooks_registered = True
+            atexit.register(self.stop)
+            if hasattr(os, 'register_at_fork'):
+                os.register_at_fork(after_in_child=self._after_fork)
+        app.extensions['log_pipeline'] = self
+
+    def _detach(self):
+        if self.handler is None:
+            return
+        self.access_logger.removeHandler(self.handler)
+        if self._app_logger is not None:
+            self._app_logger.removeHandler(self.handler)
+            self._app_logger = None
+        self.stop()
+
+    @staticmethod
+    def _file_handler(config, path):
+        if config.get('LOG_ROTATE_WHEN'):
+            return TimedRotatingFileHandler(path, when=config['LOG_ROTATE_WHEN'],
+                                            backupCount=config.get('LOG_BACKUP_COUNT', 10), delay=True)
+        return RotatingFileHandler(path, maxBytes=config.get('LOG_MAX_BYTES', 50 * 1024 * 1024),
+                                   backupCount=config.get('LOG_BACKUP_COUNT', 10), delay=True)
+
+    # A preforking server (`gunicorn --preload 'app:create_app()'`) forks
+    # after the listener has started, and the thread does not survive the
+    # fork: each worker starts its own, on a fresh queue.
+    def _after_fork(self):
+        if self._running:
+            self.queue = queue.Queue(self.queue.maxsize)
+            self.handler.queue = self.queue
+            self.handler._lock = threading.Lock()
+            self.listener = QueueListener(self.queue, *self.listener.handlers, respect_handler_level=True)
+            self.listener.start()
+
+    # Writes out whatever is still queued.
+    def stop(self):
+        if self._running:
+            self._running = False
+            self.listener.stop()
+
+    # -- Access log
+
+    def _before_request(self):
+        g.access_log = {'start': time.perf_counter(), 'db_ms': 0.0, 'queries': 0}
+
+    # The line is written when the response is closed, i.e. after the last
+    # byte of a streamed page, and is off the path of the response itself.
+    def _after_request(self, response):
+        stats = g.get('access_log')
+        if stats is None:
+            return response
+        rate = self.sample_rates.get(request.endpoint, 1.0)
+        line = {
+            'method': request.method,
+            'path': request.path,
+            'route': request.url_rule.rule if request.url_rule else None,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'cache': response.headers.get('X-Cache'),
+            'replica': g.get('db_replica') is not None,
+        }
+
+        def write():
+            ms = (time.perf_counter() - stats['start']) * 1000
+            always = line['status'] >= 500 or ms >= self.slow_ms
+            if not always and rate < 1.0 and random.random() >= rate:
+                return
+            line.update({
+                'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+                'ms': round(ms, 2),
+                'db_ms': round(stats['db_ms'], 2),
+                'queries': stats['queries'],
+                'sample_rate': 1.0 if always else rate,
+            })
+            self.access_logger.info(json.dumps(line))
+
+        response.call_on_close(write)
+        return response
+
+# Time spent in the database by the current request, for the access log.
+# Cheaper than the SQL profiler: two clock reads per statement, no shapes.
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('access_log_start', []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('access_log_start')
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+    if has_request_context():
+        stats = g.get('access_log')
+        if stats is not None:
+            stats['db_ms'] += elapsed_ms
+            stats['queries'] += 1
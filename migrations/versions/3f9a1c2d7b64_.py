@@ -0,0 +1,45 @@
+"""add trigram search indexes
+
+Revision ID: 3f9a1c2d7b64
+Revises: 8e178ce5bd23
+Create Date: 2026-10-18 09:12:41.203517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c2d7b64'
+down_revision = '8e178ce5bd23'
+branch_labels = None
+depends_on = None
+
+# (index name, table, column) for every column the search endpoints match on
+TRIGRAM_INDEXES = [
+    ('ix_venue_name_trgm', 'Venue', 'name'),
+    ('ix_venue_city_trgm', 'Venue', 'city'),
+    ('ix_venue_genre_trgm', 'Venue', 'genre'),
+    ('ix_artist_name_trgm', 'Artist', 'name'),
+    ('ix_artist_city_trgm', 'Artist', 'city'),
+    ('ix_artist_genres_trgm', 'Artist', 'genres'),
+]
+
+
+def upgrade():
+    # pg_trgm only exists on PostgreSQL; other backends use the in-process
+    # index in search.py instead.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(name, table, [column], unique=False,
+                        postgresql_using='gin',
+                        postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for name, table, column in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,31 @@
+"""data_version table for ETags
+
+Revision ID: 6b1f0e3a8c27
+Revises: d4b7e2a91c3f
+Create Date: 2026-10-18 16:05:12.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b1f0e3a8c27'
+down_revision = 'd4b7e2a91c3f'
+branch_labels = None
+depends_on = None
+
+TABLES = ('Venue', 'Artist', 'Show', 'Genre')
+
+
+def upgrade():
+    data_version = op.create_table('data_version',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(data_version, [{'name': name, 'version': 1} for name in TABLES])
+
+
+def downgrade():
+    op.drop_table('data_version')
@@ -0,0 +1,89 @@
+"""show end times and overlap constraints
+
+Revision ID: 9d2c4f7a1e58
+Revises: 6b1f0e3a8c27
+Create Date: 2026-10-18 18:41:27.093514
+
+"""
+from datetime import timedelta
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2c4f7a1e58'
+down_revision = '6b1f0e3a8c27'
+branch_labels = None
+depends_on = None
+
+# Copied from models.DEFAULT_SHOW_DURATION at the time of this migration.
+DEFAULT_MINUTES = 180
+
+# (constraint name, column) for both sides of a show.
+EXCLUSION_CONSTRAINTS = [
+    ('ex_show_venue_overlap', 'venue_id'),
+    ('ex_show_artist_overlap', 'artist_id'),
+]
+
+
+# Existing shows have no recorded end. Each gets the default length, cut
+# short where the next show at the same venue or by the same artist starts,
+# so the backfill never creates an overlap. Shows sharing a start time end
+# where they start (an empty range, which overlaps nothing).
+def _backfill(bind):
+    if bind.dialect.name == 'postgresql':
+        op.execute("""
+            UPDATE "Show" AS s
+            SET end_time = LEAST(s.start_time + interval '%d minutes', n.next_at_venue, n.next_by_artist)
+            FROM (
+                SELECT id,
+                       lead(start_time) OVER (PARTITION BY venue_id ORDER BY start_time, id) AS next_at_venue,
+                       lead(start_time) OVER (PARTITION BY artist_id ORDER BY start_time, id) AS next_by_artist
+                FROM "Show"
+            ) AS n
+            WHERE n.id = s.id
+        """ % DEFAULT_MINUTES)
+        return
+
+    show = sa.table('Show', sa.column('id', sa.Integer), sa.column('venue_id', sa.Integer),
+                    sa.column('artist_id', sa.Integer), sa.column('start_time', sa.DateTime),
+                    sa.column('end_time', sa.DateTime))
+    rows = bind.execute(sa.select(show.c.id, show.c.venue_id, show.c.artist_id, show.c.start_time)
+                        .order_by(show.c.start_time, show.c.id)).fetchall()
+    ends = {row.id: row.start_time + timedelta(minutes=DEFAULT_MINUTES) for row in rows}
+    for column in ('venue_id', 'artist_id'):
+        previous = {}
+        for row in rows:
+            key = getattr(row, column)
+            if key in previous:
+                ends[previous[key]] = min(ends[previous[key]], row.start_time)
+            previous[key] = row.id
+    if ends:
+        bind.execute(show.update().where(show.c.id == sa.bindparam('b_id')).values(end_time=sa.bindparam('end')),
+                     [{'b_id': show_id, 'end': end} for show_id, end in ends.items()])
+
+
+def upgrade():
+    op.add_column('Show', sa.Column('end_time', sa.DateTime(), nullable=True))
+    bind = op.get_bind()
+    _backfill(bind)
+    with op.batch_alter_table('Show') as batch_op:
+        batch_op.alter_column('end_time', existing_type=sa.DateTime(), nullable=False)
+
+    # The GiST indexes behind these constraints also serve the overlap and
+    # availability queries. Other backends use the in-process interval
+    # trees in schedule.py instead.
+    if bind.dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    for name, column in EXCLUSION_CONSTRAINTS:
+        op.execute('ALTER TABLE "Show" ADD CONSTRAINT %s EXCLUDE USING gist '
+                   '(%s WITH =, tsrange(start_time, end_time) WITH &&)' % (name, column))
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for name, _ in reversed(EXCLUSION_CONSTRAINTS):
+            op.execute('ALTER TABLE "Show" DROP CONSTRAINT %s' % name)
+    with op.batch_alter_table('Show') as batch_op:
+        batch_op.drop_column('end_time')
@@ -0,0 +1,92 @@
+"""normalize genres into Genre and association tables
+
+Revision ID: c81d4e6f2a95
+Revises: a52e7d0c9f13
+Create Date: 2026-10-18 11:26:03.517902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81d4e6f2a95'
+down_revision = 'a52e7d0c9f13'
+branch_labels = None
+depends_on = None
+
+# Seed list, copied from forms.GENRES at the time of this migration.
+GENRES = [
+    'Afrobeats', 'Alternative', 'Blues', 'Classical', 'Country', 'Electronic',
+    'Folk', 'Funk', 'Hip-Hop', 'Heavy Metal', 'Instrumental', 'Jazz',
+    'Musical Theatre', 'Pop', 'Punk', 'R&B', 'Reggae', 'Rock n Roll', 'Soul',
+    'Other',
+]
+
+
+def _split(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def upgrade():
+    genre = op.create_table('Genre',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    venue_genres = op.create_table('venue_genres',
+    sa.Column('venue_id', sa.Integer(), nullable=False),
+    sa.Column('genre_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['genre_id'], ['Genre.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['venue_id'], ['Venue.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('venue_id', 'genre_id')
+    )
+    op.create_index('ix_venue_genres_genre_id_venue_id', 'venue_genres', ['genre_id', 'venue_id'], unique=False)
+    artist_genres = op.create_table('artist_genres',
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.Column('genre_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['artist_id'], ['Artist.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['genre_id'], ['Genre.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('artist_id', 'genre_id')
+    )
+    op.create_index('ix_artist_genres_genre_id_artist_id', 'artist_genres', ['genre_id', 'artist_id'], unique=False)
+    with op.batch_alter_table('Artist') as batch_op:
+        batch_op.alter_column('genres', existing_type=sa.String(length=120), type_=sa.String(), existing_nullable=False)
+
+    # Split the existing comma-joined strings into association rows, adding
+    # any genre outside the seed list as we meet it.
+    bind = op.get_bind()
+    venue = sa.table('Venue', sa.column('id', sa.Integer), sa.column('genre', sa.String))
+    artist = sa.table('Artist', sa.column('id', sa.Integer), sa.column('genres', sa.String))
+
+    names = list(GENRES)
+    venue_rows = bind.execute(sa.select(venue.c.id, venue.c.genre)).fetchall()
+    artist_rows = bind.execute(sa.select(artist.c.id, artist.c.genres)).fetchall()
+    for _, value in venue_rows + artist_rows:
+        for name in _split(value):
+            if name not in names:
+                names.append(name)
+    op.bulk_insert(genre, [{'id': i + 1, 'name': name} for i, name in enumerate(names)])
+    ids = {name: i + 1 for i, name in enumerate(names)}
+
+    op.bulk_insert(venue_genres, [
+        {'venue_id': venue_id, 'genre_id': ids[name]}
+        for venue_id, value in venue_rows for name in dict.fromkeys(_split(value))
+    ])
+    op.bulk_insert(artist_genres, [
+        {'artist_id': artist_id, 'genre_id': ids[name]}
+        for artist_id, value in artist_rows for name in dict.fromkeys(_split(value))
+    ])
+    if bind.dialect.name == 'postgresql':
+        op.execute('SELECT setval(pg_get_serial_sequence(\'"Genre"\', \'id\'), (SELECT max(id) FROM "Genre"))')
+
+
+def downgrade():
+    with op.batch_alter_table('Artist') as batch_op:
+        batch_op.alter_column('genres', existing_type=sa.String(), type_=sa.String(length=120), existing_nullable=False)
+    op.drop_index('ix_artist_genres_genre_id_artist_id', table_name='artist_genres')
+    op.drop_table('artist_genres')
+    op.drop_index('ix_venue_genres_genre_id_venue_id', table_name='venue_genres')
+    op.drop_table('venue_genres')
+    op.drop_table('Genre')
@@ -0,0 +1,49 @@
+"""denormalized show counters on Venue and Artist
+
+Revision ID: d4b7e2a91c3f
+Revises: c81d4e6f2a95
+Create Date: 2026-10-18 13:40:51.226914
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4b7e2a91c3f'
+down_revision = 'c81d4e6f2a95'
+branch_labels = None
+depends_on = None
+
+# Same statement as counters.recount(), spelled out so the migration does not
+# depend on the models.
+RECOUNT = '''
+UPDATE "{table}" SET
+    num_upcoming_shows = (SELECT count("Show".id) FROM "Show" WHERE "Show".{fk} = "{table}".id AND "Show".start_time >= :now),
+    next_show_time = (SELECT min("Show".start_time) FROM "Show" WHERE "Show".{fk} = "{table}".id AND "Show".start_time >= :now),
+    last_show_time = (SELECT max("Show".start_time) FROM "Show" WHERE "Show".{fk} = "{table}".id AND "Show".start_time < :now)
+'''
+
+
+def upgrade():
+    for table in ('Venue', 'Artist'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('num_upcoming_shows', sa.Integer(), server_default='0', nullable=False))
+            batch_op.add_column(sa.Column('next_show_time', sa.DateTime(), nullable=True))
+            batch_op.add_column(sa.Column('last_show_time', sa.DateTime(), nullable=True))
+            batch_op.create_index('ix_%s_next_show_time' % table.lower(), ['next_show_time'], unique=False)
+
+    bind = op.get_bind()
+    now = datetime.now()
+    bind.execute(sa.text(RECOUNT.format(table='Venue', fk='venue_id')), {'now': now})
+    bind.execute(sa.text(RECOUNT.format(table='Artist', fk='artist_id')), {'now': now})
+
+
+def downgrade():
+    for table in ('Artist', 'Venue'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_index('ix_%s_next_show_time' % table.lower())
+            batch_op.drop_column('last_show_time')
+            batch_op.drop_column('next_show_time')
+            batch_op.drop_column('num_upcoming_shows')
@@ -0,0 +1,130 @@
+"""partition shows by month of start_time
+
+Revision ID: e3a7c5b19d42
+Revises: 9d2c4f7a1e58
+Create Date: 2026-10-18 21:07:52.418330
+
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a7c5b19d42'
+down_revision = '9d2c4f7a1e58'
+branch_labels = None
+depends_on = None
+
+# Copied from config.SHOW_PARTITIONS_AHEAD at the time of this migration.
+MONTHS_AHEAD = 12
+
+COLUMNS = 'id, artist_id, venue_id, start_time, end_time'
+
+# (constraint name, column) for both sides of a show, on the plain table.
+EXCLUSION_CONSTRAINTS = [
+    ('ex_show_venue_overlap', 'venue_id'),
+    ('ex_show_artist_overlap', 'artist_id'),
+]
+
+INDEXES = [
+    ('ix_show_venue_id_start_time', 'venue_id'),
+    ('ix_show_artist_id_start_time', 'artist_id'),
+]
+
+
+def _add_months(month, months):
+    index = month.month - 1 + months
+    return date(month.year + index // 12, index % 12 + 1, 1)
+
+
+# A partitioned table cannot have exclusion constraints, so every partition
+# gets its own pair (partitions.exclusion_constraints() makes the same).
+def _partition_constraints(table):
+    for side in ('venue', 'artist'):
+        op.execute('ALTER TABLE "%s" ADD CONSTRAINT "ex_%s_%s_overlap" EXCLUDE USING gist '
+                   '(%s_id WITH =, tsrange(start_time, end_time) WITH &&)' % (table, table.lower(), side, side))
+
+
+def _create_indexes():
+    for name, column in INDEXES:
+        op.execute('CREATE INDEX %s ON "Show" (%s, start_time)' % (name, column))
+
+
+# Range partitioning is PostgreSQL only; other databases keep the plain
+# table. The rows are copied into a new partitioned "Show" with one
+# partition per month from the oldest show to MONTHS_AHEAD months from now,
+# plus a default partition for the rest, and the id sequence moves over to
+# it. The primary key must include the partition key: (id, start_time).
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute('ALTER TABLE "Show" RENAME TO "Show_unpartitioned"')
+    for name, _ in EXCLUSION_CONSTRAINTS:
+        op.execute('ALTER TABLE "Show_unpartitioned" DROP CONSTRAINT %s' % name)
+    op.execute('ALTER TABLE "Show_unpartitioned" DROP CONSTRAINT "Show_pkey"')
+    for name, _ in INDEXES:
+        op.execute('DROP INDEX %s' % name)
+    op.execute('ALTER SEQUENCE "Show_id_seq" OWNED BY NONE')
+
+    op.execute("""
+        CREATE TABLE "Show" (
+            id integer NOT NULL DEFAULT nextval('"Show_id_seq"'::regclass),
+            artist_id integer NOT NULL REFERENCES "Artist" (id),
+            venue_id integer NOT NULL REFERENCES "Venue" (id),
+            start_time timestamp without time zone NOT NULL,
+            end_time timestamp without time zone NOT NULL,
+            CONSTRAINT "Show_pkey" PRIMARY KEY (id, start_time)
+        ) PARTITION BY RANGE (start_time)
+    """)
+    _create_indexes()
+    op.execute('CREATE TABLE "Show_default" PARTITION OF "Show" DEFAULT')
+
+    oldest = bind.execute(sa.text('SELECT min(start_time) FROM "Show_unpartitioned"')).scalar()
+    today = date.today()
+    month = date(oldest.year, oldest.month, 1) if oldest is not None else date(today.year, today.month, 1)
+    last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+    partitions = ['Show_default']
+    while month <= last:
+        name = 'Show_%04d_%02d' % (month.year, month.month)
+        op.execute("""CREATE TABLE "%s" PARTITION OF "Show" FOR VALUES FROM ('%s') TO ('%s')"""
+                   % (name, month.isoformat(), _add_months(month, 1).isoformat()))
+        partitions.append(name)
+        month = _add_months(month, 1)
+
+    op.execute('INSERT INTO "Show" (%s) SELECT %s FROM "Show_unpartitioned"' % (COLUMNS, COLUMNS))
+    for name in partitions:
+        _partition_constraints(name)
+    op.execute('DROP TABLE "Show_unpartitioned"')
+    op.execute('ALTER SEQUENCE "Show_id_seq" OWNED BY "Show".id')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('ALTER TABLE "Show" RENAME TO "Show_partitioned"')
+    op.execute('ALTER TABLE "Show_partitioned" DROP CONSTRAINT "Show_pkey"')
+    for name, _ in INDEXES:
+        op.execute('DROP INDEX %s' % name)
+    op.execute('ALTER SEQUENCE "Show_id_seq" OWNED BY NONE')
+
+    op.execute("""
+        CREATE TABLE "Show" (
+            id integer NOT NULL DEFAULT nextval('"Show_id_seq"'::regclass),
+            artist_id integer NOT NULL REFERENCES "Artist" (id),
+            venue_id integer NOT NULL REFERENCES "Venue" (id),
+            start_time timestamp without time zone NOT NULL,
+            end_time timestamp without time zone NOT NULL,
+            CONSTRAINT "Show_pkey" PRIMARY KEY (id)
+        )
+    """)
+    op.execute('INSERT INTO "Show" (%s) SELECT %s FROM "Show_partitioned"' % (COLUMNS, COLUMNS))
+    _create_indexes()
+    for name, column in EXCLUSION_CONSTRAINTS:
+        op.execute('ALTER TABLE "Show" ADD CONSTRAINT %s EXCLUDE USING gist '
+                   '(%s WITH =, tsrange(start_time, end_time) WITH &&)' % (name, column))
+    op.execute('DROP TABLE "Show_partitioned"')
+    op.execute('ALTER SEQUENCE "Show_id_seq" OWNED BY "Show".id')
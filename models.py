@@ -0,0 +1,222 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from datetime import datetime, timedelta
+from routing import RoutingSQLAlchemy
+
+db = RoutingSQLAlchemy()
+
+#----------------------------------------------------------------------------#
+# Models.
+#----------------------------------------------------------------------------#
+
+# -- Genre association tables. The (genre_id, ...) indexes serve the
+# "venues/artists by genre" lookups; the primary keys serve the reverse.
+venue_genres = db.Table('venue_genres',
+    db.Column('venue_id', db.Integer, db.ForeignKey('Venue.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('genre_id', db.Integer, db.ForeignKey('Genre.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_venue_genres_genre_id_venue_id', 'genre_id', 'venue_id'),
+)
+
+artist_genres = db.Table('artist_genres',
+    db.Column('artist_id', db.Integer, db.ForeignKey('Artist.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('genre_id', db.Integer, db.ForeignKey('Genre.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_artist_genres_genre_id_artist_id', 'genre_id', 'artist_id'),
+)
+
+class Genre(db.Model):
+    __tablename__ = 'Genre'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), nullable=False, unique=True)
+
+    # Returns the Genre rows for the given names, creating any that are missing
+    @classmethod
+    def lookup(cls, names):
+        names = list(dict.fromkeys(name.strip() for name in names if name and name.strip()))
+        if not names:
+            return []
+        found = {genre.name: genre for genre in cls.query.filter(cls.name.in_(names))}
+        for name in names:
+            if name not in found:
+                found[name] = cls(name=name)
+                db.session.add(found[name])
+        return [found[name] for name in names]
+
+    def __repr__(self):
+        return f'<Genre id={self.id} name={self.name}>'
+
+
+class Venue(db.Model):
+    __tablename__ = 'Venue'
+    __table_args__ = (
+        db.Index('ix_venue_city_state', 'city', 'state'),
+        db.Index('ix_venue_next_show_time', 'next_show_time'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(), nullable=False)
+    city = db.Column(db.String(120), nullable=False)
+    state = db.Column(db.String(120), nullable=False)
+    address = db.Column(db.String(120), nullable=False)
+    phone = db.Column(db.String(120), nullable=False)
+    genre = db.Column(db.String())  # comma-joined copy of genre_tags, kept for text search
+    facebook_link = db.Column(db.String(120))
+    image_link = db.Column(db.String(525), nullable=False)
+    website_link = db.Column(db.String(120))
+    seeking_talent = db.Column(db.Boolean(), nullable=True, default=False)
+    seeking_description = db.Column(db.String(525))
+
+    # -- Show counters, maintained by counters.py
+    num_upcoming_shows = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    next_show_time = db.Column(db.DateTime)
+    last_show_time = db.Column(db.DateTime)
+
+    # -- Relationship between tables
+    artists = db.relationship('Artist', secondary='Show', viewonly=True)  # deletes go through shows
+    shows = db.relationship('Show', backref='Venue', lazy=True, cascade='all, delete-orphan', overlaps='artists')
+    genre_tags = db.relationship('Genre', secondary=venue_genres, lazy='selectin', order_by='Genre.name')
+
+    # This is implemented to return a dictionary of venues
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'city': self.city,
+            'state': self.state,
+            'address': self.address,
+            'phone': self.phone,
+            'genre': [genre.name for genre in self.genre_tags],
+            'image_link': self.image_link,
+            'facebook_link': self.facebook_link,
+            'website_link': self.website_link,
+            'seeking_talent': self.seeking_talent,
+            'seeking_description': self.seeking_description,
+        }
+
+    def __repr__(self):
+        return f'<Venue id={self.id} name={self.name} city={self.city} state={self.city}>'
+
+    # TODO: implement any missing fields, as a database migration using Flask-Migrate (Done)
+
+class Artist(db.Model):
+    __tablename__ = 'Artist'
+    __table_args__ = (
+        db.Index('ix_artist_next_show_time', 'next_show_time'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String, nullable=False)
+    city = db.Column(db.String(120), nullable=False)
+    state = db.Column(db.String(120), nullable=False)
+    phone = db.Column(db.String(120), nullable=False)
+    genres = db.Column(db.String())  # comma-joined copy of genre_tags, kept for text search
+    facebook_link = db.Column(db.String(120), nullable=False)
+    image_link = db.Column(db.String(500), nullable=False)
+    website_link = db.Column(db.String(120), nullable=False)
+    seeking_venue = db.Column(db.Boolean(), default=False)
+    seeking_description = db.Column(db.String(525))
+
+    # -- Show counters, maintained by counters.py
+    num_upcoming_shows = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    next_show_time = db.Column(db.DateTime)
+    last_show_time = db.Column(db.DateTime)
+
+    # -- Relationship between tables
+    venues = db.relationship('Venue', secondary='Show', viewonly=True)  # deletes go through shows
+    shows = db.relationship('Show', backref='Artist', lazy=True, cascade='all, delete-orphan', overlaps='artists,venues')
+    genre_tags = db.relationship('Genre', secondary=artist_genres, lazy='selectin', order_by='Genre.name')
+
+    # This is implemented to return a dictionary of artists
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'city': self.city,
+            'state': self.state,
+            'phone': self.phone,
+            'genres': [genre.name for genre in self.genre_tags],
+            'image_link': self.image_link,
+            'facebook_link': self.facebook_link,
+            'website_link': self.website_link,
+            'seeking_venue': self.seeking_venue,
+            'seeking_description': self.seeking_description,
+        }
+
+    def __repr__(self):
+        return f'<Artist id={self.id} name={self.name} city={self.city} state={self.city}>'
+    
+    # TODO: implement any missing fields, as a database migration using Flask-Migrate (Done)
+
+# Length of a show created without an end time.
+DEFAULT_SHOW_DURATION = timedelta(hours=3)
+
+def _default_end_time(context):
+    start_time = context.get_current_parameters().get('start_time') or datetime.utcnow()
+    return start_time + DEFAULT_SHOW_DURATION
+
+# A show occupies its venue and its artist for [start_time, end_time). On
+# PostgreSQL, exclusion constraints from migration 9d2c4f7a1e58 keep two
+# shows of the same venue or artist from overlapping; see schedule.py.
+# There the table is also partitioned by month of start_time (migration
+# e3a7c5b19d42, partitions.py), with (id, start_time) as its primary key.
+class Show(db.Model):
+    __tablename__ = 'Show'
+    __table_args__ = (
+        db.Index('ix_show_venue_id_start_time', 'venue_id', 'start_time'),
+        db.Index('ix_show_artist_id_start_time', 'artist_id', 'start_time'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    artist_id = db.Column(db.Integer, db.ForeignKey('Artist.id'), nullable=False)
+    venue_id = db.Column(db.Integer, db.ForeignKey('Venue.id'), nullable=False)
+    start_time = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    end_time = db.Column(db.DateTime, nullable=False, default=_default_end_time)
+    venue = db.relationship('Venue', overlaps='Venue,artists,shows,venues')
+    artist = db.relationship('Artist', overlaps='Artist,artists,shows,venues')
+
+    # This is implemented to return a dictionary of artists for a show
+    def show_artist(self):
+        return {
+            'artist_id': self.artist_id,
+            'artist_name': self.artist.name,
+            'artist_image_link': self.artist.image_link,
+            'start_time': self.start_time
+        }
+
+    #  This is implemented to return a dictionary of venues for a show
+    def show_venue(self):
+        return {
+            'venue_id': self.venue_id,
+            'venue_name': self.venue.name,
+            'venue_image_link': self.venue.image_link,
+            'start_time': self.start_time
+        }
+
+    # This is implemented to return a dictionary of shows
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'artist_id': self.artist_id,
+            'venue_id': self.venue_id,
+            'start_time': self.start_time.isoformat(),
+            'end_time': self.end_time.isoformat(),
+        }
+
+    def __repr__(self):
+        return f'<Show id={self.id} artist_id={self.artist_id} venue_id={self.venue_id} start_time={self.start_time}'
+
+# TODO Implement Show and Artist models, and complete all model relationships and properties, as a database migration. (Done)
+
+# One row per table whose contents the pages show; `version` goes up in every
+# transaction that writes to that table (see versions.py). Together the rows
+# stamp the data a page was rendered from, for ETags and cache keys.
+class DataVersion(db.Model):
+    __tablename__ = 'data_version'
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, server_default='0')
+
+    def __repr__(self):
+        return f'<DataVersion name={self.name} version={self.version}>'
@@ -0,0 +1,100 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from flask import Blueprint, abort, current_app, jsonify, render_template, request
+import autocomplete
+import queries
+from extensions import response_cache, sql_profiler
+from models import db
+from pool import pool_stats
+from routing import replica_reads
+from versions import conditional
+
+bp = Blueprint('pages', __name__)
+
+#----------------------------------------------------------------------------#
+# Controllers.
+#----------------------------------------------------------------------------#
+
+@bp.route('/')
+def index():
+  return render_template('pages/home.html')
+
+
+#  Genres
+#  ----------------------------------------------------------------
+
+@bp.route('/genres')
+@replica_reads
+@conditional
+@response_cache.cached('genres')
+def genres():
+    return render_template('pages/genres.html', genres=queries.genre_counts())
+
+@bp.route('/genres/<genre>')
+@replica_reads
+@conditional
+@response_cache.cached('genres')
+def show_genre(genre):
+    data = queries.by_genre(genre)
+    if data is None:
+        abort(404)
+    return render_template('pages/genre.html', genre=data)
+
+
+#  Autocomplete
+#  ----------------------------------------------------------------
+
+# Name suggestions for the search boxes and the new show form, answered from
+# the in-process prefix index: /autocomplete?q=mus&type=venue
+@bp.route('/autocomplete')
+@replica_reads
+def autocomplete_names():
+    kinds = request.args.getlist('type') or ['venue', 'artist']
+    limit = request.args.get('limit', current_app.config['AUTOCOMPLETE_LIMIT'], type=int)
+    limit = max(1, min(limit, current_app.config['AUTOCOMPLETE_MAX_LIMIT']))
+    return jsonify(autocomplete.suggest(request.args.get('q', ''), kinds, limit,
+                                        max_age=current_app.config['AUTOCOMPLETE_MAX_AGE']))
+
+
+#  Cache
+#  ----------------------------------------------------------------
+
+@bp.route('/cache/stats')
+def cache_stats():
+    return jsonify(response_cache.stats())
+
+#  Health
+#  ----------------------------------------------------------------
+
+@bp.route('/health/pool')
+def health_pool():
+    return jsonify(pool_stats(db.engine))
+
+#  Profiler
+#  ----------------------------------------------------------------
+
+# Shows or switches the SQL profiler. Only available when PROFILER_TOKEN is
+# set, and the token must be sent in the X-Profiler-Token header.
+@bp.route('/profiler', methods=['GET', 'POST'])
+def profiler_state():
+    token = current_app.config.get('PROFILER_TOKEN')
+    if not token:
+        abort(404)
+    if request.headers.get('X-Profiler-Token') != token:
+        abort(403)
+    if request.method == 'POST':
+        if request.form.get('enabled', '') in ('1', 'true', 'yes'):
+            sql_profiler.enable()
+        else:
+            sql_profiler.disable()
+    return jsonify({'enabled': sql_profiler.enabled})
+
+@bp.app_errorhandler(404)
+def not_found_error(error):
+    return render_template('errors/404.html'), 404
+
+@bp.app_errorhandler(500)
+def server_error(error):
+    return render_template('errors/500.html'), 500
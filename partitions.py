@@ -0,0 +1,210 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import gzip
+import json
+import os
+import re
+from datetime import date, datetime
+from sqlalchemy import func, text
+import versions
+from models import db, Show
+
+#----------------------------------------------------------------------------#
+# Month partitions of the Show table.
+#
+# On PostgreSQL, migration e3a7c5b19d42 makes "Show" a table partitioned by
+# range of start_time: "Show_2026_10" holds [2026-10-01, 2026-11-01), and
+# "Show_default" whatever falls outside the month partitions. A query with a
+# start_time range reads only the months it covers, and an old month can be
+# detached and dropped whole. PostgreSQL cannot put the overlap exclusion
+# constraints on a partitioned table, so each partition carries its own;
+# schedule.insert_show() covers shows that cross into the next month.
+#
+# Other databases keep one plain table. Archiving works there too, with a
+# DELETE per month.
+#----------------------------------------------------------------------------#
+
+DEFAULT_PARTITION = 'Show_default'
+COLUMNS = ('id', 'artist_id', 'venue_id', 'start_time', 'end_time')
+_MONTH_PARTITION = re.compile(r'^Show_(\d{4})_(\d{2})$')
+
+
+class PartitionError(Exception):
+    pass
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+def add_months(month, months):
+    index = month.month - 1 + months
+    return date(month.year + index // 12, index % 12 + 1, 1)
+
+def partition_name(month):
+    return 'Show_%04d_%02d' % (month.year, month.month)
+
+def _bounds(month):
+    return datetime(month.year, month.month, 1), datetime.combine(add_months(month, 1), datetime.min.time())
+
+def is_partitioned():
+    if db.engine.dialect.name != 'postgresql':
+        return False
+    return db.session.execute(text("""SELECT relkind FROM pg_class WHERE oid = '"Show"'::regclass""")).scalar() == 'p'
+
+# Attached month partitions, {first day of the month: table name}.
+def month_partitions():
+    rows = db.session.execute(text("""
+        SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = '"Show"'::regclass"""))
+    found = {}
+    for name, in rows:
+        match = _MONTH_PARTITION.match(name)
+        if match:
+            found[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return found
+
+# The per-partition overlap constraints (the same as migration e3a7c5b19d42
+# creates).
+def exclusion_constraints(table):
+    return ['ALTER TABLE "%s" ADD CONSTRAINT "ex_%s_%s_overlap" EXCLUDE USING gist '
+            '(%s_id WITH =, tsrange(start_time, end_time) WITH &&)' % (table, table.lower(), side, side)
+            for side in ('venue', 'artist')]
+
+#----------------------------------------------------------------------------#
+# Creating partitions.
+#----------------------------------------------------------------------------#
+
+# Creates and attaches the partition for `month`, moving its shows out of
+# the default partition. The partition is filled and constrained before it
+# is attached, and a CHECK matching its bounds lets ATTACH skip re-reading
+# it, so the parent is only locked briefly. Returns the number of shows
+# moved. The caller commits.
+def create_partition(month):
+    name = partition_name(month)
+    low, high = (bound.isoformat(' ') for bound in _bounds(month))
+    columns = ', '.join(COLUMNS)
+    db.session.execute(text('CREATE TABLE "%s" (LIKE "Show" INCLUDING DEFAULTS)' % name))
+    db.session.execute(text("""ALTER TABLE "%s" ADD CONSTRAINT "%s_bounds" """
+                            """CHECK (start_time >= '%s' AND start_time < '%s')""" % (name, name, low, high)))
+    moved = db.session.execute(text("""
+        WITH moved AS (
+            DELETE FROM "%s" WHERE start_time >= :low AND start_time < :high RETURNING %s
+        )
+        INSERT INTO "%s" (%s) SELECT %s FROM moved""" % (DEFAULT_PARTITION, columns, name, columns, columns)),
+        {'low': low, 'high': high}).rowcount
+    for statement in exclusion_constraints(name):
+        db.session.execute(text(statement))
+    db.session.execute(text("""ALTER TABLE "Show" ATTACH PARTITION "%s" FOR VALUES FROM ('%s') TO ('%s')"""
+                            % (name, low, high)))
+    db.session.execute(text('ALTER TABLE "%s" DROP CONSTRAINT "%s_bounds"' % (name, name)))
+    return moved
+
+# Creates the missing month partitions from `first` through `last`, one
+# transaction each. Returns [(name, shows moved)] for those created.
+def ensure_partitions(first, last):
+    if not is_partitioned():
+        raise PartitionError('The Show table is not partitioned (PostgreSQL only).')
+    existing = month_partitions()
+    created, month = [], month_start(first)
+    while month <= last:
+        if month not in existing:
+            try:
+                moved = create_partition(month)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            created.append((partition_name(month), moved))
+        month = add_months(month, 1)
+    return created
+
+#----------------------------------------------------------------------------#
+# Archiving.
+#----------------------------------------------------------------------------#
+
+# Writes the shows of `month` to <directory>/Show_YYYY_MM.ndjson.gz, one JSON
+# object per line as `flask import --kind show` reads them, then removes
+# them: by detaching and dropping the month's partition where there is one,
+# with a DELETE otherwise. The file is synced to disk before the removal
+# commits, and the removal is rolled back unless it covers exactly the rows
+# written. Empty months leave no file. Returns the number of shows archived.
+def archive_month(month, directory, batch_size=10000):
+    name = partition_name(month)
+    path = os.path.join(directory, name + '.ndjson.gz')
+    if os.path.exists(path):
+        raise PartitionError('%s already exists; move it away to archive %s again.' % (path, name))
+    partition = month_partitions().get(month) if is_partitioned() else None
+    low, high = _bounds(month)
+    table = Show.__table__
+    in_month = (table.c.start_time >= low) & (table.c.start_time < high)
+
+    os.makedirs(directory, exist_ok=True)
+    temporary, written, kept = path + '.part', 0, False
+    try:
+        if partition is not None:
+            # Holds off writes to the month until it is gone.
+            db.session.execute(text('LOCK TABLE "%s" IN SHARE MODE' % partition))
+        rows = db.session.execute(
+            db.select(*(table.c[column] for column in COLUMNS)).where(in_month)
+            .order_by(table.c.start_time, table.c.id).execution_options(stream_results=True))
+        with open(temporary, 'wb') as raw:
+            with gzip.open(raw, 'wt', encoding='utf-8') as out:
+                for row in rows.yield_per(batch_size):
+                    out.write(json.dumps({
+                        'id': row.id,
+                        'artist_id': row.artist_id,
+                        'venue_id': row.venue_id,
+                        'start_time': row.start_time.isoformat(),
+                        'end_time': row.end_time.isoformat(),
+                    }) + '\n')
+                    written += 1
+            raw.flush()
+            os.fsync(raw.fileno())
+
+        if partition is not None:
+            removed = db.session.execute(text('SELECT count(*) FROM "%s"' % partition)).scalar()
+            db.session.execute(text('ALTER TABLE "Show" DETACH PARTITION "%s"' % partition))
+            db.session.execute(text('DROP TABLE "%s"' % partition))
+        else:
+            removed = db.session.execute(table.delete().where(in_month)).rowcount
+        if removed != written:
+            raise PartitionError('%s changed while it was archived (%d shows written, %d removed); try again.'
+                                 % (name, written, removed))
+        if written:
+            versions.bump(db.session, ['Show', 'Venue', 'Artist'])
+            os.replace(temporary, path)
+            kept = True
+        db.session.commit()
+    except BaseException:
+        db.session.rollback()
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        if kept:
+            os.remove(path)
+        raise
+    if not written:
+        os.remove(temporary)
+    return written
+
+# Archives every month before `before` (the first day of a month), oldest
+# first, calling `log` with each month's result. Returns the total archived.
+def archive(before, directory, log=lambda message: None):
+    table = Show.__table__
+    first = db.session.execute(db.select(func.min(table.c.start_time))
+                               .where(table.c.start_time < datetime(before.year, before.month, 1))).scalar()
+    months = {month for month in (month_partitions() if is_partitioned() else {}) if month < before}
+    if first is not None:
+        month = month_start(first)
+        while month < before:
+            months.add(month)
+            month = add_months(month, 1)
+    db.session.commit()
+
+    total = 0
+    for month in sorted(months):
+        count = archive_month(month, directory)
+        total += count
+        log('%s: %d shows archived' % (partition_name(month), count))
+    return total
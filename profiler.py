@@ -0,0 +1,131 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+#----------------------------------------------------------------------------#
+# Profiler.
+#----------------------------------------------------------------------------#
+
+# Counts the statements each request issues, the time spent in the database
+# and repeated statement shapes (the N+1 signature), and reports them as a
+# Server-Timing header and one JSON log line per request.
+#
+# The engine listeners are only attached while the profiler is enabled, so
+# when it is off there is no per-statement cost at all. Switch it with
+# enable()/disable(), SQL_PROFILER_ENABLED, or POST /profiler.
+class SQLProfiler:
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.slow_query_ms = 200
+        self.duplicate_threshold = 3
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.slow_query_ms = app.config.get('SQL_SLOW_QUERY_MS', 200)
+        self.duplicate_threshold = app.config.get('SQL_DUPLICATE_THRESHOLD', 3)
+        self.logger = logging.getLogger(app.logger.name + '.sql')
+        app.after_request(self._after_request)
+        app.extensions['sql_profiler'] = self
+        if app.config.get('SQL_PROFILER_ENABLED'):
+            self.enable()
+
+    def enable(self):
+        with self._lock:
+            if not self.enabled:
+                event.listen(Engine, 'before_cursor_execute', self._before_execute)
+                event.listen(Engine, 'after_cursor_execute', self._after_execute)
+                self.enabled = True
+
+    def disable(self):
+        with self._lock:
+            if self.enabled:
+                event.remove(Engine, 'before_cursor_execute', self._before_execute)
+                event.remove(Engine, 'after_cursor_execute', self._after_execute)
+                self.enabled = False
+
+    # -- Engine events
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('profiler_start', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('profiler_start')
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        if not has_request_context():
+            return
+
+        profile = g.get('sql_profile')
+        if profile is None:
+            profile = g.sql_profile = {'count': 0, 'time_ms': 0.0, 'shapes': Counter(), 'slow': []}
+        profile['count'] += 1
+        profile['time_ms'] += elapsed_ms
+        # Statements are already parameterized, so the text is the shape.
+        profile['shapes'][statement] += 1
+        if elapsed_ms >= self.slow_query_ms:
+            profile['slow'].append((conn.engine, statement, None if executemany else parameters, elapsed_ms))
+
+    # -- Reporting
+
+    def _explain(self, engine, statement, parameters):
+        if not statement.lstrip().upper().startswith('SELECT'):
+            return None
+        prefix = 'EXPLAIN ' if engine.dialect.name == 'postgresql' else 'EXPLAIN QUERY PLAN '
+        try:
+            with engine.connect() as conn:
+                rows = conn.exec_driver_sql(prefix + statement, parameters or ())
+                return '\n'.join(str(row[-1]) if len(row) > 1 else str(row[0]) for row in rows)
+        except Exception as e:
+            return 'EXPLAIN failed: %s' % e
+
+    def _after_request(self, response):
+        profile = g.pop('sql_profile', None)
+        if profile is None:
+            return response
+
+        duplicates = [
+            {'statement': statement, 'count': count}
+            for statement, count in profile['shapes'].most_common()
+            if count >= self.duplicate_threshold
+        ]
+        response.headers.add(
+            'Server-Timing',
+            'db;dur=%.1f;desc="%d queries, %d repeated shapes"'
+            % (profile['time_ms'], profile['count'], len(duplicates)))
+
+        self.logger.info(json.dumps({
+            'event': 'sql_profile',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'queries': profile['count'],
+            'db_ms': round(profile['time_ms'], 2),
+            'duplicates': duplicates,
+        }))
+
+        for engine, statement, parameters, elapsed_ms in profile['slow']:
+            self.logger.warning(json.dumps({
+                'event': 'slow_query',
+                'path': request.path,
+                'ms': round(elapsed_ms, 2),
+                'statement': statement,
+                'plan': self._explain(engine, statement, parameters),
+            }))
+        # EXPLAIN's own statements land in a fresh profile; drop it.
+        g.pop('sql_profile', None)
+        return response
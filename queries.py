@@ -0,0 +1,318 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import base64
+from datetime import datetime
+from itertools import groupby
+from sqlalchemy import case, func, tuple_
+from models import db, Venue, Artist, Show, Genre, venue_genres, artist_genres
+
+#----------------------------------------------------------------------------#
+# Venues.
+#----------------------------------------------------------------------------#
+
+# Rows of `query`, all at once or, with `stream`, off a server-side cursor
+# `batch_size` rows at a time.
+def _rows(query, stream=False, batch_size=1000):
+    if stream:
+        return query.execution_options(stream_results=True).yield_per(batch_size)
+    return query.all()
+
+# Returns venues grouped by area, each with its number of upcoming shows.
+# The count is the denormalized counter on Venue (see counters.py), so this
+# reads the Venue table alone and never touches Show.
+#
+# With `stream`, areas and the venues in them are generators fed from a
+# server-side cursor, for stream_template(): iterate them in order, once.
+def venue_areas(stream=False, batch_size=1000):
+    query = db.session.query(
+        Venue.city,
+        Venue.state,
+        Venue.id,
+        Venue.name,
+        Venue.num_upcoming_shows,
+    ).order_by(
+        Venue.city, Venue.state, Venue.name, Venue.id
+    )
+
+    areas = ({
+        'city': city,
+        'state': state,
+        'venues': ({
+            'id': venue.id,
+            'name': venue.name,
+            'num_upcoming_shows': venue.num_upcoming_shows,
+        } for venue in venues),
+    } for (city, state), venues in groupby(_rows(query, stream, batch_size), key=lambda row: (row.city, row.state)))
+    if stream:
+        return areas
+    return [dict(area, venues=list(area['venues'])) for area in areas]
+
+
+# Ids of the artists with at least one show at the venue.
+def venue_artist_ids(venue_id):
+    rows = db.session.query(Show.artist_id).filter(Show.venue_id == venue_id).distinct()
+    return [row.artist_id for row in rows]
+
+# Ids of the venues the artist has at least one show at.
+def artist_venue_ids(artist_id):
+    rows = db.session.query(Show.venue_id).filter(Show.artist_id == artist_id).distinct()
+    return [row.venue_id for row in rows]
+
+#----------------------------------------------------------------------------#
+# Artists.
+#----------------------------------------------------------------------------#
+
+# Every artist, alphabetically, with their number of upcoming shows. A
+# generator off a server-side cursor with `stream`.
+def artist_list(stream=False, batch_size=1000):
+    query = db.session.query(Artist.id, Artist.name, Artist.num_upcoming_shows).order_by(Artist.name)
+    artists = ({
+        'id': artist.id,
+        'name': artist.name,
+        'num_upcoming_shows': artist.num_upcoming_shows,
+    } for artist in _rows(query, stream, batch_size))
+    return artists if stream else list(artists)
+
+#----------------------------------------------------------------------------#
+# Genres.
+#----------------------------------------------------------------------------#
+
+# Every genre with its number of venues and artists, from two grouped counts
+# over the association tables.
+def genre_counts():
+    venue_counts = dict(db.session.query(
+        venue_genres.c.genre_id, func.count()).group_by(venue_genres.c.genre_id).all())
+    artist_counts = dict(db.session.query(
+        artist_genres.c.genre_id, func.count()).group_by(artist_genres.c.genre_id).all())
+    return [{
+        'name': genre.name,
+        'num_venues': venue_counts.get(genre.id, 0),
+        'num_artists': artist_counts.get(genre.id, 0),
+    } for genre in Genre.query.order_by(Genre.name)]
+
+# Venues and artists tagged with the genre, found through the
+# (genre_id, ...) association indexes. Returns None for an unknown genre.
+def by_genre(name):
+    genre = Genre.query.filter_by(name=name).first()
+    if genre is None:
+        return None
+    venues = db.session.query(Venue.id, Venue.name, Venue.city, Venue.state).join(
+        venue_genres, venue_genres.c.venue_id == Venue.id
+    ).filter(venue_genres.c.genre_id == genre.id).order_by(Venue.name).all()
+    artists = db.session.query(Artist.id, Artist.name, Artist.city, Artist.state).join(
+        artist_genres, artist_genres.c.artist_id == Artist.id
+    ).filter(artist_genres.c.genre_id == genre.id).order_by(Artist.name).all()
+    return {
+        'name': genre.name,
+        'venues': [dict(row._mapping) for row in venues],
+        'artists': [dict(row._mapping) for row in artists],
+    }
+
+#----------------------------------------------------------------------------#
+# Shows.
+#----------------------------------------------------------------------------#
+
+# Cursors are opaque to the client: a direction ('n' for the page after the
+# key, 'p' for the page before it) plus the (start_time, id) of the edge row.
+def encode_cursor(direction, start_time, show_id):
+    raw = f'{direction}|{start_time.isoformat()}|{show_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        direction, start_time, show_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        if direction not in ('n', 'p'):
+            raise ValueError(direction)
+        return direction, datetime.fromisoformat(start_time), int(show_id)
+    except (ValueError, UnicodeError):
+        raise ValueError('Invalid cursor: ' + cursor)
+
+def _show(row):
+    return {
+        'id': row.id,
+        'venue_id': row.venue_id,
+        'venue_name': row.venue_name,
+        'artist_id': row.artist_id,
+        'artist_name': row.artist_name,
+        'artist_image_link': row.artist_image_link,
+        'start_time': row.start_time,
+    }
+
+# Returns one page of shows ordered by (start_time, id) with the venue and
+# artist columns joined in, so the page costs one bounded query however large
+# the Show table gets. Raises ValueError for a malformed cursor. With
+# `upcoming_only`, a show starting exactly at `now` still counts as upcoming,
+# as on the detail pages, in the counters and in the API.
+#
+# With `stream`, forward pages come straight off a server-side cursor:
+# page['shows'] is a generator, and the cursors are only filled in once it
+# has been iterated to the end, so templates must read them after the loop.
+def shows_page(cursor=None, limit=30, upcoming_only=False, now=None, stream=False, batch_size=1000):
+    if now is None:
+        now = datetime.now()
+
+    query = db.session.query(
+        Show.id,
+        Show.start_time,
+        Show.venue_id,
+        Venue.name.label('venue_name'),
+        Show.artist_id,
+        Artist.name.label('artist_name'),
+        Artist.image_link.label('artist_image_link'),
+    ).join(Venue, Venue.id == Show.venue_id).join(Artist, Artist.id == Show.artist_id)
+
+    if upcoming_only:
+        query = query.filter(Show.start_time >= now)
+
+    direction = 'n'
+    if cursor:
+        direction, start_time, show_id = decode_cursor(cursor)
+        key = tuple_(Show.start_time, Show.id)
+        if direction == 'n':
+            query = query.filter(key > tuple_(start_time, show_id))
+        else:
+            query = query.filter(key < tuple_(start_time, show_id))
+
+    if direction == 'n':
+        query = query.order_by(Show.start_time, Show.id)
+    else:
+        query = query.order_by(Show.start_time.desc(), Show.id.desc())
+
+    # One extra row tells us whether there is another page in this direction.
+    query = query.limit(limit + 1)
+    page = {'shows': None, 'next_cursor': None, 'prev_cursor': None}
+
+    if stream and direction == 'n':
+        def shows():
+            last = None
+            for i, row in enumerate(_rows(query, True, batch_size)):
+                if i == limit:
+                    page['next_cursor'] = encode_cursor('n', last.start_time, last.id)
+                    return
+                if i == 0 and cursor:
+                    page['prev_cursor'] = encode_cursor('p', row.start_time, row.id)
+                last = row
+                yield _show(row)
+        page['shows'] = shows()
+        return page
+
+    rows = query.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == 'p':
+        rows.reverse()
+
+    page['shows'] = [_show(row) for row in rows]
+    if rows:
+        first, last = rows[0], rows[-1]
+        if direction == 'p' or has_more:
+            page['next_cursor'] = encode_cursor('n', last.start_time, last.id)
+        if (direction == 'n' and cursor) or (direction == 'p' and has_more):
+            page['prev_cursor'] = encode_cursor('p', first.start_time, first.id)
+    return page
+
+# Shows starting in [start, end), soonest first, with their venue and artist
+# joined in; only those at venues in `city` (any case) and by artists tagged
+# `genre` when given. The range is a plain start_time >= start AND
+# start_time < end, so on the partitioned Show table (see partitions.py)
+# PostgreSQL only reads the months it covers. Returns at most `limit` shows
+# and whether there were more.
+def calendar_shows(start, end, city=None, genre=None, limit=1000):
+    query = db.session.query(
+        Show.id,
+        Show.start_time,
+        Show.end_time,
+        Show.venue_id,
+        Venue.name.label('venue_name'),
+        Venue.address.label('venue_address'),
+        Venue.city.label('venue_city'),
+        Venue.state.label('venue_state'),
+        Show.artist_id,
+        Artist.name.label('artist_name'),
+        Artist.image_link.label('artist_image_link'),
+    ).join(Venue, Venue.id == Show.venue_id).join(Artist, Artist.id == Show.artist_id).filter(
+        Show.start_time >= start, Show.start_time < end)
+
+    if city:
+        query = query.filter(func.lower(Venue.city) == city.strip().lower())
+    if genre:
+        tagged = db.select(artist_genres.c.artist_id).join(
+            Genre, Genre.id == artist_genres.c.genre_id).where(Genre.name == genre)
+        query = query.filter(Show.artist_id.in_(tagged))
+
+    rows = query.order_by(Show.start_time, Show.id).limit(limit + 1).all()
+    return [dict(_show(row), end_time=row.end_time, venue_address=row.venue_address,
+                 venue_city=row.venue_city, venue_state=row.venue_state)
+            for row in rows[:limit]], len(rows) > limit
+
+
+#----------------------------------------------------------------------------#
+# Venue and artist detail pages.
+#----------------------------------------------------------------------------#
+
+# One section (upcoming or past) of a detail page: shows for the entity with
+# the other side of the show joined in, bounded by `limit` and continued from
+# `cursor`. Upcoming shows run soonest first, past shows most recent first.
+def _detail_section(column, entity_id, other, other_fk, prefix, now, upcoming, limit, cursor):
+    query = db.session.query(
+        Show.id,
+        Show.start_time,
+        other.id.label(prefix + '_id'),
+        other.name.label(prefix + '_name'),
+        other.image_link.label(prefix + '_image_link'),
+    ).join(other, other.id == other_fk).filter(column == entity_id)
+
+    key = tuple_(Show.start_time, Show.id)
+    if upcoming:
+        query = query.filter(Show.start_time >= now).order_by(Show.start_time, Show.id)
+    else:
+        query = query.filter(Show.start_time < now).order_by(Show.start_time.desc(), Show.id.desc())
+    if cursor:
+        _, start_time, show_id = decode_cursor(cursor)
+        if upcoming:
+            query = query.filter(key > tuple_(start_time, show_id))
+        else:
+            query = query.filter(key < tuple_(start_time, show_id))
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    fields = (prefix + '_id', prefix + '_name', prefix + '_image_link', 'start_time')
+    shows = [{field: getattr(row, field) for field in fields} for row in rows]
+    next_cursor = encode_cursor('n', rows[-1].start_time, rows[-1].id) if has_more else None
+    return shows, next_cursor
+
+def _detail_shows(column, entity_id, other, other_fk, prefix, now, limit, upcoming_cursor, past_cursor):
+    upcoming_count, past_count = db.session.query(
+        func.count(case((Show.start_time >= now, 1))),
+        func.count(case((Show.start_time < now, 1))),
+    ).filter(column == entity_id).one()
+
+    upcoming_shows, upcoming_next = _detail_section(
+        column, entity_id, other, other_fk, prefix, now, True, limit, upcoming_cursor)
+    past_shows, past_next = _detail_section(
+        column, entity_id, other, other_fk, prefix, now, False, limit, past_cursor)
+
+    return {
+        'upcoming_shows': upcoming_shows,
+        'upcoming_shows_count': upcoming_count,
+        'upcoming_shows_next': upcoming_next,
+        'past_shows': past_shows,
+        'past_shows_count': past_count,
+        'past_shows_next': past_next,
+    }
+
+# Shows for the venue page: counts from one COUNT query, then at most `limit`
+# upcoming and `limit` past shows with their artists joined in.
+# Raises ValueError for a malformed cursor.
+def venue_shows(venue_id, now, limit=12, upcoming_cursor=None, past_cursor=None):
+    return _detail_shows(Show.venue_id, venue_id, Artist, Show.artist_id, 'artist',
+                         now, limit, upcoming_cursor, past_cursor)
+
+# Shows for the artist page, with their venues joined in.
+def artist_shows(artist_id, now, limit=12, upcoming_cursor=None, past_cursor=None):
+    return _detail_shows(Show.artist_id, artist_id, Venue, Show.venue_id, 'venue',
+                         now, limit, upcoming_cursor, past_cursor)
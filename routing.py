@@ -0,0 +1,82 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import random
+import time
+from functools import wraps
+from flask import current_app, g, has_request_context, session
+from flask_sqlalchemy import SQLAlchemy, SignallingSession
+from sqlalchemy import event, orm
+
+#----------------------------------------------------------------------------#
+# Read-replica routing.
+#
+# Replicas are configured as SQLALCHEMY_BINDS named 'replica_<n>'. Views
+# decorated with @replica_reads run their queries against one replica picked
+# for the request; everything else, and every flush, uses the primary. After
+# a user writes, their requests stay on the primary for
+# REPLICA_STICKY_SECONDS so they read their own writes (e.g. the redirect
+# after edit_artist_submission).
+#----------------------------------------------------------------------------#
+
+STICKY_KEY = '_db_primary_until'
+
+class RoutingSession(SignallingSession):
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if not self._flushing and has_request_context():
+            replica = g.get('db_replica')
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        event.listen(self.session, 'after_flush', _mark_flush)
+        event.listen(self.session, 'do_orm_execute', _mark_execute)
+
+    def init_app(self, app):
+        super().init_app(app)
+        app.after_request(_remember_write)
+
+    def replica_engines(self, app=None):
+        app = self.get_app(app)
+        keys = sorted(key for key in app.config.get('SQLALCHEMY_BINDS') or {} if key.startswith('replica_'))
+        return [self.get_engine(app, bind=key) for key in keys]
+
+
+def _mark_write():
+    if has_request_context():
+        g.db_wrote = True
+
+def _mark_flush(db_session, flush_context):
+    _mark_write()
+
+# Bulk insert()/update()/delete() statements never flush.
+def _mark_execute(orm_execute_state):
+    if not orm_execute_state.is_select:
+        _mark_write()
+
+def _remember_write(response):
+    if g.pop('db_wrote', False):
+        session[STICKY_KEY] = time.time() + current_app.config.get('REPLICA_STICKY_SECONDS', 5)
+    return response
+
+# Marks a view as read-only so its queries may go to a replica. Put it below
+# @response_cache.cached so cache hits never touch a database at all.
+def replica_reads(f):
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if session.get(STICKY_KEY, 0) < time.time():
+            replicas = current_app.extensions['sqlalchemy'].db.replica_engines()
+            if replicas:
+                g.db_replica = random.choice(replicas)
+        return f(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,301 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import random
+import threading
+from sqlalchemy import DateTime, event, func, literal, select
+from models import db, Show
+
+#----------------------------------------------------------------------------#
+# Interval tree.
+#----------------------------------------------------------------------------#
+
+class _Node:
+    __slots__ = ('key', 'priority', 'left', 'right', 'max_end')
+
+    def __init__(self, key):
+        self.key = key
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.max_end = key[1]
+
+
+def _update(node):
+    node.max_end = node.key[1]
+    for child in (node.left, node.right):
+        if child is not None and child.max_end > node.max_end:
+            node.max_end = child.max_end
+    return node
+
+# Splits a treap into keys < key and keys >= key (<= and > with `inclusive`).
+def _split(node, key, inclusive=False):
+    if node is None:
+        return None, None
+    if node.key < key or (inclusive and node.key == key):
+        node.right, right = _split(node.right, key, inclusive)
+        return _update(node), right
+    left, node.left = _split(node.left, key, inclusive)
+    return left, _update(node)
+
+
+def _merge(left, right):
+    if left is None or right is None:
+        return left or right
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _update(left)
+    right.left = _merge(left, right.left)
+    return _update(right)
+
+# Half-open [start, end) intervals tagged with an id, in a treap ordered by
+# (start, end, id) where every node also knows the latest end below it.
+# Adding, removing and finding an overlap are O(log n) expected; listing the
+# k intervals that overlap a range is O(log n + k). Empty intervals overlap
+# nothing and are not stored.
+class IntervalTree:
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, start, end, item_id):
+        if not start < end:
+            return
+        left, right = _split(self._root, (start, end, item_id))
+        self._root = _merge(_merge(left, _Node((start, end, item_id))), right)
+        self._size += 1
+
+    def remove(self, start, end, item_id):
+        key = (start, end, item_id)
+        left, right = _split(self._root, key)
+        found, right = _split(right, key, inclusive=True)
+        self._root = _merge(left, right)
+        if found is not None:
+            self._size -= 1
+
+    # (start, end, id) of every interval overlapping [start, end), in order.
+    def overlapping(self, start, end):
+        stack, node = [], self._root
+        while stack or node is not None:
+            # Nothing under a node whose latest end is <= start can overlap.
+            while node is not None and node.max_end > start:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.key[0] >= end:
+                return
+            if node.key[1] > start:
+                yield node.key
+            node = node.right
+
+    def first_overlap(self, start, end):
+        return next(self.overlapping(start, end), None)
+
+#----------------------------------------------------------------------------#
+# Schedules.
+#
+# On PostgreSQL the database does the work: the exclusion constraints from
+# migration 9d2c4f7a1e58 (a pair per month partition since e3a7c5b19d42)
+# reject overlapping shows, and their GiST indexes answer overlap and
+# availability queries in O(log n) per month. Elsewhere (SQLite in
+# development) each process keeps an interval tree per venue and per artist,
+# built on first use and kept in step with its own committed writes, like
+# the search index.
+#----------------------------------------------------------------------------#
+
+SIDES = (('venue', Show.venue_id), ('artist', Show.artist_id))
+
+
+def uses_exclusion_constraints():
+    return db.engine.dialect.name == 'postgresql'
+
+
+class ScheduleIndex:
+
+    def __init__(self):
+        self.trees = {'venue': {}, 'artist': {}}
+        self.shows = {}
+        self.built = False
+        self._lock = threading.RLock()
+
+    def add(self, show_id, venue_id, artist_id, start, end):
+        with self._lock:
+            self._remove(show_id)
+            self.shows[show_id] = (venue_id, artist_id, start, end)
+            for kind, owner_id in (('venue', venue_id), ('artist', artist_id)):
+                self.trees[kind].setdefault(owner_id, IntervalTree()).add(start, end, show_id)
+
+    def remove(self, show_id):
+        with self._lock:
+            self._remove(show_id)
+
+    def _remove(self, show_id):
+        if show_id not in self.shows:
+            return
+        venue_id, artist_id, start, end = self.shows.pop(show_id)
+        for kind, owner_id in (('venue', venue_id), ('artist', artist_id)):
+            tree = self.trees[kind].get(owner_id)
+            if tree is not None:
+                tree.remove(start, end, show_id)
+
+    def overlapping(self, kind, owner_id, start, end):
+        with self._lock:
+            tree = self.trees[kind].get(owner_id)
+            return list(tree.overlapping(start, end)) if tree is not None else []
+
+    def first_overlap(self, kind, owner_id, start, end):
+        with self._lock:
+            tree = self.trees[kind].get(owner_id)
+            return tree.first_overlap(start, end) if tree is not None else None
+
+    # Replaces the contents with `rows` of (id, venue_id, artist_id, start,
+    # end), filled aside and swapped in like TrigramIndex.build().
+    def build(self, rows):
+        fresh = ScheduleIndex()
+        for row in rows:
+            fresh.add(*row)
+        with self._lock:
+            self.trees, self.shows = fresh.trees, fresh.shows
+            self.built = True
+
+    def clear(self):
+        with self._lock:
+            self.trees = {'venue': {}, 'artist': {}}
+            self.shows = {}
+            self.built = False
+
+
+schedule_index = ScheduleIndex()
+
+
+# No lock is held while the rows load (see autocomplete._ensure_built).
+def _ensure_built():
+    if not schedule_index.built:
+        rows = db.session.query(Show.id, Show.venue_id, Show.artist_id, Show.start_time, Show.end_time)
+        schedule_index.build(rows.yield_per(10000))
+    return schedule_index
+
+# Builds the index up front where it is used; asgi.py calls this on startup.
+def warm():
+    if not uses_exclusion_constraints():
+        _ensure_built()
+
+# Writes that go around the ORM queue their changes here; a record of None
+# removes the show.
+def queue_change(session, show_id, record):
+    fields = None
+    if record is not None:
+        fields = (record['venue_id'], record['artist_id'], record['start_time'], record['end_time'])
+    session.info.setdefault('schedule_pending', []).append((show_id, fields))
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault('schedule_pending', [])
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Show):
+            pending.append((obj.id, (obj.venue_id, obj.artist_id, obj.start_time, obj.end_time)))
+    for obj in session.deleted:
+        if isinstance(obj, Show):
+            pending.append((obj.id, None))
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_changes(session):
+    for show_id, fields in session.info.pop('schedule_pending', []):
+        if not schedule_index.built:
+            continue
+        if fields is None:
+            schedule_index.remove(show_id)
+        else:
+            schedule_index.add(show_id, *fields)
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('schedule_pending', None)
+
+#----------------------------------------------------------------------------#
+# Conflicts.
+#----------------------------------------------------------------------------#
+
+# The start_time bound is implied by the overlap, but lets PostgreSQL skip
+# the month partitions after `end` (see partitions.py).
+def _overlaps(start, end):
+    return (Show.start_time < end) & func.tsrange(Show.start_time, Show.end_time).op('&&')(func.tsrange(start, end))
+
+# pg_advisory_xact_lock() key spaces for the venues' and artists' schedules.
+VENUE_LOCK = 5301
+ARTIST_LOCK = 5302
+
+# Inserts a show record unless it overlaps another show of its venue or
+# artist. Returns the new id, or None on a conflict. On PostgreSQL that is
+# one INSERT ... SELECT ... WHERE NOT EXISTS. The exclusion constraints only
+# hold within one month partition, so the insert first takes transaction
+# locks on the venue's and the artist's schedules (always in that order):
+# an insert racing another for the same venue or artist waits for it to
+# commit, and its NOT EXISTS then sees that show in whichever month it is.
+def insert_show(record):
+    table = Show.__table__
+    if uses_exclusion_constraints():
+        db.session.execute(select(func.pg_advisory_xact_lock(VENUE_LOCK, record['venue_id']),
+                                  func.pg_advisory_xact_lock(ARTIST_LOCK, record['artist_id'])))
+        start, end = record['start_time'], record['end_time']
+        clashes = [select(Show.id).where(column == record[kind + '_id'], _overlaps(start, end)).exists()
+                   for kind, column in SIDES]
+        values = select(literal(record['artist_id']), literal(record['venue_id']),
+                        literal(start, DateTime), literal(end, DateTime)).where(~clashes[0], ~clashes[1])
+        return db.session.execute(
+            table.insert().from_select(['artist_id', 'venue_id', 'start_time', 'end_time'], values)
+            .returning(table.c.id)).scalar()
+    if find_conflict(record) is not None:
+        return None
+    show_id = db.session.execute(table.insert().values(record)).inserted_primary_key[0]
+    queue_change(db.session, show_id, record)
+    return show_id
+
+# The first show that overlaps a record's time at its venue or by its
+# artist, as (kind, show id, start, end), or None.
+def find_conflict(record):
+    start, end = record['start_time'], record['end_time']
+    for kind, column in SIDES:
+        owner_id = record[kind + '_id']
+        if uses_exclusion_constraints():
+            row = db.session.query(Show.id, Show.start_time, Show.end_time) \
+                .filter(column == owner_id, _overlaps(start, end)).order_by(Show.start_time).first()
+            found = (row.start_time, row.end_time, row.id) if row else None
+        else:
+            found = _ensure_built().first_overlap(kind, owner_id, start, end)
+        if found is not None:
+            return kind, found[2], found[0], found[1]
+    return None
+
+#----------------------------------------------------------------------------#
+# Availability.
+#----------------------------------------------------------------------------#
+
+# The venue's shows overlapping [start, end), in order: (id, start, end).
+def venue_bookings(venue_id, start, end):
+    if uses_exclusion_constraints():
+        rows = db.session.query(Show.id, Show.start_time, Show.end_time) \
+            .filter(Show.venue_id == venue_id, _overlaps(start, end)).order_by(Show.start_time, Show.id)
+        return [tuple(row) for row in rows]
+    return [(show_id, show_start, show_end) for show_start, show_end, show_id
+            in _ensure_built().overlapping('venue', venue_id, start, end)]
+
+# Free stretches of at least `min_length` between the venue's shows within
+# [start, end), as (start, end) pairs, plus the bookings themselves.
+def venue_availability(venue_id, start, end, min_length):
+    bookings = venue_bookings(venue_id, start, end)
+    free, cursor = [], start
+    for _, show_start, show_end in bookings:
+        if show_start - cursor >= min_length:
+            free.append((cursor, show_start))
+        cursor = max(cursor, show_end)
+    if end - cursor >= min_length:
+        free.append((cursor, end))
+    return bookings, free
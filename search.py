@@ -0,0 +1,244 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import heapq
+import re
+import threading
+from sqlalchemy import and_, event, func, or_
+from models import db, Venue, Artist
+
+#----------------------------------------------------------------------------#
+# Trigrams.
+#----------------------------------------------------------------------------#
+
+# Matches pg_trgm's defaults so both backends agree on what counts as a hit.
+WORD_SIMILARITY_THRESHOLD = 0.6
+
+_word_split = re.compile(r'[^\w]+')
+
+# Extracts trigrams the way pg_trgm does: lowercase, split into words, pad each
+# word with two leading blanks and one trailing blank.
+def trigrams(text):
+    grams = set()
+    for word in _word_split.split((text or '').lower()):
+        if not word:
+            continue
+        padded = '  ' + word + ' '
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+# Share of the term's trigrams found in the text; a close approximation of
+# pg_trgm's word_similarity(term, text).
+def word_similarity(term_grams, text):
+    if not term_grams:
+        return 0.0
+    return len(term_grams & trigrams(text)) / len(term_grams)
+
+#----------------------------------------------------------------------------#
+# In-process index.
+#----------------------------------------------------------------------------#
+
+# Inverted trigram index used when the database has no pg_trgm (SQLite in
+# development). Documents are (name, city, state, genres) tuples keyed by id.
+class TrigramIndex:
+
+    def __init__(self):
+        self.built = False
+        self._docs = {}
+        self._postings = {}
+        self._lock = threading.RLock()
+
+    def _fields(self, doc):
+        name, city, state, genres = doc
+        return (name, f'{city}, {state}', genres or '')
+
+    def add(self, doc_id, name, city, state, genres):
+        with self._lock:
+            self.remove(doc_id)
+            doc = (name, city, state, genres)
+            self._docs[doc_id] = doc
+            for field in self._fields(doc):
+                for gram in trigrams(field):
+                    self._postings.setdefault(gram, set()).add(doc_id)
+
+    def remove(self, doc_id):
+        with self._lock:
+            doc = self._docs.pop(doc_id, None)
+            if doc is None:
+                return
+            for field in self._fields(doc):
+                for gram in trigrams(field):
+                    ids = self._postings.get(gram)
+                    if ids is not None:
+                        ids.discard(doc_id)
+                        if not ids:
+                            del self._postings[gram]
+
+    # Replaces the contents with `rows` of (id, name, city, state, genres).
+    # The new index is filled aside and swapped in, so searches never wait
+    # on the build.
+    def build(self, rows):
+        fresh = TrigramIndex()
+        for row in rows:
+            fresh.add(*row)
+        with self._lock:
+            self._docs, self._postings = fresh._docs, fresh._postings
+            self.built = True
+
+    def clear(self):
+        with self._lock:
+            self._docs.clear()
+            self._postings.clear()
+            self.built = False
+
+    def _score(self, term, term_grams, doc):
+        best = 0.0
+        for field in self._fields(doc):
+            if term in field.lower():
+                return 1.0
+            best = max(best, word_similarity(term_grams, field))
+        return best
+
+    # Returns (total, [(doc_id, name), ...]) for the best `limit` matches.
+    def search(self, term, limit):
+        term = term.strip().lower()
+        term_grams = trigrams(term)
+        with self._lock:
+            if len(term) < 3:
+                # Too short to have a full trigram; same as pg_trgm, fall back
+                # to checking every document.
+                candidates = self._docs.keys()
+            else:
+                candidates = set()
+                for gram in term_grams:
+                    candidates |= self._postings.get(gram, set())
+
+            hits = []
+            for doc_id in candidates:
+                doc = self._docs[doc_id]
+                score = self._score(term, term_grams, doc)
+                if score >= WORD_SIMILARITY_THRESHOLD:
+                    hits.append((-score, doc[0], doc_id))
+
+        top = heapq.nsmallest(limit, hits)
+        return len(hits), [(doc_id, name) for _, name, doc_id in top]
+
+venue_index = TrigramIndex()
+artist_index = TrigramIndex()
+
+_indexes = {
+    Venue: (venue_index, lambda v: (v.name, v.city, v.state, v.genre)),
+    Artist: (artist_index, lambda a: (a.name, a.city, a.state, a.genres)),
+}
+
+# No lock is held while the rows load (see autocomplete._ensure_built):
+# requests racing to the first build each load them and the last swap wins.
+def _ensure_built(model):
+    index, fields = _indexes[model]
+    if not index.built:
+        index.build([(row.id,) + tuple(fields(row)) for row in db.session.query(model).all()])
+    return index
+
+# Builds the indexes up front where they are used; asgi.py calls this on
+# startup.
+def warm():
+    if not _uses_trigram_index():
+        for model in _indexes:
+            _ensure_built(model)
+
+# Keep the in-process indexes in step with committed writes. Changes are
+# collected per flush, or queued by writes that go around the ORM
+# (writes.py), and only applied once the transaction commits.
+def queue_change(session, model, doc_id, fields):
+    session.info.setdefault('search_pending', []).append((model, doc_id, fields))
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault('search_pending', [])
+    for obj in list(session.new) + list(session.dirty):
+        if type(obj) in _indexes:
+            pending.append((type(obj), obj.id, _indexes[type(obj)][1](obj)))
+    for obj in session.deleted:
+        if type(obj) in _indexes:
+            pending.append((type(obj), obj.id, None))
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_changes(session):
+    for model, doc_id, fields in session.info.pop('search_pending', []):
+        index = _indexes[model][0]
+        if not index.built:
+            continue
+        if fields is None:
+            index.remove(doc_id)
+        else:
+            index.add(doc_id, *fields)
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('search_pending', None)
+
+#----------------------------------------------------------------------------#
+# Search.
+#----------------------------------------------------------------------------#
+
+def _uses_trigram_index():
+    return db.engine.dialect.name == 'postgresql'
+
+# Ranked search against the pg_trgm GIN indexes. ILIKE and the word
+# similarity operator are both served by gin_trgm_ops; the window count gives
+# the total number of matches in the same round trip.
+def _search_sql(model, genre_column, term, limit):
+    place = model.city + ', ' + model.state
+    score = func.greatest(
+        func.word_similarity(term, model.name),
+        func.word_similarity(term, place),
+        func.word_similarity(term, genre_column),
+    )
+    pattern = '%' + term + '%'
+    if ',' in term:
+        # "city, state" searches match the two columns separately.
+        city, state = (part.strip() for part in term.rsplit(',', 1))
+        match = and_(model.city.ilike('%' + city + '%'), model.state.ilike(state + '%'))
+    else:
+        match = or_(
+            model.name.ilike(pattern),
+            model.city.ilike(pattern),
+            genre_column.ilike(pattern),
+            model.name.op('%>')(term),
+            model.city.op('%>')(term),
+            genre_column.op('%>')(term),
+        )
+    rows = db.session.query(
+        model.id,
+        model.name,
+        func.count().over().label('total'),
+    ).filter(match).order_by(score.desc(), model.name).limit(limit).all()
+    total = rows[0].total if rows else 0
+    return total, [(row.id, row.name) for row in rows]
+
+def _search(model, genre_column, term, limit):
+    term = (term or '').strip()
+    if not term:
+        # An empty search lists everything, as the plain ILIKE search did.
+        total = db.session.query(func.count(model.id)).scalar()
+        rows = db.session.query(model.id, model.name).order_by(model.name).limit(limit).all()
+        hits = [(row.id, row.name) for row in rows]
+    elif _uses_trigram_index():
+        total, hits = _search_sql(model, genre_column, term, limit)
+    else:
+        total, hits = _ensure_built(model).search(term, limit)
+    return {
+        'count': total,
+        'data': [{'id': doc_id, 'name': name} for doc_id, name in hits],
+    }
+
+# Searches venues by name, "city, state" and genre. Returns the total match
+# count and the best `limit` results, most similar first.
+def search_venues(term, limit=50):
+    return _search(Venue, Venue.genre, term, limit)
+
+# Searches artists by name, "city, state" and genre.
+def search_artists(term, limit=50):
+    return _search(Artist, Artist.genres, term, limit)
@@ -0,0 +1,199 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from datetime import date, datetime, timedelta, timezone
+from itertools import groupby
+from flask import Blueprint, Response, abort, current_app, flash, render_template, request, url_for
+from sqlalchemy.exc import SQLAlchemyError
+import ical
+import queries
+import writes
+from extensions import response_cache
+from forms import GENRES, ShowForm
+from routing import replica_reads
+from streaming import stream_template
+from versions import conditional, varies_by_day
+
+bp = Blueprint('shows', __name__)
+
+#----------------------------------------------------------------------------#
+# Calendar.
+#----------------------------------------------------------------------------#
+
+CALENDAR_VIEWS = ('day', 'week', 'month')
+CALENDAR_ARGS = ('from', 'to', 'view', 'city', 'genre')
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+# The (view, start, end) a calendar request covers, as dates, end exclusive:
+# ?from= (today by default) widened to its day, week (from Monday) or month
+# by ?view=, or up to ?to= for a custom range. Without either, `default_days`
+# from ?from= if given, a week otherwise. Aborts with 400 on bad input.
+def _calendar_range(default_days=None):
+    view = request.args.get('view') or None
+    try:
+        day = date.fromisoformat(request.args['from']) if request.args.get('from') else date.today()
+        to = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        abort(400)
+
+    # Near 0001-01-01 or 9999-12-31 the period can run past what a date holds.
+    try:
+        if to is not None:
+            view, start, end = 'range', day, to
+        elif view is None and default_days:
+            view, start, end = 'range', day, day + timedelta(days=default_days)
+        elif view == 'day':
+            start, end = day, day + timedelta(days=1)
+        elif view in ('week', None):
+            view, start = 'week', day - timedelta(days=day.weekday())
+            end = start + timedelta(days=7)
+        elif view == 'month':
+            start = day.replace(day=1)
+            end = _add_months(start, 1)
+        else:
+            abort(400)
+    except (ValueError, OverflowError):
+        abort(400)
+    if not start < end or end - start > timedelta(days=current_app.config['CALENDAR_MAX_DAYS']):
+        abort(400)
+    return view, start, end
+
+# A calendar URL with the current city and genre filters.
+def _calendar_url(endpoint, view, start, end=None):
+    args = {'from': start.isoformat(), 'city': request.args.get('city') or None,
+            'genre': request.args.get('genre') or None}
+    if view == 'range':
+        args['to'] = end.isoformat()
+    else:
+        args['view'] = view
+    return url_for(endpoint, **args)
+
+def _calendar_shows(start, end, limit):
+    return queries.calendar_shows(datetime.combine(start, datetime.min.time()),
+                                  datetime.combine(end, datetime.min.time()),
+                                  city=request.args.get('city'), genre=request.args.get('genre'), limit=limit)
+
+# /shows?view=week&from=2026-11-02&city=San Francisco&genre=Jazz: the shows
+# of one day, week or month (or ?to= for any range), grouped by day.
+def _calendar_page():
+    import babel.dates
+
+    view, start, end = _calendar_range()
+    shows, truncated = _calendar_shows(start, end, current_app.config['CALENDAR_MAX_SHOWS'])
+    length = end - start
+    if view == 'day':
+        title = babel.dates.format_date(start, 'EEEE, MMMM d, y', locale='en')
+    elif view == 'week':
+        title = 'Week of ' + babel.dates.format_date(start, 'MMMM d, y', locale='en')
+    elif view == 'month':
+        title = babel.dates.format_date(start, 'MMMM y', locale='en')
+    else:
+        title = '%s to %s' % (babel.dates.format_date(start, 'MMMM d, y', locale='en'),
+                              babel.dates.format_date(end - timedelta(days=1), 'MMMM d, y', locale='en'))
+    try:
+        previous = _add_months(start, -1) if view == 'month' else start - length
+        following = end + length
+    except (ValueError, OverflowError):
+        abort(400)
+    anchor = date.today() if start <= date.today() < end else start
+    return render_template(
+        'pages/calendar.html',
+        title=title,
+        view=view,
+        start=start,
+        days=[(babel.dates.format_date(day, 'EEEE, MMMM d', locale='en'), list(group))
+              for day, group in groupby(shows, key=lambda show: show['start_time'].date())],
+        truncated=truncated,
+        city=request.args.get('city', ''),
+        genre=request.args.get('genre', ''),
+        genres=GENRES,
+        links={
+            'previous': _calendar_url('shows.shows', view, previous, previous + length),
+            'next': _calendar_url('shows.shows', view, end, following),
+            'today': _calendar_url('shows.shows', 'day' if view == 'range' else view, date.today()),
+            'ical': _calendar_url('shows.shows_ical', view, start, end),
+        },
+        views={name: _calendar_url('shows.shows', name, anchor) for name in CALENDAR_VIEWS},
+    )
+
+#----------------------------------------------------------------------------#
+# Controllers.
+#----------------------------------------------------------------------------#
+
+@bp.route('/shows')
+@replica_reads
+@varies_by_day
+@conditional
+@response_cache.cached('shows')
+def shows():
+  # displays list of shows at /shows
+  # TODO: replace with real venues data.
+
+    if any(request.args.get(name) for name in CALENDAR_ARGS):
+        return _calendar_page()
+
+    stream = current_app.config['STREAM_LISTINGS']
+    max_limit = current_app.config['SHOWS_STREAM_MAX_PER_PAGE' if stream else 'SHOWS_MAX_PER_PAGE']
+    limit = request.args.get('limit', current_app.config['SHOWS_PER_PAGE'], type=int)
+    limit = max(1, min(limit, max_limit))
+    upcoming = request.args.get('upcoming', '') in ('1', 'true', 'yes')
+    try:
+        page = queries.shows_page(request.args.get('cursor'), limit=limit, upcoming_only=upcoming,
+                                  stream=stream, batch_size=current_app.config['STREAM_BATCH_SIZE'])
+    except ValueError:
+        abort(400)
+
+    # The template reads the pager cursors after the loop, once a streamed
+    # page has filled them in.
+    if stream:
+        return stream_template('pages/shows.html', page=page, limit=limit, upcoming=upcoming)
+    return render_template('pages/shows.html', page=page, limit=limit, upcoming=upcoming)
+
+# The same shows as an iCalendar feed, for calendar apps to subscribe to:
+# /shows.ics?city=Boston&genre=Jazz covers the next CALENDAR_FEED_DAYS days
+# unless ?from=, ?to= or ?view= say otherwise.
+@bp.route('/shows.ics')
+@replica_reads
+@varies_by_day
+@conditional
+def shows_ical():
+    view, start, end = _calendar_range(current_app.config['CALENDAR_FEED_DAYS'])
+    shows, _ = _calendar_shows(start, end, current_app.config['CALENDAR_FEED_MAX_SHOWS'])
+    events = [{
+        'uid': 'show-%d@fyyur' % show['id'],
+        'start': show['start_time'],
+        'end': show['end_time'],
+        'summary': '%s at %s' % (show['artist_name'], show['venue_name']),
+        'location': ', '.join(part for part in (show['venue_name'], show['venue_address'],
+                                                show['venue_city'], show['venue_state']) if part),
+        'url': url_for('artists.show_artist', artist_id=show['artist_id'], _external=True),
+    } for show in shows]
+    return Response(ical.calendar('Fyyur shows', events, datetime.now(timezone.utc)), mimetype='text/calendar')
+
+@bp.route('/shows/create')
+def create_shows():
+  # renders form. do not touch.
+  form = ShowForm()
+  return render_template('forms/new_show.html', form=form)
+
+@bp.route('/shows/create', methods=['POST'])
+def create_show_submission():
+  # called to create new shows in the db, upon submitting new show listing form
+  # TODO: insert form data as a new Show record in the db, instead (Done)
+    form = ShowForm(request.form)
+    try:
+        show = writes.create_show(form)
+        response_cache.invalidate('shows', 'venues', 'venue:%d' % show['venue_id'], 'artist:%d' % show['artist_id'])
+        flash('Show was successfully listed!') # on successful db insert, flash success (Done)
+    except writes.WriteError as e:
+        flash('Show could not be listed: ' + str(e))
+    except SQLAlchemyError:
+        current_app.logger.exception('Creating show failed')
+        flash('Unsuccessful. Show could not be listed.') # TODO: on unsuccessful db insert, flash an error instead.(Done)
+  
+    return render_template('pages/home.html')
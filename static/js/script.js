@@ -2,3 +2,103 @@ window.parseISOString = function parseISOString(s) {
   var b = s.split(/\D+/);
   return new Date(Date.UTC(b[0], --b[1], b[2], b[3], b[4], b[5], b[6]));
 };
+
+// Typeahead for inputs marked data-autocomplete="venue" or "artist", fed by
+// /autocomplete. Picking a suggestion opens its page, or, with
+// data-autocomplete-target, fills that input with the id instead.
+(function () {
+  function attach(input) {
+    var kind = input.getAttribute('data-autocomplete');
+    var target = input.getAttribute('data-autocomplete-target');
+    var list = document.createElement('ul');
+    var items = [];
+    var active = -1;
+    var sequence = 0;
+    var timer = null;
+
+    list.className = 'autocomplete-results';
+    list.hidden = true;
+    input.parentNode.classList.add('autocomplete');
+    input.parentNode.appendChild(list);
+
+    function close() {
+      list.hidden = true;
+      active = -1;
+    }
+
+    function highlight(index) {
+      active = index;
+      for (var i = 0; i < list.children.length; i++) {
+        list.children[i].className = i === active ? 'active' : '';
+      }
+    }
+
+    function choose(item) {
+      close();
+      if (target) {
+        document.querySelector(target).value = item.id;
+        input.value = item.name;
+      } else {
+        window.location = '/' + kind + 's/' + item.id;
+      }
+    }
+
+    function render(results) {
+      items = results;
+      list.innerHTML = '';
+      results.forEach(function (item, index) {
+        var li = document.createElement('li');
+        li.textContent = item.name;
+        li.addEventListener('mousedown', function (event) {
+          event.preventDefault();
+          choose(items[index]);
+        });
+        list.appendChild(li);
+      });
+      highlight(-1);
+      list.hidden = results.length === 0;
+    }
+
+    function lookup() {
+      var term = input.value.trim();
+      var current = ++sequence;
+      if (!term) {
+        render([]);
+        return;
+      }
+      fetch('/autocomplete?type=' + kind + '&q=' + encodeURIComponent(term))
+        .then(function (response) { return response.json(); })
+        .then(function (data) {
+          // Answers can arrive out of order; only show the latest one.
+          if (current === sequence) {
+            render(data[kind + 's'] || []);
+          }
+        });
+    }
+
+    input.addEventListener('input', function () {
+      clearTimeout(timer);
+      timer = setTimeout(lookup, 100);
+    });
+    input.addEventListener('keydown', function (event) {
+      if (list.hidden) {
+        return;
+      }
+      if (event.key === 'ArrowDown') {
+        event.preventDefault();
+        highlight(Math.min(active + 1, items.length - 1));
+      } else if (event.key === 'ArrowUp') {
+        event.preventDefault();
+        highlight(Math.max(active - 1, -1));
+      } else if (event.key === 'Enter' && active >= 0) {
+        event.preventDefault();
+        choose(items[active]);
+      } else if (event.key === 'Escape') {
+        close();
+      }
+    });
+    input.addEventListener('blur', close);
+  }
+
+  document.querySelectorAll('[data-autocomplete]').forEach(attach);
+})();
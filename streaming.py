@@ -0,0 +1,40 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from flask import Response, current_app, stream_with_context
+from flask.signals import before_render_template, template_rendered
+
+#----------------------------------------------------------------------------#
+# Streamed templates.
+#----------------------------------------------------------------------------#
+
+# Like render_template, but the page goes out while it is being rendered
+# (Flask 2.2's stream_template, for the Flask this app pins). Pass
+# generators as context (see queries.py, stream=True) and rows flow from the
+# database cursor through the template's loops to the client, so the first
+# byte does not wait for the last row and memory stays flat.
+#
+# Jinja yields one small string per template node; they are joined into
+# chunks of about `chunk_size` characters so the server and the compression
+# middleware see a few kilobytes at a time. The request context, and with it
+# the database session and connection, lives until the last chunk is sent.
+def stream_template(template_name, chunk_size=8192, **context):
+    app = current_app._get_current_object()
+    template = app.jinja_env.get_or_select_template(template_name)
+    app.update_template_context(context)
+
+    def generate():
+        before_render_template.send(app, template=template, context=context)
+        buffered, size = [], 0
+        for piece in template.generate(context):
+            buffered.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield ''.join(buffered)
+                buffered, size = [], 0
+        if buffered:
+            yield ''.join(buffered)
+        template_rendered.send(app, template=template, context=context)
+
+    return Response(stream_with_context(generate()), mimetype='text/html')
@@ -0,0 +1,63 @@
+#----------------------------------------------------------------------------#
+# Upcoming/past boundary.
+#
+# A show starting exactly at `now` is upcoming everywhere: in the /shows
+# upcoming filter, on the venue and artist pages and in the listing
+# counters. Runs against a temporary SQLite database.
+#
+#   pytest tests
+#----------------------------------------------------------------------------#
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import counters
+import queries
+from app import create_app
+from config import engine_options
+from models import db, Artist, Show, Venue
+
+
+def test_show_starting_now_is_upcoming(tmp_path):
+    url = 'sqlite:///' + str(tmp_path / 'boundary.db')
+    app = create_app()
+    app.config.update(SQLALCHEMY_DATABASE_URI=url, SQLALCHEMY_ENGINE_OPTIONS=engine_options(url),
+                      SQLALCHEMY_BINDS={}, TESTING=True)
+    now = datetime(2030, 1, 1, 20, 0)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(Artist.__table__.insert(), [{
+            'id': 1, 'name': 'Artist', 'city': 'City', 'state': 'TX', 'phone': '512-555-0100',
+            'image_link': 'https://example.com/a.png', 'facebook_link': 'https://www.facebook.com/a',
+            'website_link': 'https://example.com/a',
+        }])
+        db.session.execute(Venue.__table__.insert(), [{
+            'id': 1, 'name': 'Venue', 'city': 'City', 'state': 'TX', 'address': '1 Main St',
+            'phone': '512-555-0100', 'image_link': 'https://example.com/v.png',
+        }])
+        db.session.execute(Show.__table__.insert(), [
+            {'id': 1, 'artist_id': 1, 'venue_id': 1, 'start_time': now - timedelta(days=1),
+             'end_time': now - timedelta(days=1) + timedelta(hours=1)},
+            {'id': 2, 'artist_id': 1, 'venue_id': 1, 'start_time': now,
+             'end_time': now + timedelta(hours=1)},
+        ])
+        counters.recount(now)
+        db.session.commit()
+
+        page = queries.shows_page(upcoming_only=True, now=now)
+        assert [show['id'] for show in page['shows']] == [2]
+
+        for shows in (queries.venue_shows(1, now), queries.artist_shows(1, now)):
+            assert shows['upcoming_shows_count'] == 1
+            assert shows['past_shows_count'] == 1
+
+        venue = db.session.get(Venue, 1)
+        assert (venue.num_upcoming_shows, venue.next_show_time) == (1, now)
+        # Nothing is out of date until the show has started.
+        assert counters.roll_forward(now) == 0
+
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,82 @@
+#----------------------------------------------------------------------------#
+# Statement count of the venue listing.
+#
+# GET /venues must read every area, venue and upcoming-show count in one
+# statement however many venues and shows there are: no query per venue,
+# per city or per show. Runs against a temporary SQLite database with the
+# response cache and data-version ETags off, so the listing query is the
+# only statement the request needs.
+#
+#   pytest tests
+#----------------------------------------------------------------------------#
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import counters
+from app import create_app
+from config import engine_options
+from extensions import response_cache
+from models import db, Artist, Show, Venue
+
+LISTING_STATEMENTS = 1
+
+
+# An app on a fresh database with `venues` venues spread over up to seven
+# cities, each with two upcoming and two past shows. The rows go in around
+# the ORM and the counters are rebuilt from them, as `flask recount` does.
+def listing_app(directory, venues):
+    url = 'sqlite:///' + str(directory / 'venues.db')
+    app = create_app()
+    app.config.update(SQLALCHEMY_DATABASE_URI=url, SQLALCHEMY_ENGINE_OPTIONS=engine_options(url),
+                      SQLALCHEMY_BINDS={}, TESTING=True, ETAG_DATA_VERSION=False)
+    response_cache.enabled = False
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(Artist.__table__.insert(), [{
+            'id': 1, 'name': 'Artist', 'city': 'City 0', 'state': 'TX', 'phone': '512-555-0100',
+            'image_link': 'https://example.com/a.png', 'facebook_link': 'https://www.facebook.com/a',
+            'website_link': 'https://example.com/a',
+        }])
+        db.session.execute(Venue.__table__.insert(), [{
+            'id': i + 1, 'name': 'Venue %d' % i, 'city': 'City %d' % (i % 7), 'state': 'TX',
+            'address': '1 Main St', 'phone': '512-555-0100', 'image_link': 'https://example.com/v.png',
+        } for i in range(venues)])
+        db.session.execute(Show.__table__.insert(), [{
+            'artist_id': 1, 'venue_id': i + 1,
+            'start_time': now + timedelta(days=days, hours=i),
+            'end_time': now + timedelta(days=days, hours=i + 1),
+        } for i in range(venues) for days in (-14, -7, 7, 14)])
+        counters.recount(now)
+        db.session.commit()
+    return app
+
+
+@pytest.mark.parametrize('venues', [3, 30])
+def test_venue_listing_statement_count(tmp_path, venues):
+    app = listing_app(tmp_path, venues)
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            response = app.test_client().get('/venues')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+        db.session.remove()
+        db.engine.dispose()
+
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert 'Venue %d' % (venues - 1) in body
+    assert len(statements) == LISTING_STATEMENTS, statements
@@ -0,0 +1,197 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from datetime import date, datetime, timedelta
+from flask import Blueprint, abort, current_app, flash, jsonify, redirect, render_template, request, url_for
+from sqlalchemy.exc import SQLAlchemyError
+import counters
+import queries
+import schedule
+import search
+import writes
+from extensions import response_cache
+from forms import VenueForm
+from models import db, Venue
+from routing import replica_reads
+from streaming import stream_template
+from versions import conditional, varies_by_day
+
+bp = Blueprint('venues', __name__)
+
+#----------------------------------------------------------------------------#
+# Cache invalidation.
+#----------------------------------------------------------------------------#
+
+# Cached pages showing a venue's details: its own page, the listings, and the
+# pages of every artist with a show there.
+def venue_cache_namespaces(venue_id):
+    artist_ids = queries.venue_artist_ids(venue_id)
+    return ['venues', 'shows', 'genres', 'venue:%d' % venue_id] + ['artist:%d' % i for i in artist_ids]
+
+#----------------------------------------------------------------------------#
+# Controllers.
+#----------------------------------------------------------------------------#
+
+@bp.route('/venues')
+@replica_reads
+@conditional
+@response_cache.cached('venues')
+def venues():
+  # TODO: replace with real venues data.(Done)
+  #       num_upcoming_shows should be aggregated based on number of upcoming shows per venue.(Done)
+    if current_app.config['STREAM_LISTINGS']:
+        areas = queries.venue_areas(stream=True, batch_size=current_app.config['STREAM_BATCH_SIZE'])
+        return stream_template('pages/venues.html', areas=areas)
+    data = queries.venue_areas()
+    return render_template('pages/venues.html', areas=data);
+
+
+# ------ Search Venue -------- #
+@bp.route('/venues/search', methods=['POST'])
+@replica_reads
+def search_venues():
+  # TODO: implement search on artists with partial string search. Ensure it is case-insensitive.
+  # seach for Hop should return "The Musical Hop".
+  # search for "Music" should return "The Musical Hop" and "Park Square Live Music & Coffee" (All Done)
+    keyword = request.form.get('search_term', '')
+    response = search.search_venues(keyword, limit=current_app.config['SEARCH_RESULTS_LIMIT'])
+
+    return render_template('pages/search_venues.html', results=response, search_term=request.form.get('search_term', ''))
+
+@bp.route('/venues/<int:venue_id>')
+@replica_reads
+@conditional
+@response_cache.cached('venue:{venue_id}')
+def show_venue(venue_id):
+  # shows the venue page with the given venue_id (Done)
+  # TODO: replace with real venue data from the venues table, using venue_id (Done)
+
+    venue = Venue.query.get(venue_id)
+    if venue is None:
+        abort(404)
+
+    now = datetime.now()
+    tmp = venue.to_dict()
+    try:
+        # Past and upcoming shows, with their counts, come from the database
+        # already split and bounded; see more via the section cursors.
+        tmp.update(queries.venue_shows(venue_id, now, limit=current_app.config['DETAIL_SHOWS_PER_PAGE'],
+                                       upcoming_cursor=request.args.get('upcoming_cursor'),
+                                       past_cursor=request.args.get('past_cursor')))
+    except ValueError:
+        abort(400)
+
+    return render_template('pages/show_venue.html', venue=tmp)
+
+# Free slots between the venue's shows:
+# /venues/3/availability?from=2026-11-01&to=2026-11-08&min_minutes=120
+# covers [from, to), a week from today by default.
+@bp.route('/venues/<int:venue_id>/availability')
+@replica_reads
+@varies_by_day
+@conditional
+def venue_availability(venue_id):
+    if db.session.query(Venue.id).filter(Venue.id == venue_id).first() is None:
+        abort(404)
+    try:
+        start = datetime.fromisoformat(request.args['from']) if request.args.get('from') \
+            else datetime.combine(date.today(), datetime.min.time())
+        end = datetime.fromisoformat(request.args['to']) if request.args.get('to') \
+            else start + timedelta(days=current_app.config['AVAILABILITY_DAYS'])
+    except ValueError:
+        abort(400)
+    min_minutes = request.args.get('min_minutes', current_app.config['AVAILABILITY_MIN_MINUTES'], type=int)
+    if not start < end <= start + timedelta(days=current_app.config['AVAILABILITY_MAX_DAYS']) or min_minutes < 1:
+        abort(400)
+
+    bookings, free = schedule.venue_availability(venue_id, start, end, timedelta(minutes=min_minutes))
+    return jsonify({
+        'venue_id': venue_id,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'shows': [{'id': show_id, 'start_time': show_start.isoformat(), 'end_time': show_end.isoformat()}
+                  for show_id, show_start, show_end in bookings],
+        'free': [{'start': slot_start.isoformat(), 'end': slot_end.isoformat()} for slot_start, slot_end in free],
+    })
+
+#  Create Venue
+#  ----------------------------------------------------------------
+
+@bp.route('/venues/create', methods=['GET'])
+def create_venue_form():
+  form = VenueForm()
+  return render_template('forms/new_venue.html', form=form)
+
+@bp.route('/venues/create', methods=['POST'])
+def create_venue_submission():
+  # TODO: insert form data as a new Venue record in the db, instead (Done)
+  # TODO: modify data to be the data object returned from db insertion (Done)
+    form = VenueForm(request.form)
+    name = request.form.get('name', '')
+    try:
+      writes.create_venue(form)
+      response_cache.invalidate('venues', 'genres')
+      flash('New venue ' + name + '  successfully listed!') # on successful db insert, flash success (Done)
+    except writes.WriteError as e:
+      flash('Venue ' + name + ' was not listed: ' + str(e))
+    except SQLAlchemyError:
+      current_app.logger.exception('Creating venue %r failed', name)
+      flash('Venue ' + name + '  was not listed successfully.') # TODO: on unsuccessful db insert, flash an error instead. (Done)
+    return render_template('pages/home.html')
+
+# ------ Delete Venue ------- #
+
+@bp.route('/venues/<int:venue_id>/delete', methods=['GET', 'POST'])
+def delete_venue(venue_id):
+  # TODO: Complete this endpoint for taking a venue_id, and using
+  # SQLAlchemy ORM to delete a record. Handle cases where the session commit could fail. (Done)
+    get_venue = Venue.query.get(venue_id)
+    if get_venue is None:
+        abort(404)
+    name = get_venue.name
+    try:
+        affected = venue_cache_namespaces(venue_id)
+        counters.entity_removed(Venue, venue_id)
+        db.session.delete(get_venue)
+        db.session.commit()
+        response_cache.invalidate(*affected)
+        flash('Venue ' + name + ' was deleted successfully!')
+    except SQLAlchemyError:
+        db.session.rollback()
+        current_app.logger.exception('Deleting venue %d failed', venue_id)
+        flash('Venue was not deleted successfully.')
+    finally:
+        db.session.close()
+    return redirect(url_for('pages.index'))
+  # BONUS CHALLENGE: Implement a button to delete a Venue on a Venue Page, have it so that
+  # clicking that button delete it from the db then redirect the user to the homepage. (Done)
+
+#  Update
+#  ----------------------------------------------------------------
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['GET'])
+def edit_venue(venue_id):
+  form = VenueForm()
+  venue = Venue.query.get(venue_id)
+
+  # TODO: populate form with values from venue with ID <venue_id>(Done)
+  return render_template('forms/edit_venue.html', form=form, venue=venue)
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['POST'])
+def edit_venue_submission(venue_id):
+  # TODO: take values from the form submitted, and update existing
+  # venue record with ID <venue_id> using the new attributes(Done)
+    form = VenueForm(request.form)
+    try:
+        writes.update_venue(venue_id, form)
+        response_cache.invalidate(*venue_cache_namespaces(venue_id))
+        flash('Update successful!')
+    except writes.NotFound:
+        abort(404)
+    except writes.WriteError as e:
+        flash('The venue wasn\'t updated: ' + str(e))
+    except SQLAlchemyError:
+        current_app.logger.exception('Updating venue %d failed', venue_id)
+        flash('Update unsuccessful.  The venue ' + request.form.get('name', '') + ' wasn\'t updated. Please try again or contact the webmaster at webmaster@fyyur.com')
+    return redirect(url_for('venues.show_venue', venue_id=venue_id))
@@ -0,0 +1,118 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import hashlib
+from datetime import date
+from functools import wraps
+from flask import current_app, g, make_response, request, session
+from sqlalchemy import event
+from models import db, DataVersion
+
+#----------------------------------------------------------------------------#
+# Data versions.
+#
+# Every transaction that writes to one of TABLES bumps that table's row in
+# data_version, inside the same transaction, so the stamp changes exactly
+# when committed data does, whichever worker or process wrote it. ORM
+# flushes and bulk statements (importer, counters, `flask roll-forward`) are
+# both covered; each table is bumped at most once per transaction.
+#----------------------------------------------------------------------------#
+
+TABLES = ('Venue', 'Artist', 'Show', 'Genre')
+
+_data_version = DataVersion.__table__
+
+
+# Bumps the given tables for the session's transaction. Writers that know up
+# front which tables they will touch (writes.py) call it first, so that is
+# one statement rather than one per table.
+def bump(session, tables):
+    bumped = session.info.setdefault('data_version_bumped', set())
+    tables = set(tables) & set(TABLES) - bumped
+    if not tables:
+        return
+    bumped.update(tables)
+    connection = session.connection(mapper=DataVersion.__mapper__)
+    result = connection.execute(_data_version.update()
+                                .where(_data_version.c.name.in_(tables))
+                                .values(version=_data_version.c.version + 1))
+    # Databases made with create_all() rather than the migration start empty.
+    if result.rowcount < len(tables):
+        existing = {name for name, in connection.execute(
+            db.select(_data_version.c.name).where(_data_version.c.name.in_(tables)))}
+        connection.execute(_data_version.insert(),
+                           [{'name': name, 'version': 1} for name in tables - existing])
+
+
+@event.listens_for(db.session, 'after_flush')
+def _bump_flushed(session, flush_context):
+    changed = list(session.new) + list(session.deleted) + \
+        [obj for obj in session.dirty if session.is_modified(obj)]
+    bump(session, {obj.__table__.name for obj in changed})
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _bump_executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        bump(orm_execute_state.session, {orm_execute_state.statement.table.name})
+
+
+@event.listens_for(db.session, 'after_commit')
+@event.listens_for(db.session, 'after_rollback')
+def _reset(session):
+    session.info.pop('data_version_bumped', None)
+
+# The current stamp: every table's version, plus ETAG_VERSION and the built
+# asset manifest so a deploy that changes templates or bundles changes it
+# too. Reads through the request's session, i.e. from the same replica as
+# the page itself.
+def stamp():
+    versions = db.session.query(DataVersion.name, DataVersion.version).order_by(DataVersion.name).all()
+    assets = current_app.extensions.get('assets')
+    parts = ['%s=%d' % (name, version) for name, version in versions]
+    parts.append(current_app.config.get('ETAG_VERSION') or '')
+    parts.extend(sorted(assets.manifest.values()) if assets else [])
+    return hashlib.sha1(','.join(parts).encode('utf-8')).hexdigest()[:16]
+
+#----------------------------------------------------------------------------#
+# Conditional GET.
+#----------------------------------------------------------------------------#
+
+# Decorator for a page that also depends on the date: one whose range
+# defaults to starting today, or that links to today. Goes above
+# @conditional; the day joins the URL in the ETag and in the response
+# cache key, so yesterday's page is neither revalidated nor served.
+def varies_by_day(f):
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        g.page_day = date.today().isoformat()
+        return f(*args, **kwargs)
+    return wrapper
+
+# Decorator for a page that only depends on its URL and the data in TABLES.
+# The page's weak ETag is derived from the data stamp, so an If-None-Match
+# that still matches is answered 304 before anything is rendered or read
+# from the response cache. Goes below @replica_reads and above
+# @response_cache.cached, which keys its entries by the same stamp.
+def conditional(f):
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        # Flash messages are one-offs for the user; render them.
+        if request.method != 'GET' or not current_app.config.get('ETAG_DATA_VERSION', True) \
+                or session.get('_flashes'):
+            return f(*args, **kwargs)
+
+        g.data_version = stamp()
+        etag = hashlib.sha1((g.data_version + g.get('page_day', '') + request.full_path).encode('utf-8')).hexdigest()[:20]
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag, weak=True)
+        # Revalidate on every visit; pages also depend on the session cookie.
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
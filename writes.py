@@ -0,0 +1,257 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import threading
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+import autocomplete
+import counters
+import schedule
+import search
+import versions
+from models import db, Venue, Artist, Genre, venue_genres, artist_genres, DEFAULT_SHOW_DURATION
+
+#----------------------------------------------------------------------------#
+# Write path for the create and edit forms.
+#
+# A form is validated before anything touches the database, then written
+# with Core statements: one INSERT ... RETURNING id (or UPDATE ... WHERE id)
+# for the row itself, one for its genre links, and the data-version and
+# counter updates, in a single transaction. Nothing is loaded first and
+# nothing is read back afterwards; the search and autocomplete indexes,
+# which only see ORM flushes, are told about the change directly.
+#
+# Failures come back as WriteError subclasses with a message fit for the
+# user; anything else is a bug or an outage and is left to the caller.
+#----------------------------------------------------------------------------#
+
+class WriteError(Exception):
+    pass
+
+
+class InvalidForm(WriteError):
+
+    def __init__(self, form):
+        self.errors = form.errors
+        super().__init__(form_errors(form))
+
+
+class NotFound(WriteError):
+    pass
+
+
+class Rejected(WriteError):
+    pass
+
+
+class Conflict(Rejected):
+    pass
+
+
+def form_errors(form):
+    return '; '.join('%s: %s' % (field, ', '.join(messages)) for field, messages in form.errors.items())
+
+#----------------------------------------------------------------------------#
+# Records.
+#----------------------------------------------------------------------------#
+
+# Column values from a validated form (also used by importer.py). Venue and
+# artist records come with their genre names.
+def venue_record(form):
+    return {
+        'name': form.name.data,
+        'city': form.city.data,
+        'state': form.state.data,
+        'address': form.address.data,
+        'phone': form.phone.data,
+        'genre': ','.join(form.genre.data),
+        'image_link': form.image_link.data,
+        'facebook_link': form.facebook_link.data,
+        'website_link': form.website_link.data,
+        'seeking_talent': form.seeking_talent.data,
+        'seeking_description': form.seeking_description.data,
+    }, form.genre.data
+
+def artist_record(form):
+    return {
+        'name': form.name.data,
+        'city': form.city.data,
+        'state': form.state.data,
+        'phone': form.phone.data,
+        'genres': ','.join(form.genres.data),
+        'image_link': form.image_link.data,
+        'facebook_link': form.facebook_link.data,
+        'website_link': form.website_link.data,
+        'seeking_venue': form.seeking_venue.data,
+        'seeking_description': form.seeking_description.data,
+    }, form.genres.data
+
+def show_record(form):
+    return {
+        'artist_id': int(form.artist_id.data),
+        'venue_id': int(form.venue_id.data),
+        'start_time': form.start_time.data,
+        'end_time': form.end_time.data or form.start_time.data + DEFAULT_SHOW_DURATION,
+    }
+
+def _validated(form):
+    if not form.validate():
+        raise InvalidForm(form)
+    return form
+
+#----------------------------------------------------------------------------#
+# Statements.
+#----------------------------------------------------------------------------#
+
+# Inserts the records and returns their new ids, in order. Multi-row
+# INSERT ... RETURNING where the database has it, row by row otherwise.
+def insert_returning_ids(table, records):
+    if db.engine.dialect.full_returning:
+        result = db.session.execute(table.insert().values(records).returning(table.c.id))
+        return [row.id for row in result]
+    return [db.session.execute(table.insert().values(record)).inserted_primary_key[0] for record in records]
+
+# Genre name -> id, shared by every request in the process. Genres are only
+# ever added, so entries stay valid; ids of genres created in a transaction
+# are only shared once it commits.
+_genre_ids = {}
+_genre_lock = threading.Lock()
+
+def genre_ids(names):
+    names = list(dict.fromkeys(name.strip() for name in names if name and name.strip()))
+    pending = db.session.info.setdefault('genre_ids_pending', {})
+    found = {name: _genre_ids.get(name) or pending.get(name) for name in names}
+    missing = [name for name in names if found[name] is None]
+    if missing:
+        table = Genre.__table__
+        for genre_id, name in db.session.execute(
+                db.select(table.c.id, table.c.name).where(table.c.name.in_(missing))):
+            found[name] = genre_id
+            with _genre_lock:
+                _genre_ids[name] = genre_id
+        created = [name for name in missing if found[name] is None]
+        if created:
+            ids = insert_returning_ids(table, [{'name': name} for name in created])
+            pending.update(zip(created, ids))
+            found.update(zip(created, ids))
+    return [found[name] for name in names]
+
+@event.listens_for(db.session, 'after_commit')
+def _share_genre_ids(session):
+    pending = session.info.pop('genre_ids_pending', None)
+    if pending:
+        with _genre_lock:
+            _genre_ids.update(pending)
+
+# Savepoint rollbacks too (importer.py); forgotten ids are simply read again.
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_genre_ids(session, previous_transaction):
+    session.info.pop('genre_ids_pending', None)
+
+def _link_genres(association, owner_column, owner_id, names, replace=False):
+    if replace:
+        db.session.execute(association.delete().where(association.c[owner_column] == owner_id))
+    links = [{owner_column: owner_id, 'genre_id': genre_id} for genre_id in genre_ids(names)]
+    if links:
+        db.session.execute(association.insert(), links)
+
+# PostgreSQL's SQLSTATE for an exclusion constraint violation.
+EXCLUSION_VIOLATION = '23P01'
+
+# Commits, or rolls back and re-raises. Constraint violations become
+# Rejected with the caller's message, overlapping shows Conflict.
+@contextmanager
+def _transaction(rejected):
+    try:
+        yield
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        with _genre_lock:
+            _genre_ids.clear()
+        if getattr(e.orig, 'pgcode', None) == EXCLUSION_VIOLATION:
+            raise Conflict('it overlaps another show at the venue or by the artist.') from e
+        raise Rejected(rejected) from e
+    except Exception:
+        db.session.rollback()
+        raise
+
+def _queue_index_changes(model, entity_id, record, genres_key):
+    search.queue_change(db.session, model, entity_id,
+                        (record['name'], record['city'], record['state'], record[genres_key]))
+    autocomplete.queue_change(db.session, model, entity_id, record['name'])
+
+#----------------------------------------------------------------------------#
+# Venues and artists.
+#----------------------------------------------------------------------------#
+
+# (table, genre association, owner column, comma-joined genre column,
+# record builder) per model.
+_ENTITIES = {
+    Venue: (Venue.__table__, venue_genres, 'venue_id', 'genre', venue_record),
+    Artist: (Artist.__table__, artist_genres, 'artist_id', 'genres', artist_record),
+}
+
+def _create(model, form):
+    table, association, owner_column, genres_key, build = _ENTITIES[model]
+    record, genres = build(_validated(form))
+    with _transaction('it conflicts with existing data.'):
+        versions.bump(db.session, [table.name])
+        entity_id = insert_returning_ids(table, [record])[0]
+        _link_genres(association, owner_column, entity_id, genres)
+        _queue_index_changes(model, entity_id, record, genres_key)
+    return entity_id
+
+# The UPDATE's row count says whether the row exists; there is no read
+# before it.
+def _update(model, entity_id, form):
+    table, association, owner_column, genres_key, build = _ENTITIES[model]
+    record, genres = build(_validated(form))
+    with _transaction('it conflicts with existing data.'):
+        versions.bump(db.session, [table.name])
+        result = db.session.execute(table.update().where(table.c.id == entity_id).values(record))
+        if result.rowcount == 0:
+            raise NotFound('%s %d does not exist.' % (model.__name__, entity_id))
+        _link_genres(association, owner_column, entity_id, genres, replace=True)
+        _queue_index_changes(model, entity_id, record, genres_key)
+
+# The create_* functions return the new row's id.
+def create_venue(form):
+    return _create(Venue, form)
+
+def create_artist(form):
+    return _create(Artist, form)
+
+def update_venue(venue_id, form):
+    _update(Venue, venue_id, form)
+
+def update_artist(artist_id, form):
+    _update(Artist, artist_id, form)
+
+#----------------------------------------------------------------------------#
+# Shows.
+#----------------------------------------------------------------------------#
+
+# Returns the new show's record, with its id. A show that overlaps another
+# at the same venue or by the same artist is a Conflict; an artist or venue
+# that does not exist is caught by the foreign keys (on databases that
+# enforce them).
+def create_show(form):
+    record = show_record(_validated(form))
+    with _transaction('the artist or venue does not exist.'):
+        versions.bump(db.session, ['Show', 'Venue', 'Artist'])
+        record['id'] = schedule.insert_show(record)
+        if record['id'] is None:
+            raise Conflict(_conflict_message(record))
+        counters.shows_added([record])
+    return record
+
+def _conflict_message(record):
+    found = schedule.find_conflict(record)
+    if found is None:
+        return 'it overlaps another show at the venue or by the artist.'
+    kind, show_id, start, end = found
+    return '%s %d already has a show from %s to %s.' % (
+        kind.capitalize(), record[kind + '_id'], start.strftime('%Y-%m-%d %H:%M'), end.strftime('%Y-%m-%d %H:%M'))